@@ -0,0 +1,83 @@
+"""Benchmark of fuzzy font name matching latency.
+
+Synthetic family names are indexed with the dict and the compact n-gram index, and matched
+like `match_font_name(...)` against queries with no match (misses) and with typos (hits),
+compared with `difflib.get_close_matches(...)` over the same names.
+
+Usage: python benchmarks/bench_fuzzy.py [--families N] [--runs N] [--max-ms MS]
+
+Fails if the median latency of any miss exceeds `--max-ms`.
+"""
+
+import argparse
+import difflib
+import json
+import random
+import statistics
+import sys
+import time
+from collections.abc import Callable
+
+from corpus import WORDS
+
+MISSES = ("Arial", "Helvetica Neue", "Times New Roman", "Courier New", "Qwerty Uiop")
+
+
+def make_families(count: int, rng: random.Random) -> list[str]:
+    families: set[str] = set()
+    while len(families) < count:
+        brand = "".join(rng.choice("bcdfghklmnprstvz") + rng.choice("aeiou") for _ in range(rng.randint(2, 4)))
+        families.add(" ".join([brand.title(), *rng.sample(WORDS, rng.randint(1, 2))]))
+    return sorted(families)
+
+
+def typo(name: str, rng: random.Random) -> str:
+    i = rng.randrange(len(name))
+    return name[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + name[i + 1:]
+
+
+def latency_ms(func: Callable[[], object], runs: int) -> float:
+    timings: list[float] = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> int:
+    from fontra.compact import CompactNgramIndex
+    from fontra.ngram import NgramIndex
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--families", type=int, default=12000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--max-ms", type=float, default=1.0, help="fail if median latency of a miss exceeds it")
+    args = parser.parse_args()
+    rng = random.Random(0)
+    families = make_families(args.families, rng)
+    hits = [typo(name, rng) for name in rng.sample(families, 5)]
+    results = {}
+    for name, index in (("dict", NgramIndex(families)), ("compact", CompactNgramIndex(families))):
+        results[name] = {
+            kind: {query: latency_ms(lambda: index.get_close_matches(query, 1), args.runs) for query in queries}
+            for kind, queries in (("misses", MISSES), ("hits", hits))
+        }
+    results["difflib"] = {
+        "misses": {
+            query: latency_ms(lambda: difflib.get_close_matches(query, families, 1), max(1, args.runs // 10))
+            for query in MISSES
+        }
+    }
+    print(json.dumps({"benchmark": "fuzzy_match", "families": len(families), "results_ms": results}, indent=2))
+    failed = False
+    for name in ("dict", "compact"):
+        for query, median in results[name]["misses"].items():
+            if median > args.max_ms:
+                print(f"missing {query!r} takes {median:.2f} ms with the {name} index, more than {args.max_ms} ms", file=sys.stderr)
+                failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
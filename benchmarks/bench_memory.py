@@ -0,0 +1,96 @@
+"""Benchmark of index memory usage, in bytes per indexed face.
+
+Synthetic face records are indexed with the dict and the compact (`PYFONTRA_COMPACT_INDEX=1`)
+font reference index backends, each in a fresh process.
+
+Usage: python benchmarks/bench_memory.py [--files N] [--faces-per-file N] [--ranges N]
+"""
+
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tracemalloc
+from pathlib import Path
+
+STYLES = ("Regular", "Italic", "Bold", "Bold Italic", "Light", "Light Italic", "SemiBold", "SemiBold Italic")
+
+
+def make_records(files: int, faces_per_file: int, ranges: int) -> list[tuple[Path, list]]:
+    from fontra.typing import FaceRecord, FontAttributes
+
+    result = []
+    for i in range(files):
+        family = f"Synthetic Family {i // 2:05d}"
+        records = []
+        for bank in range(faces_per_file):
+            style = STYLES[(i * faces_per_file + bank) % len(STYLES)]
+            classical = [(family, style)]
+            if style != "Regular":
+                classical.append((f"{family} {style}", "Regular"))
+            records.append(FaceRecord(
+                family, style, bank, classical,
+                [(f"合成字体 {i // 2:05d}", 3, 1, 0x804)] if i % 10 == 0 else [],
+                [(start * 64, start * 64 + 31) for start in range(ranges)],
+                FontAttributes(400, 5, 0)
+            ))
+        result.append((Path(f"/fonts/synthetic/family-{i // 2:05d}/face-{i:06d}.ttc"), records))
+    return result
+
+
+def measure(files: int, faces_per_file: int, ranges: int) -> dict[str, float]:
+    from fontra import fontdb
+    from fontra.cache import CacheEntry
+
+    fontfiles = make_records(files, faces_per_file, ranges)
+    faces = files * faces_per_file
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    db = fontdb.FontDB()
+    index = fontdb._new_font_index()
+    for fn, records in fontfiles:
+        db._index_fontfile(index, fn, CacheEntry((0, 0, 0), records), fresh=True)
+    gc.collect()
+    indexed = tracemalloc.get_traced_memory()[0]
+    index.fontrefs.clear()
+    index.classical_fontrefs.clear()
+    gc.collect()
+    released = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return {
+        "faces": faces,
+        "index_bytes_per_face": (indexed - before) / faces,
+        "fontref_index_bytes_per_face": (indexed - released) / faces,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument("--faces-per-file", type=int, default=2)
+    parser.add_argument("--ranges", type=int, default=16, help="codepoint ranges per face")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(measure(args.files, args.faces_per_file, args.ranges)))
+        return 0
+    results = {}
+    for backend, compact in (("dict", "0"), ("compact", "1")):
+        output = subprocess.run(
+            [
+                sys.executable, __file__, "--child", "--files", str(args.files),
+                "--faces-per-file", str(args.faces_per_file), "--ranges", str(args.ranges)
+            ],
+            check=True, capture_output=True, text=True,
+            env={**os.environ, "PYFONTRA_COMPACT_INDEX": compact}
+        ).stdout
+        results[backend] = json.loads(output)
+    print(json.dumps({"benchmark": "index_memory", "results": results}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""Benchmark of CLI startup time.
+
+Usage: python benchmarks/bench_startup.py [--runs N] [--max-ms MS]
+
+Fails if `import fontra` imports any of `LAZY_MODULES`,
+or if the median of `version` exceeds the startup of a bare interpreter by more than `--max-ms`.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+COMMANDS = {
+    "version": ["--version"],
+    "help": ["--help"],
+    "fontdirs": ["fontdirs"],
+}
+
+# imported on demand only, `concurrent.futures` brings `logging` with it
+LAZY_MODULES = ("concurrent.futures", "logging", "socket", "traceback", "freetype", "fontTools")
+
+
+def measure(args: list[str], runs: int) -> list[float]:
+    timings: list[float] = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, *args],
+            check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def imported_lazy_modules() -> list[str]:
+    """Get modules of `LAZY_MODULES` imported by `import fontra`."""
+    code = f"import sys, fontra; print(*(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return output.split()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument(
+        "--max-ms", type=float, default=100.0,
+        help="fail if median of `version` exceeds median of a bare interpreter by more than it"
+    )
+    args = parser.parse_args()
+    interpreter = statistics.median(measure(["-c", "pass"], args.runs))
+    results = {}
+    for name, command in COMMANDS.items():
+        timings = measure(["-m", "fontra", *command], args.runs)
+        results[name] = {"min_ms": min(timings), "median_ms": statistics.median(timings)}
+    lazy = imported_lazy_modules()
+    print(json.dumps(
+        {"benchmark": "cli_startup", "interpreter_ms": interpreter, "results": results, "imported_lazy_modules": lazy},
+        indent=2
+    ))
+    failed = False
+    if lazy:
+        print(f"`import fontra` imports {', '.join(lazy)}, which should be imported on demand", file=sys.stderr)
+        failed = True
+    if (overhead := results["version"]["median_ms"] - interpreter) > args.max_ms:
+        print(f"`fontra --version` takes {overhead:.1f} ms over the interpreter, more than {args.max_ms} ms", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""Benchmark suite over a synthetic font corpus.
+
+Measures cold and warm indexing time, query latency (exact, localized, classical, fuzzy),
+peak memory and CLI startup time, each indexing run in a fresh process, and prints JSON results.
+Neither network nor system fonts are used.
+
+Usage: python benchmarks/bench_suite.py [--families N] [--styles N] [--collections RATIO]
+       [--localized RATIO] [--workers N] [--queries N] [--corpus DIR] [--output FILE]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, Optional
+
+from bench_startup import COMMANDS, measure as measure_cli
+from corpus import generate_corpus, legacy_names
+
+MANIFEST = "corpus.json"
+
+
+def peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def run_index(corpus: Path, use_cache: bool, workers: Optional[int]) -> dict[str, Any]:
+    import fontra
+    from fontra import fontdb
+
+    baseline = peak_rss_mb()
+    fontdb.FONTDIRS_CUSTOM.append(corpus)
+    start = time.perf_counter()
+    fontra.update_custom_fontfiles_index()
+    walked = time.perf_counter()
+    fontra.update_fontrefs_index(use_cache=use_cache, workers=workers)
+    end = time.perf_counter()
+    return {
+        "walk_s": walked - start,
+        "index_s": end - walked,
+        "total_s": end - start,
+        "families": len(fontra.all_fonts()),
+        "baseline_rss_mb": baseline,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def latency(calls: list[Callable[[], object]]) -> dict[str, Any]:
+    timings: list[float] = []
+    errors = 0
+    for call in calls:
+        start = time.perf_counter_ns()
+        try:
+            call()
+        except KeyError:
+            errors += 1
+        timings.append((time.perf_counter_ns() - start) / 1000)
+    timings.sort()
+    return {
+        "queries": len(timings),
+        "errors": errors,
+        "mean_us": statistics.fmean(timings),
+        "p50_us": timings[len(timings) // 2],
+        "p95_us": timings[int(len(timings) * 0.95)],
+        "p99_us": timings[int(len(timings) * 0.99)],
+    }
+
+
+def typo(name: str, rng: random.Random) -> str:
+    i = rng.randrange(len(name) - 1)
+    return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+
+
+def run_query(corpus: Path, queries: int) -> dict[str, Any]:
+    import fontra
+    from fontra import fontdb
+
+    fontdb.FONTDIRS_CUSTOM.append(corpus)
+    fontra.update_custom_fontfiles_index()
+    fontra.update_fontrefs_index(use_cache=True)
+    faces = json.loads((corpus / MANIFEST).read_text(encoding="utf-8"))["faces"]
+    rng = random.Random(0)
+    sample = [rng.choice(faces) for _ in range(queries)]
+    localized = [face for face in faces if face["localized"]]
+    localized_sample = [rng.choice(localized) for _ in range(queries)] if localized else []
+    classical_sample = [legacy_names(face["family"], face["style"]) for face in sample]
+    fontra.set_query_cache_size(0)
+    results = {
+        "exact": latency([
+            lambda face=face: fontra.get_font(face["family"], face["style"]) for face in sample
+        ]),
+        "localized": latency([
+            lambda face=face: fontra.get_font(face["localized"][0], face["style"])
+            for face in localized_sample
+        ]),
+        "classical": latency([
+            lambda name=name, style=style: fontra.get_font(name, style, classical=True)
+            for name, style in classical_sample
+        ]),
+        "fuzzy": latency([
+            lambda name=typo(face["family"], rng): fontra.match_font_name(name) for face in sample[:max(1, queries // 10)]
+        ]),
+        "find_font": latency([
+            lambda face=face: fontra.find_font(face["family"], weight=600, italic=True) for face in sample
+        ]),
+    }
+    fontra.set_query_cache_size(4096)
+    results["exact_cached"] = latency([
+        lambda face=face: fontra.get_font(face["family"], face["style"]) for face in sample
+    ])
+    return results
+
+
+def child(args: list[str], env: dict[str, str]) -> dict[str, Any]:
+    output = subprocess.run(
+        [sys.executable, __file__, *args], check=True, capture_output=True, text=True, env=env
+    ).stdout
+    return json.loads(output)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--families", type=int, default=1000)
+    parser.add_argument("--styles", type=int, default=4)
+    parser.add_argument("--collections", type=float, default=0.1)
+    parser.add_argument("--localized", type=float, default=0.2)
+    parser.add_argument("--workers", type=int, default=None, help="processes to index with")
+    parser.add_argument("--queries", type=int, default=2000, help="queries of each kind")
+    parser.add_argument("--cli-runs", type=int, default=5)
+    parser.add_argument("--corpus", type=Path, default=None, help="directory to keep the corpus in")
+    parser.add_argument("--output", type=Path, default=None, help="file to write JSON results into")
+    parser.add_argument("--child", choices=("index", "query"), help=argparse.SUPPRESS)
+    parser.add_argument("--cache", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child == "index":
+        print(json.dumps(run_index(args.corpus, args.cache, args.workers)))
+        return 0
+    if args.child == "query":
+        print(json.dumps(run_query(args.corpus, args.queries)))
+        return 0
+
+    with tempfile.TemporaryDirectory(prefix="fontra-bench-") as tmp:
+        corpus = args.corpus or Path(tmp) / "corpus"
+        start = time.perf_counter()
+        faces = generate_corpus(corpus, args.families, args.styles, args.collections, args.localized)
+        (corpus / MANIFEST).write_text(
+            json.dumps({"faces": [
+                {"family": face.family, "style": face.style, "localized": list(face.localized.values())}
+                for face in faces
+            ]}, ensure_ascii=False),
+            encoding="utf-8"
+        )
+        generated = time.perf_counter() - start
+        env = {**os.environ, "PYFONTRA_CACHE_DIR": str(Path(tmp) / "cache")}
+        index_args = ["--corpus", str(corpus)] + (["--workers", str(args.workers)] if args.workers else [])
+        results = {
+            "index_uncached": child(["--child", "index", *index_args], env),
+            "index_cold": child(["--child", "index", "--cache", *index_args], env),
+            "index_warm": child(["--child", "index", "--cache", *index_args], env),
+            "query": child(["--child", "query", "--corpus", str(corpus), "--queries", str(args.queries)], env),
+            "cli_startup": {
+                name: {"min_ms": min(timings), "median_ms": statistics.median(timings)}
+                for name, command in COMMANDS.items()
+                for timings in (measure_cli(["-m", "fontra", *command], args.cli_runs),)
+            },
+        }
+    report = {
+        "benchmark": "suite",
+        "fontra_version": get_fontra_version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus": {
+            "families": args.families, "styles": args.styles, "collections": args.collections,
+            "localized": args.localized, "faces": len(faces), "generate_s": generated,
+        },
+        "workers": args.workers,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output is not None:
+        args.output.write_text(output + "\n", encoding="utf-8")
+    return 0
+
+
+def get_fontra_version() -> Optional[str]:
+    from importlib.metadata import PackageNotFoundError, version
+    try:
+        return version("fontra")
+    except PackageNotFoundError:
+        return None
+
+
+if __name__ == "__main__":
+    sys.exit(main())
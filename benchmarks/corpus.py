@@ -0,0 +1,207 @@
+"""Generator of a synthetic font corpus for benchmarks.
+
+Fonts are minimal but valid TrueType files (empty glyphs), written without any dependency.
+
+Usage: python benchmarks/corpus.py OUTPUT [--families N] [--styles N] [--collections RATIO] [--localized RATIO]
+"""
+
+import argparse
+import json
+import random
+import struct
+import sys
+from pathlib import Path
+from typing import NamedTuple
+
+STYLES = (
+    ("Regular", 400, False), ("Italic", 400, True), ("Bold", 700, False), ("Bold Italic", 700, True),
+    ("Light", 300, False), ("Light Italic", 300, True), ("Medium", 500, False), ("Medium Italic", 500, True),
+    ("SemiBold", 600, False), ("SemiBold Italic", 600, True), ("Black", 900, False), ("Black Italic", 900, True),
+)
+RIBBI = {"Regular", "Italic", "Bold", "Bold Italic"}
+# Windows language id -> prefix of localized family names
+LANGUAGES = {0x804: "合成", 0x411: "合成書体", 0x412: "합성"}
+WORDS = (
+    "Sans", "Serif", "Mono", "Gothic", "Mincho", "Round", "Slab", "Display", "Text", "Code",
+    "Grotesk", "Humanist", "Geometric", "Condensed", "Wide", "Script", "Hand", "Book", "UI", "Pro",
+)
+BASE_CHARS = list(range(0x20, 0x7F))
+CJK_CHARS = list(range(0x4E00, 0x4E00 + 256))
+
+MS_PLATFORM, MS_UNICODE_BMP, MS_ENGLISH = 3, 1, 0x409
+
+
+class CorpusFace(NamedTuple):
+    family: str
+    style: str
+    localized: dict[int, str]
+
+
+def _checksum(data: bytes) -> int:
+    data += b"\0" * (-len(data) % 4)
+    return sum(struct.unpack(f">{len(data) // 4}I", data)) & 0xFFFFFFFF
+
+
+def _name_table(records: list[tuple[int, int, str]]) -> bytes:
+    header = struct.pack(">HHH", 0, len(records), 6 + 12 * len(records))
+    entries, strings = b"", b""
+    for language_id, name_id, string in sorted(records):
+        data = string.encode("utf-16-be")
+        entries += struct.pack(">6H", MS_PLATFORM, MS_UNICODE_BMP, language_id, name_id, len(data), len(strings))
+        strings += data
+    return header + entries + strings
+
+
+def _cmap_table(chars: list[int]) -> bytes:
+    segments: list[tuple[int, int, int]] = []  # start, end, first glyph id
+    for gid, char in enumerate(chars, 1):
+        if segments and segments[-1][1] == char - 1:
+            segments[-1] = (segments[-1][0], char, segments[-1][2])
+        else:
+            segments.append((char, char, gid))
+    segments.append((0xFFFF, 0xFFFF, 0))
+    count = len(segments)
+    search_range = 2 * (1 << (count.bit_length() - 1))
+    subtable = struct.pack(
+        ">7H", 4, 16 + 8 * count, 0, 2 * count, search_range,
+        (search_range // 2).bit_length() - 1, 2 * count - search_range
+    )
+    subtable += struct.pack(f">{count}H", *(end for _, end, _ in segments)) + b"\0\0"
+    subtable += struct.pack(f">{count}H", *(start for start, _, _ in segments))
+    subtable += struct.pack(f">{count}h", *(
+        ((gid - start) + 0x8000) % 0x10000 - 0x8000 if gid else 1 for start, _, gid in segments
+    ))
+    subtable += struct.pack(f">{count}H", *([0] * count))
+    return struct.pack(">HHHHI", 0, 1, MS_PLATFORM, MS_UNICODE_BMP, 12) + subtable
+
+
+def legacy_names(family: str, style: str) -> tuple[str, str]:
+    """Get the legacy (name ID 1 and 2) family and style names of a face, as in the classical index."""
+    if style in RIBBI:
+        return family, style
+    return f"{family} {style.replace(' Italic', '')}", "Italic" if style.endswith("Italic") else "Regular"
+
+
+def _font_tables(face: CorpusFace, weight: int, italic: bool, chars: list[int]) -> dict[bytes, bytes]:
+    num_glyphs = len(chars) + 1
+    typographic = face.style not in RIBBI
+    legacy_family, legacy_style = legacy_names(face.family, face.style)
+    full_name = f"{face.family} {face.style}"
+    records = [
+        (MS_ENGLISH, 1, legacy_family), (MS_ENGLISH, 2, legacy_style),
+        (MS_ENGLISH, 4, full_name), (MS_ENGLISH, 6, full_name.replace(" ", "-")),
+    ]
+    if typographic:
+        records += [(MS_ENGLISH, 16, face.family), (MS_ENGLISH, 17, face.style)]
+    for language_id, name in face.localized.items():
+        records.append((language_id, 1, legacy_names(name, face.style)[0]))
+        if typographic:
+            records.append((language_id, 16, name))
+    fs_selection = (1 if italic else 0) | (0x20 if weight == 700 else 0) | (0x40 if weight == 400 and not italic else 0)
+    mac_style = (1 if weight == 700 else 0) | (2 if italic else 0)
+    return {
+        b"OS/2": struct.pack(
+            ">HhHHH10hh10s4I4sHHHhhhHH2IhhHHH",
+            4, 500, weight, 5, 0, *([0] * 10), 0, b"\0" * 10, 1, 0, 0, 0, b"SYNT",
+            fs_selection, min(chars), min(max(chars), 0xFFFF), 800, -200, 0, 1000, 200, 1, 0, 500, 700, 0, 32, 1
+        ),
+        b"cmap": _cmap_table(chars),
+        b"glyf": b"",
+        b"head": struct.pack(
+            ">IIIIHHqq4hHHhhh", 0x00010000, 0x00010000, 0, 0x5F0F3CF5, 0x000B, 1000,
+            0, 0, 0, 0, 0, 0, mac_style, 8, 2, 0, 0
+        ),
+        b"hhea": struct.pack(">I10h4hhH", 0x00010000, 800, -200, 0, 500, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1),
+        b"hmtx": struct.pack(">Hh", 500, 0) + struct.pack(f">{num_glyphs - 1}h", *([0] * (num_glyphs - 1))),
+        b"loca": struct.pack(f">{num_glyphs + 1}H", *([0] * (num_glyphs + 1))),
+        b"maxp": struct.pack(">IH13H", 0x00010000, num_glyphs, *([0] * 13)),
+        b"name": _name_table(records),
+        b"post": struct.pack(">IIhhIIIII", 0x00030000, 0, -100, 50, 0, 0, 0, 0, 0),
+    }
+
+
+def _sfnt(tables: dict[bytes, bytes], base: int) -> bytes:
+    count = len(tables)
+    entry_selector = count.bit_length() - 1
+    search_range = 16 << entry_selector
+    directory = struct.pack(">IHHHH", 0x00010000, count, search_range, entry_selector, 16 * count - search_range)
+    offset = base + 12 + 16 * count
+    data = b""
+    for tag in sorted(tables):
+        table = tables[tag]
+        directory += struct.pack(">4sIII", tag, _checksum(table), offset + len(data), len(table))
+        data += table + b"\0" * (-len(table) % 4)
+    return directory + data
+
+
+def build_font(faces: list[tuple[CorpusFace, int, bool, list[int]]]) -> bytes:
+    """Build a TTF file of a face, or a TTC file of multiple faces."""
+    if len(faces) == 1:
+        return _sfnt(_font_tables(*faces[0]), 0)
+    header_size = 12 + 4 * len(faces)
+    fonts: list[bytes] = []
+    offsets: list[int] = []
+    for face in faces:
+        offsets.append(header_size + sum(len(x) for x in fonts))
+        fonts.append(_sfnt(_font_tables(*face), offsets[-1]))
+    return struct.pack(f">4sHHI{len(faces)}I", b"ttcf", 1, 0, len(faces), *offsets) + b"".join(fonts)
+
+
+def generate_corpus(
+    output: Path,
+    families: int = 1000,
+    styles: int = 4,
+    collections: float = 0.1,
+    localized: float = 0.2,
+    seed: int = 0,
+) -> list[CorpusFace]:
+    """Write a synthetic font corpus into a directory.
+
+    Params:
+    - output: directory to write font files into.
+    - families: number of font families.
+    - styles: number of styles of each family, at most 12.
+    - collections: ratio of families packed into a TTC file instead of a TTF file per style.
+    - localized: ratio of families with localized name records.
+    - seed: random seed, the same parameters and seed produce the same corpus.
+
+    Return: a list of generated faces.
+    """
+    rng = random.Random(seed)
+    result: list[CorpusFace] = []
+    for i in range(families):
+        family = f"{' '.join(rng.sample(WORDS, 2))} {i:05d}"
+        names = {}
+        if rng.random() < localized:
+            language_id = rng.choice(list(LANGUAGES))
+            names[language_id] = f"{LANGUAGES[language_id]}{i:05d}"
+        chars = BASE_CHARS + (CJK_CHARS if names else [])
+        directory = output / family.split()[0].lower()
+        directory.mkdir(parents=True, exist_ok=True)
+        faces = [(CorpusFace(family, style, names), weight, italic, chars) for style, weight, italic in STYLES[:styles]]
+        stem = family.replace(" ", "")
+        if rng.random() < collections:
+            (directory / f"{stem}.ttc").write_bytes(build_font(faces))
+        else:
+            for face in faces:
+                (directory / f"{stem}-{face[0].style.replace(' ', '')}.ttf").write_bytes(build_font([face]))
+        result.extend(face[0] for face in faces)
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--families", type=int, default=1000)
+    parser.add_argument("--styles", type=int, default=4)
+    parser.add_argument("--collections", type=float, default=0.1)
+    parser.add_argument("--localized", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    faces = generate_corpus(args.output, args.families, args.styles, args.collections, args.localized, args.seed)
+    print(json.dumps({"faces": len(faces), "files": sum(1 for _ in args.output.rglob("*.tt?"))}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
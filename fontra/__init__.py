@@ -3,46 +3,212 @@ Font indexing and querying support like fontconfig.
 """
 
 import os
+import warnings
+from collections.abc import Iterable
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
+from .client import _query_daemon
+from .client import connect_daemon as connect_daemon
+from .client import disconnect_daemon as disconnect_daemon
+from .facepool import FacePool
+from .facepool import FacePoolInfo as FacePoolInfo
 from .fontdb import FONTDIRS_CUSTOM as FONTDIRS_CUSTOM
 from .fontdb import FONTDIRS_SYSTEM as FONTDIRS_SYSTEM
+from .fontdb import FontDB as FontDB
+from .fontdb import FontIndex as FontIndex
+from .fontdb import add_font_files as add_font_files
 from .fontdb import all_fonts as all_fonts
+from .fontdb import cancel_fontdb_init
+from .fontdb import complete_font_names as complete_font_names
+from .fontdb import defer_fontdb_init
+from .fontdb import fonts_covering as fonts_covering
+from .fontdb import get_font_index as get_font_index
+from .fontdb import get_fontdb as get_fontdb
 from .fontdb import get_fontdirs as get_fontdirs
+from .fontdb import get_localized_name as get_localized_name
 from .fontdb import get_localized_names as get_localized_names
 from .fontdb import get_unlocalized_name as get_unlocalized_name
-from .fontdb import indexed_classical_fontrefs as _indexed_classical_fontrefs
-from .fontdb import indexed_fontrefs as _indexed_fontrefs
+from .fontdb import refresh_directory as refresh_directory
+from .fontdb import remove_font_files as remove_font_files
 from .fontdb import update_custom_fontfiles_index as update_custom_fontfiles_index
 from .fontdb import update_fontrefs_index as update_fontrefs_index
 from .fontdb import update_system_fontdirs as update_system_fontdirs
 from .fontdb import update_system_fontfiles_index as update_system_fontfiles_index
+from .fontdb import wait_fontdb as wait_fontdb
 from .fzmatch import match_font_name as match_font_name
 from .fzmatch import match_font_names as match_font_names
 from .fzmatch import match_font_style as match_font_style
 from .fzmatch import match_font_styles as match_font_styles
+from .querycache import QueryCacheInfo as QueryCacheInfo
+from .snapshot import build_snapshot as build_snapshot
+from .snapshot import load_snapshot as load_snapshot
+from .stats import FailedFile as FailedFile
+from .stats import FileCost as FileCost
+from .stats import IndexStats as IndexStats
+from .stats import PhaseTiming as PhaseTiming
+from .stats import add_index_hook as add_index_hook
+from .stats import get_index_stats as get_index_stats
+from .stats import remove_index_hook as remove_index_hook
+from .typing import FontAttributes as FontAttributes
 from .typing import FontFamilyName, StyleName
+from .typing import FontNameMatch as FontNameMatch
 from .typing import FontRef as FontRef
+from .typing import FontResolution as FontResolution
+from .watcher import FontWatcher as FontWatcher
+from .watcher import unwatch as unwatch
+from .watcher import watch as _watch
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    import freetype
+
+# re-exported under its own name, `init_fontdb(watch=...)` takes the same name as a flag
+watch = _watch
 
 # init_by_environ: bool = False
 
 
-def init_fontdb(*custom_dirs: Path, accept_envvars: bool = True):
+def init_fontdirs(*custom_dirs: Path, accept_envvars: bool = True) -> None:
+    """Initialize font directories, without indexing fonts.
+
+    Params:
+    - custom_dirs: extra font directories to search.
+    - accept_envvars: whether to read extra font directories from `PYFONTRA_CUSTOM_FONTDIRS`.
+    """
     update_system_fontdirs()
-    update_system_fontfiles_index()
-    if custom_dirs:
-        FONTDIRS_CUSTOM.extend(custom_dirs)
+    FONTDIRS_CUSTOM.extend(_added_fontdirs(custom_dirs, accept_envvars))
+
+
+def _added_fontdirs(custom_dirs: Iterable[Path], accept_envvars: bool) -> list[Path]:
+    """Get the custom font directories `init_fontdirs(...)` adds."""
+    fontdirs = list(custom_dirs)
     if accept_envvars:
-        FONTDIRS_CUSTOM.extend(
+        fontdirs.extend(
             Path(x).expanduser().resolve() for x in
             os.environ.get("PYFONTRA_CUSTOM_FONTDIRS", "").split(os.pathsep) if x
         )
-    update_custom_fontfiles_index()
-    update_fontrefs_index()
+    return fontdirs
+
+
+def _daemon_has_fontdirs(custom_dirs: Iterable[Path], accept_envvars: bool) -> bool:
+    """Whether the connected daemon indexes the font directories `init_fontdirs(...)` would set."""
+    try:
+        answered, daemon_dirs = _query_daemon("get_fontdirs")
+    except RuntimeError:
+        # a daemon of an older version
+        return False
+    if not answered:
+        return False
+    update_system_fontdirs()
+    expected = [*FONTDIRS_CUSTOM, *_added_fontdirs(custom_dirs, accept_envvars), *FONTDIRS_SYSTEM]
+    return [Path(x).resolve() for x in daemon_dirs] == [x.resolve() for x in expected]
+
+
+def init_fontdb(
+    *custom_dirs: Path,
+    accept_envvars: bool = True,
+    use_cache: bool = True,
+    workers: Optional[int] = None,
+    watch: bool = False,
+    background: bool = False,
+    lazy: bool = False,
+    daemon: bool = False,
+) -> "Optional[Future[None]]":
+    """Initialize the font database.
+
+    Params:
+    - custom_dirs: extra font directories to search.
+    - accept_envvars: whether to read extra font directories from `PYFONTRA_CUSTOM_FONTDIRS`.
+    - use_cache: whether to reuse the on-disk index cache (see `fontra.cache`).
+    - workers: number of processes to load font files with, loads serially by default.
+    - watch: whether to keep the index current by watching font directories (see `fontra.watch`).
+    - background: whether to initialize in a background thread, queries wait until it is done.
+    - lazy: whether to initialize on the first query.
+    - daemon: whether to answer queries by the daemon started by `fontra serve` if it is running
+      (see `connect_daemon(...)`), the other params then only apply if the daemon goes away.
+      Fonts are indexed in process instead (with a warning) if the daemon indexes other font directories.
+
+    Return: a future of the initialization if `background` is set, otherwise None.
+    """
+    def initializer() -> None:
+        init_fontdirs(*custom_dirs, accept_envvars=accept_envvars)
+        update_system_fontfiles_index()
+        update_custom_fontfiles_index()
+        update_fontrefs_index(use_cache=use_cache, workers=workers)
+        if watch:
+            _watch()
+
+    if daemon and connect_daemon():
+        if _daemon_has_fontdirs(custom_dirs, accept_envvars):
+            # the in-process index is only needed once the daemon goes away
+            return defer_fontdb_init(initializer, background=False)
+        disconnect_daemon()
+        warnings.warn(
+            "The font query daemon indexes other font directories than requested, indexing fonts in process.\n"
+        )
+    if background or lazy:
+        return defer_fontdb_init(initializer, background=background)
+    # an earlier deferred initialization would otherwise run again on the first query
+    cancel_fontdb_init()
+    initializer()
+    return None
+
+
+def get_query_cache_info() -> QueryCacheInfo:
+    """Get hit/miss statistics and size of the cache of `get_font(...)`, `get_font_styles(...)` and `find_font(...)`."""
+    return get_fontdb().query_cache.info()
+
+
+def set_query_cache_size(maxsize: int) -> None:
+    """Set the maximum number of cached query results, 0 to disable the query cache."""
+    query_cache = get_fontdb().query_cache
+    query_cache.maxsize = maxsize
+    query_cache.clear()
+
+
+def clear_query_cache() -> None:
+    """Drop all cached query results and reset statistics."""
+    get_fontdb().query_cache.clear()
+
+
+_face_pool = FacePool()
+
+
+def open_face(fontref: FontRef) -> "freetype.Face":
+    """Get a FreeType face of a font reference from a bounded pool, instead of opening it again.
+
+    The face is shared by all callers, do not use it from multiple threads at the same time.
+
+    Params:
+    - fontref: font reference, like the result of `get_font(...)`.
+
+    Return: a `freetype.Face` object, reopened if the font file changed on disk.
+    """
+    return _face_pool.open_face(fontref)
+
+
+def get_face_pool_info() -> FacePoolInfo:
+    """Get hit/miss statistics, size and approximate memory usage of the pool of `open_face(...)`."""
+    return _face_pool.info()
+
+
+def set_face_pool_limits(maxsize: Optional[int] = None, max_bytes: Optional[int] = None) -> None:
+    """Set the maximum number of pooled faces and the total size of their font files, 0 to disable the pool."""
+    _face_pool.resize(maxsize, max_bytes)
+
+
+def clear_face_pool() -> None:
+    """Drop all pooled faces and reset statistics."""
+    _face_pool.clear()
 
 
 def get_font(name: FontFamilyName, style: str, localized: bool = True, fuzzy: bool = False, classical: bool = False) -> FontRef:
     """Get info for loading correct font faces.
+
+    Family and style names not found exactly are looked up case- and whitespace-insensitively
+    (by `str.casefold()`, with runs of whitespace collapsed), then fuzzy matched if `fuzzy` is set.
     
     Params:
     - name: font family name.
@@ -53,27 +219,39 @@ def get_font(name: FontFamilyName, style: str, localized: bool = True, fuzzy: bo
 
     Return: a named tuple includes file path and collection index.
     """
-    index = _indexed_classical_fontrefs if classical else _indexed_fontrefs
-    name = get_unlocalized_name(name) if localized and not classical else name
-    if name not in index:
-        match = match_font_name(name, classical=classical)
-        if fuzzy and match:
-            name = match
-        else:
-            raise KeyError(
-                f"Font {name!r} not found."
-                + (f" Did you mean {match!r} ?" if match else "")
-            )
-    if style not in (_fonts := index[name]):
-        match = match_font_style(name, style, classical=classical)
-        if fuzzy and match:
-            style = match
-        else:
-            raise KeyError(
-                f"Font style {style!r} of font {name!r} not found."
-                + (f" Did you mean {match!r} ?" if match else "")
-            )
-    return _fonts[style]
+    answered, result = _query_daemon("get_font", name, style, localized, fuzzy, classical)
+    if answered:
+        return FontRef(Path(result[0]), result[1])
+    return get_fontdb().get_font(name, style, localized, fuzzy, classical)
+
+
+def resolve_fonts(
+    requests: Iterable[tuple[FontFamilyName, StyleName]],
+    localized: bool = True,
+    fuzzy: bool = False,
+    classical: bool = False,
+) -> list[FontResolution]:
+    """Resolve many font styles at once, like `get_font(...)` without raising `KeyError`.
+
+    Repeated requests are resolved once, and so is each family name of them,
+    so a missing family is fuzzy matched once for all its styles.
+
+    Params:
+    - requests: (font family name, font style) pairs.
+    - localized: whether to lookup localized index.
+    - fuzzy: whether to fuzzy match.
+    - classical: whether to lookup classical index (where family names contain styles).
+
+    Return: a list of results in the order of requests, each with either a font reference or an error message.
+    """
+    requests = list(requests)
+    answered, result = _query_daemon("resolve_fonts", requests, localized, fuzzy, classical)
+    if answered:
+        return [
+            FontResolution(name, style, None if fontref is None else FontRef(Path(fontref[0]), fontref[1]), error)
+            for name, style, fontref, error in result
+        ]
+    return get_fontdb().resolve_fonts(requests, localized, fuzzy, classical)
 
 
 def get_font_styles(name: FontFamilyName, localized: bool = True, fuzzy: bool = False, classical: bool = False) -> list[StyleName]:
@@ -87,21 +265,67 @@ def get_font_styles(name: FontFamilyName, localized: bool = True, fuzzy: bool =
 
     Return: a list includes style names.
     """
-    index = _indexed_classical_fontrefs if classical else _indexed_fontrefs
-    name = get_unlocalized_name(name) if localized and not classical else name
-    if name not in index:
-        match = match_font_name(name, classical=classical)
-        if fuzzy and match:
-            return [st for st in index[match]]
-        raise KeyError(
-            f"Font {name!r} not found."
-            + (f" Did you mean {match!r} ?" if match else "")
-        )
-    return [st for st in index[name]]
+    answered, result = _query_daemon("get_font_styles", name, localized, fuzzy, classical)
+    if answered:
+        return result
+    return get_fontdb().get_font_styles(name, localized, fuzzy, classical)
+
+
+def find_font(
+    name: FontFamilyName,
+    weight: int = 400,
+    width: int = 5,
+    italic: bool = False,
+    localized: bool = True,
+    fuzzy: bool = False,
+) -> FontRef:
+    """Get the face of a font family nearest to the specified style attributes.
+
+    Slant is matched first (oblique faces may replace italic ones and vice versa),
+    then width, then weight (ties go lighter for weights up to 500, heavier otherwise).
+
+    Params:
+    - name: font family name.
+    - weight: weight class, from 100 (thin) to 900 (black).
+    - width: width class, from 1 (ultra-condensed) to 9 (ultra-expanded).
+    - italic: whether to prefer italic faces.
+    - localized: whether to lookup localized index.
+    - fuzzy: whether to fuzzy match the family name.
+
+    Return: a named tuple includes file path and collection index.
+    """
+    answered, result = _query_daemon("find_font", name, weight, width, italic, localized, fuzzy)
+    if answered:
+        return FontRef(Path(result[0]), result[1])
+    return get_fontdb().find_font(name, weight, width, italic, localized, fuzzy)
+
+
+def fallback_chain(name: FontFamilyName, style: str, text: str, localized: bool = True, fuzzy: bool = False, classical: bool = False) -> list[FontRef]:
+    """Get font faces to render a text with, starting from the specified font.
+
+    Fallback faces are picked greedily by how many of the remaining characters they cover.
+
+    Params:
+    - name: font family name.
+    - style: font style.
+    - text: text to render.
+    - localized: whether to lookup localized index.
+    - fuzzy: whether to fuzzy match.
+    - classical: whether to lookup classical index (where family names contain styles).
+
+    Return: a list of font references, the first one is the specified font.
+    Characters not covered by any indexed face are ignored.
+    """
+    answered, result = _query_daemon("fallback_chain", name, style, text, localized, fuzzy, classical)
+    if answered:
+        return [FontRef(Path(path), bank) for path, bank in result]
+    return get_fontdb().fallback_chain(name, style, text, localized, fuzzy, classical)
 
 
 def has_font_family(name: FontFamilyName, localized: bool = True, classical: bool = False) -> bool:
     """Check whether the specified font family name exists.
+
+    Names are compared like `get_font(...)` without fuzzy matching: exactly, or else case- and whitespace-insensitively.
     
     Params:
     - name: font family name.
@@ -110,14 +334,17 @@ def has_font_family(name: FontFamilyName, localized: bool = True, classical: boo
 
     Return: whether the specified font family name exists.
     """
-    if classical:
-        return name in _indexed_classical_fontrefs
-    name = get_unlocalized_name(name) if localized else name
-    return name in _indexed_fontrefs
+    answered, result = _query_daemon("has_font_family", name, localized, classical)
+    if answered:
+        return result
+    return get_fontdb().has_font_family(name, localized, classical)
 
 
 def has_font_style(name: FontFamilyName, style: str, localized: bool = True, classical: bool = False) -> bool:
     """Check whether the specified font style exists.
+
+    Family and style names are compared like `get_font(...)` without fuzzy matching:
+    exactly, or else case- and whitespace-insensitively.
     
     Params:
     - name: font family name.
@@ -127,10 +354,10 @@ def has_font_style(name: FontFamilyName, style: str, localized: bool = True, cla
 
     Return: whether the specified font style exists.
     """
-    if classical:
-        return name in _indexed_classical_fontrefs
-    name = get_unlocalized_name(name) if localized else name
-    return name in _indexed_fontrefs and style in _indexed_fontrefs[name]
+    answered, result = _query_daemon("has_font_style", name, style, localized, classical)
+    if answered:
+        return result
+    return get_fontdb().has_font_style(name, style, localized, classical)
 
 
 # if os.environ.get("PYFONTRA_INIT_FONTDB", "0") == "1":
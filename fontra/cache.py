@@ -0,0 +1,169 @@
+import gc
+import marshal
+import os
+import sys
+from collections.abc import Collection, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Optional
+
+from typing_extensions import NamedTuple, TypeAlias
+
+from .typing import FaceRecord, FontAttributes
+
+CACHE_VERSION = 4
+
+FileStamp: TypeAlias = tuple[int, int, int]
+
+
+class CacheEntry(NamedTuple):
+    """Cached indexing result of a font file.
+
+    `faces` is None if the file failed to load.
+    """
+    stamp: FileStamp
+    faces: Optional[list[FaceRecord]]
+
+
+def get_cache_dir() -> Path:
+    """Get the directory where fontra stores its cache."""
+    if cachedir := os.getenv("PYFONTRA_CACHE_DIR"):
+        return Path(cachedir).expanduser()
+    if sys.platform == "win32":
+        if localappdata := os.getenv("LOCALAPPDATA"):
+            return Path(localappdata) / "fontra" / "cache"
+    elif sys.platform == "darwin":
+        return Path("~/Library/Caches/fontra").expanduser()
+    elif xdgcache := os.getenv("XDG_CACHE_HOME"):
+        return Path(xdgcache) / "fontra"
+    return Path("~/.cache/fontra").expanduser()
+
+
+def get_cache_file() -> Path:
+    """Get the path of the font index cache file."""
+    return get_cache_dir() / f"fontrefs-v{CACHE_VERSION}.marshal"
+
+
+def get_file_stamp(fn: Path) -> Optional[FileStamp]:
+    """Get (size, mtime, inode) of a file for cache revalidation.
+
+    Return: the stamp, or None if the file cannot be accessed.
+    """
+    try:
+        st = os.stat(fn)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns, st.st_ino)
+
+
+# faces are stored as plain tuples and lists, the only containers `marshal` writes
+def _encode_face(face: FaceRecord) -> tuple[Any, ...]:
+    return (
+        face.family, face.style, face.bank,
+        [(name, style) for name, style in face.classical],
+        [(name, pid, eid, lid) for name, pid, eid, lid in face.langnames],
+        [(start, end) for start, end in face.coverage],
+        tuple(face.attributes),
+    )
+
+
+def _decode_face(data: tuple[Any, ...]) -> FaceRecord:
+    family, style, bank, classical, langnames, coverage, attributes = data
+    return FaceRecord(family, style, bank, classical, langnames, coverage, FontAttributes(*attributes))
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    # loading allocates a lot of small containers, which would all be traversed by each collection
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+@contextmanager
+def _locked(path: Path) -> Iterator[None]:
+    """Hold an exclusive lock of a file across processes, waiting for other holders."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(f"{path.name}.lock"), "a+b") as f:
+        if sys.platform == "win32":
+            import msvcrt
+
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def load_cache(path: Optional[Path] = None) -> dict[Path, CacheEntry]:
+    """Load the font index cache.
+
+    Params:
+    - path: path to the cache file, defaults to `get_cache_file()`.
+
+    Return: a dict maps font file paths to cache entries, empty if the cache is missing or invalid.
+    """
+    path = path or get_cache_file()
+    try:
+        with open(path, "rb") as f, _gc_paused():
+            version, files = marshal.loads(f.read())
+            if version != (CACHE_VERSION, marshal.version):
+                return {}
+            return {
+                Path(fn): CacheEntry(stamp, None if faces is None else [_decode_face(x) for x in faces])
+                for fn, stamp, faces in files
+            }
+    except (OSError, EOFError, ValueError, KeyError, TypeError):
+        return {}
+
+
+def save_cache(
+    entries: dict[Path, CacheEntry], path: Optional[Path] = None, *, scope: Optional[Collection[Path]] = None
+) -> None:
+    """Save the font index cache. Errors are ignored as the cache is optional.
+
+    The cache is shared by processes indexing different font files, so entries of other files
+    saved meanwhile are kept. The file is replaced at once, while holding a lock beside it.
+
+    Params:
+    - entries: a dict maps font file paths to cache entries.
+    - path: path to the cache file, defaults to `get_cache_file()`.
+    - scope: font files `entries` are up to date for, saved entries of them missing in `entries` are dropped.
+      Defaults to the font files of `entries`.
+    """
+    path = path or get_cache_file()
+    scope = entries.keys() if scope is None else scope
+    try:
+        with _locked(path):
+            merged = {fn: entry for fn, entry in load_cache(path).items() if fn not in scope and fn not in entries}
+            merged.update(entries)
+            data = (
+                (CACHE_VERSION, marshal.version),
+                [
+                    (str(fn), entry.stamp, None if entry.faces is None else [_encode_face(x) for x in entry.faces])
+                    for fn, entry in merged.items()
+                ],
+            )
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            try:
+                with open(tmp, "wb") as f:
+                    f.write(marshal.dumps(data))
+                os.replace(tmp, path)
+            finally:
+                tmp.unlink(missing_ok=True)
+    except (OSError, ValueError):
+        pass
@@ -0,0 +1,444 @@
+"""Fontra CLI application, run by `fontra.__main__`."""
+
+from collections.abc import Iterator
+from enum import Enum
+from pathlib import Path
+from typing import TYPE_CHECKING, Annotated, Optional
+
+import typer
+from typer import Argument, Option
+
+from fontra import (
+    all_fonts,
+    get_font,
+    get_font_styles,
+    get_fontdirs,
+    get_localized_names,
+    get_unlocalized_name,
+    init_fontdb,
+    init_fontdirs,
+)
+from fontra.__main__ import print_version
+from fontra.typing import FontFamilyName
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+app = typer.Typer(no_args_is_help=True)
+snapshot_app = typer.Typer(no_args_is_help=True, help="Manage read-only index snapshots.")
+app.add_typer(snapshot_app, name="snapshot")
+_console: "Optional[Console]" = None
+_use_cache: bool = True
+_use_daemon: bool = True
+_fontdb_initialized: bool = False
+
+
+def get_console() -> "Console":
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console()
+    return _console
+
+
+def ensure_fontdb(daemon: bool = True) -> None:
+    """Initialize the font database, only for commands querying fonts.
+
+    Queries are answered by the daemon if it is running, unless `daemon` is False or `--no-daemon` is set.
+    """
+    global _fontdb_initialized
+    if not _fontdb_initialized:
+        init_fontdb(use_cache=_use_cache, daemon=daemon and _use_daemon)
+        _fontdb_initialized = True
+
+
+def check_fonttools_installed() -> bool:
+    from importlib.util import find_spec
+    return find_spec("fontTools") is not None
+
+
+def version_callback(value: bool) -> None:
+    """Show the version and exit"""
+    if value:
+        print_version()
+        raise typer.Exit()
+
+
+@app.callback()
+def callback(
+    version: Annotated[  # noqa: F811  # pyright: ignore[reportUnusedParameter]
+        Optional[bool], 
+        Option("--version", "-v", callback=version_callback, is_eager=True, help="Show the version and exit")
+    ] = None,
+    cache: Annotated[
+        bool,
+        Option("--cache/--no-cache", help="Whether to use the on-disk font index cache.")
+    ] = True,
+    daemon: Annotated[
+        bool,
+        Option("--daemon/--no-daemon", help="Whether to query the daemon started by `fontra serve` if running.")
+    ] = True
+) -> None:
+    """Hello Fontra"""
+    global _use_cache, _use_daemon
+    _use_cache = cache
+    _use_daemon = daemon
+
+
+class ListFormat(str, Enum):
+    rich = "rich"
+    json = "json"
+    jsonl = "jsonl"
+    tsv = "tsv"
+
+
+def _list_fonts(
+    sort: bool, prefix: Optional[str], offset: int, limit: Optional[int]
+) -> Iterator[FontFamilyName]:
+    fonts = all_fonts()
+    if sort:
+        fonts.sort()
+    if prefix:
+        prefix = prefix.casefold()
+        fonts = [font for font in fonts if font.casefold().startswith(prefix)]
+    return iter(fonts[offset:None if limit is None else offset + limit])
+
+
+def _list_rows(
+    fonts: Iterator[FontFamilyName], locnames: bool, paths: bool
+) -> Iterator[dict[str, object]]:
+    """Yield a row per font face, as the family and its styles are looked up."""
+    for font in fonts:
+        names = get_localized_names(font) if locnames else None
+        for style in get_font_styles(font, localized=False):
+            row: dict[str, object] = {"name": font, "style": style}
+            if names is not None:
+                row["localized"] = names
+            if paths:
+                fontref = get_font(font, style, localized=False)
+                row.update(path=str(fontref.path), bank=fontref.bank)
+            yield row
+
+
+def _tsv_field(value: object) -> str:
+    if isinstance(value, list):
+        value = ",".join(value)
+    return str(value).replace("\t", " ").replace("\n", " ")
+
+
+def _write_rows(rows: Iterator[dict[str, object]], output_format: ListFormat, columns: list[str]) -> None:
+    import json
+    import os
+    import sys
+
+    try:
+        if output_format is ListFormat.tsv:
+            sys.stdout.write("\t".join(columns) + "\n")
+            for row in rows:
+                sys.stdout.write("\t".join(_tsv_field(row[column]) for column in columns) + "\n")
+        elif output_format is ListFormat.jsonl:
+            for row in rows:
+                sys.stdout.write(json.dumps(row, ensure_ascii=False) + "\n")
+        else:
+            sys.stdout.write("[")
+            for i, row in enumerate(rows):
+                sys.stdout.write(("\n" if i == 0 else ",\n") + json.dumps(row, ensure_ascii=False))
+            sys.stdout.write("\n]\n")
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # the reader stopped early, like `| head`
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+
+def _format_fontref(font: FontFamilyName, style: str) -> str:
+    from rich.markup import escape
+
+    fontref = get_font(font, style, localized=False)
+    return escape(f"({fontref.path}#{fontref.bank})")
+
+
+@app.command("list", help="List available fonts.")
+def list_(
+    tree: Annotated[
+        Optional[bool],
+        Option("--tree/--table", "-t/-T", help="Whether to display a tree or a table.")
+    ] = False,
+    sort: Annotated[
+        Optional[bool],
+        Option("--sort/--no-sort", "-s/-S", help="Whether to output with sorted font names.")
+    ] = False,
+    locnames: Annotated[
+        Optional[bool],
+        Option(
+            "--localized/--unlocalized", "-l/-L",
+            help="Whether to show localized font names."
+        )
+    ] = False,
+    output_format: Annotated[
+        ListFormat,
+        Option(
+            "--format", "-f",
+            help="Output format. `json`, `jsonl` and `tsv` stream a row per font style as it is looked up."
+        )
+    ] = ListFormat.rich,
+    prefix: Annotated[
+        Optional[str],
+        Option("--prefix", "-p", help="Only list font families whose names start with it, case-insensitively.")
+    ] = None,
+    offset: Annotated[int, Option("--offset", min=0, help="Number of font families to skip.")] = 0,
+    limit: Annotated[
+        Optional[int], Option("--limit", "-n", min=0, help="Maximum number of font families to list.")
+    ] = None,
+    paths: Annotated[
+        bool,
+        Option("--paths", "-P", help="Whether to include the font file path and collection index of each style.")
+    ] = False,
+) -> None:
+    ensure_fontdb()
+    if output_format is not ListFormat.rich:
+        columns = ["name", "style", *(["localized"] if locnames else []), *(["path", "bank"] if paths else [])]
+        rows = _list_rows(_list_fonts(bool(sort), prefix, offset, limit), bool(locnames), paths)
+        _write_rows(rows, output_format, columns)
+        return
+
+    from rich.table import Table, box
+    from rich.tree import Tree
+
+    console = get_console()
+    fonts = list(_list_fonts(bool(sort), prefix, offset, limit))
+    if tree:
+        fonts_tree = Tree("Fonts")
+        for font in fonts:
+            if locnames and (_names := get_localized_names(font)):
+                _label = (
+                    f"[blue]{font}[/] ([yellow]"
+                    + "[/], [yellow]".join(_names) + "[/])"
+                )
+            else:
+                _label = f"[blue]{font}[/]"
+            _tree = fonts_tree.add(_label)
+            for style in get_font_styles(font):
+                _ = _tree.add(f"{style} [dim]{_format_fontref(font, style)}[/]" if paths else style)
+    else:
+        fonts_table = Table("Name", "Style", box=box.DOUBLE_EDGE, show_lines=True)
+        for font in fonts:
+            if locnames and (_names := get_localized_names(font)):
+                _fns = (
+                    f"[blue]{font}[/]\n[yellow]"
+                    + "[/]\n[yellow]".join(_names) + "[/]"
+                )
+            else:
+                _fns = f"[blue]{font}[/]"
+            fonts_table.add_row(_fns, " | ".join(
+                f"{style} [dim]{_format_fontref(font, style)}[/]" if paths else style
+                for style in get_font_styles(font)
+            ))
+    console.print(f"{len(fonts)} font(s) found.")
+    console.print(fonts_tree if tree else fonts_table)  # pyright: ignore[reportPossiblyUnboundVariable]
+
+
+@app.command(help="Show the font search directories.")
+def fontdirs() -> None:
+    init_fontdirs()
+    console = get_console()
+    for dir in get_fontdirs():
+        console.print(f"- {dir!s}")
+
+
+@app.command(help="Show the font information.")
+def show(
+    name: Annotated[list[FontFamilyName], Argument(help="Font family name.")], 
+    localized: Annotated[bool, Option("--localized/--unlocalized", "-l/-L", help="Whether to show localized font name.")] = True,
+    fuzzy: Annotated[bool, Option("--fuzzy/--exact", "-f/-F", help="Whether to fuzzy match.")] = False,
+    verbose: Annotated[bool, Option("--verbose", "-v", help="Whether to show font location.")] = False
+) -> None:
+    ensure_fontdb()
+    console = get_console()
+    try:
+        font_name = " ".join(name)
+        styles = get_font_styles(font_name, localized, fuzzy)
+        console.print(f"The font family '{font_name}' contains {len(styles)} styles:")
+        for style in styles:
+            if verbose:
+                fontref = get_font(font_name, style, localized, fuzzy)
+                console.print(f"- {style} ({fontref.path}:{fontref.bank})")
+            else:
+                console.print(f"- {style}")
+    except KeyError as e:
+        console.print(f"Error: {e}", style="bold red")
+
+
+@app.command(help="Convert a name into an unlocalized name.")
+def unlocalize(name: Annotated[FontFamilyName, Argument(help="Font family name.")]) -> None:
+    ensure_fontdb()
+    get_console().print(f"Unlocalized name: {get_unlocalized_name(name)}")
+
+
+@app.command(
+    help=(
+        "Resolve font requests, one JSON per line from stdin, like"
+        " `{\"name\": NAME, \"style\": STYLE, \"id\": ID}` or `[NAME, STYLE]`."
+        " Results are written as soon as resolved, one JSON per line,"
+        " with `path` and `bank`, or `error`."
+    )
+)
+def resolve(
+    localized: Annotated[bool, Option("--localized/--unlocalized", "-l/-L", help="Whether to lookup the localized index.")] = True,
+    fuzzy: Annotated[bool, Option("--fuzzy/--exact", "-f/-F", help="Whether to fuzzy match.")] = False,
+    classical: Annotated[bool, Option("--classical", "-c", help="Whether to lookup the classical index.")] = False,
+) -> None:
+    import json
+    import sys
+
+    from fontra import resolve_fonts
+
+    ensure_fontdb()
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        result: dict[str, object] = {}
+        try:
+            request = json.loads(line)
+            if isinstance(request, dict):
+                if "id" in request:
+                    result["id"] = request["id"]
+                name, style = request["name"], request["style"]
+            else:
+                name, style = request
+            if not isinstance(name, str) or not isinstance(style, str):
+                raise TypeError("name and style must be strings")
+        except (ValueError, KeyError, TypeError) as e:
+            result["error"] = f"Invalid request: {e}"
+        else:
+            resolution, = resolve_fonts([(name, style)], localized, fuzzy, classical)
+            result.update(name=name, style=style)
+            if resolution.fontref is None:
+                result["error"] = resolution.error
+            else:
+                result.update(path=str(resolution.fontref.path), bank=resolution.fontref.bank)
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+
+
+@app.command(help="Serve font queries to other processes over a Unix domain socket, until interrupted.")
+def serve(
+    socket: Annotated[Optional[Path], Option(help="Path to the socket, defaults to `$XDG_RUNTIME_DIR/fontra.sock`.")] = None,
+    watch: Annotated[bool, Option("--watch/--no-watch", help="Whether to watch font directories for changes.")] = True,
+    workers: Annotated[Optional[int], Option(help="Number of processes to load font files with.")] = None,
+) -> None:
+    from fontra.server import serve as serve_
+
+    console = get_console()
+    init_fontdb(use_cache=_use_cache, workers=workers, watch=watch)
+    try:
+        serve_(socket, ready=lambda path: console.print(f"Serving font queries on {path}"))
+    except RuntimeError as e:
+        console.print(f"Error: {e}", style="bold red")
+        raise typer.Exit(1)
+    except KeyboardInterrupt:
+        pass
+
+
+@app.command(help="Index fonts without the cache and show where the time goes.")
+def stats(
+    top: Annotated[int, Option("--top", "-n", help="Number of slowest font files to show.")] = 10,
+    as_json: Annotated[bool, Option("--json", help="Whether to output JSON.")] = False,
+    workers: Annotated[Optional[int], Option(help="Number of processes to load font files with.")] = None,
+) -> None:
+    from rich.table import Table, box
+
+    from fontra import get_index_stats
+
+    # files reused from the cache are not loaded, so they would have neither timings nor failures
+    init_fontdb(use_cache=False, workers=workers)
+    index_stats = get_index_stats()
+    if as_json:
+        import json
+
+        print(json.dumps(index_stats.as_dict(top), ensure_ascii=False, indent=2))
+        return
+    console = get_console()
+    console.print(
+        f"Indexed {index_stats.faces} face(s) of {index_stats.families} families"
+        f" ({index_stats.classical_families} classical families, {index_stats.localized_names} localized names)"
+        f" from {index_stats.files} file(s) in {index_stats.total_seconds:.3f}s."
+    )
+    phases = Table("Phase", "Seconds", box=box.SIMPLE)
+    for phase, seconds in index_stats.phases.items():
+        phases.add_row(phase, f"{seconds:.3f}")
+    console.print(phases)
+    if slowest := index_stats.slowest(top):
+        files = Table("File", "Faces", "Parser", "Milliseconds", box=box.SIMPLE, title="Slowest files")
+        for cost in slowest:
+            files.add_row(str(cost.path), str(cost.faces), cost.parser, f"{cost.seconds * 1000:.2f}")
+        console.print(files)
+    for failure in index_stats.failures:
+        console.print(f"Failed: {failure.path} ({failure.reason})", style="bold red")
+
+
+@snapshot_app.command("build", help="Build an index snapshot to attach with `fontra.load_snapshot(...)`.")
+def snapshot_build(
+    output: Annotated[Optional[Path], Option(help="Path to the snapshot file.")] = None,
+) -> None:
+    from fontra.snapshot import build_snapshot
+
+    ensure_fontdb(daemon=False)
+    path = build_snapshot(output)
+    get_console().print(f"Index snapshot written to {path}")
+
+
+@app.command(help="Unpack TTC/OTC collections to font files.", rich_help_panel="Utils", hidden=not check_fonttools_installed())
+def unpack(
+    paths: Annotated[list[Path], Argument(help="Paths to font collections, or directories to search them in.")],
+    output: Annotated[Optional[Path], Option(help="Path to the output directory, defaults to `<name>_fonts` beside each collection.")] = None,
+    workers: Annotated[Optional[int], Option(help="Number of processes to extract fonts with, defaults to the number of CPUs.")] = None,
+    force: Annotated[bool, Option("--force", help="Whether to extract fonts of unchanged collections again.")] = False,
+) -> None:
+    import os
+
+    from rich.markup import escape
+    from rich.progress import Progress
+
+    from fontra.unpack import UnpackJob, find_collections, is_collection, plan_unpack, unpack_collections
+
+    console = get_console()
+    if not check_fonttools_installed():
+        console.print(
+            "Error: Please install fontTools first to use fontra cli utils.",
+            "Install with pip: `pip install fontra\\[tools]`",
+            style="bold red"
+        )
+        raise typer.Exit()
+
+    for path in paths:
+        if not path.exists():
+            console.print(f"Error: The file {path} does not exist.", style="bold red")
+            raise typer.Exit(1)
+        if not path.is_dir() and not is_collection(path):
+            console.print(f"Warning: The file {path} is not a font collection, skipped.", style="bold yellow")
+    if not (collections := find_collections(paths)):
+        console.print("Error: No font collection found.", style="bold red")
+        raise typer.Exit(1)
+
+    jobs = plan_unpack(collections, output)
+    with Progress(console=console) as progress:
+        task = progress.add_task(f"Extracting fonts of {len(collections)} collection(s)...", total=len(jobs))
+
+        def advance(job: UnpackJob, error: Optional[str]) -> None:
+            if error is not None:
+                progress.console.print(escape(f"Failed: {job.source}#{job.bank} ({error})"), style="bold red")
+            progress.update(task, advance=1)
+
+        result = unpack_collections(jobs, workers=workers or os.cpu_count(), force=force, callback=advance)
+        progress.console.print(
+            f"[bold cyan]{len(result.extracted)} fonts have been successfully extracted![/]"
+            + (f" {len(result.skipped)} unchanged font(s) skipped." if result.skipped else "")
+        )
+    if result.failed:
+        raise typer.Exit(1)
+
+
+@app.command(help="Report an issue", rich_help_panel="Others")
+def report() -> None:
+    get_console().print("🌈 [bold magenta]Redirecting to Github Issue...[/bold magenta] 🌈")
+    _ = typer.launch("https://github.com/NCBM/fontra/issues", wait=True)
+
@@ -0,0 +1,140 @@
+"""Client of the font query daemon started by `fontra serve` (see `fontra.server`).
+
+The protocol is one JSON array per line over a Unix domain socket.
+A request is `[op, arg, ...]`, a response is `[0, result]`, `[1, message]` for a `KeyError`,
+or `[2, message]` for other errors.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+from .cache import get_cache_dir
+
+if TYPE_CHECKING:
+    import socket
+
+STATUS_OK = 0
+STATUS_KEY_ERROR = 1
+STATUS_ERROR = 2
+
+
+def get_socket_path() -> Path:
+    """Get the path of the daemon socket, overridden by `PYFONTRA_SOCKET`."""
+    if path := os.getenv("PYFONTRA_SOCKET"):
+        return Path(path).expanduser()
+    if runtime := os.getenv("XDG_RUNTIME_DIR"):
+        return Path(runtime) / "fontra.sock"
+    return get_cache_dir() / "fontra.sock"
+
+
+class DaemonClient:
+    """A thread-safe connection to the font query daemon."""
+
+    def __init__(self, path: Optional[Path] = None, timeout: float = 10.0) -> None:
+        self.path = path or get_socket_path()
+        self.timeout = timeout
+        self._sock: "Optional[socket.socket]" = None
+        self._reader: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    def connect(self) -> None:
+        """Connect to the daemon, raises `OSError` if it is not running."""
+        import socket
+
+        if not hasattr(socket, "AF_UNIX"):
+            raise OSError("Unix domain sockets are not supported on this platform.")
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(str(self.path))
+        except OSError:
+            sock.close()
+            raise
+        self._sock = sock
+        self._reader = sock.makefile("rb")
+
+    def call(self, op: str, *args: Any) -> Any:
+        """Run a query on the daemon.
+
+        Raises `KeyError` as the query does, `RuntimeError` for other errors of the query,
+        and `OSError` if the daemon is unreachable.
+        """
+        request = json.dumps([op, *args], ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+        with self._lock:
+            if self._sock is None or self._reader is None:
+                raise OSError("Not connected to the daemon.")
+            self._sock.sendall(request)
+            if not (line := self._reader.readline()):
+                raise ConnectionResetError("The daemon closed the connection.")
+        status, result = json.loads(line)
+        if status == STATUS_KEY_ERROR:
+            raise KeyError(result)
+        if status == STATUS_ERROR:
+            raise RuntimeError(result)
+        return result
+
+    def close(self) -> None:
+        with self._lock:
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+            if self._sock is not None:
+                self._sock.close()
+                self._sock = None
+
+
+_daemon: Optional[DaemonClient] = None
+
+
+def connect_daemon(path: Optional[Path] = None) -> bool:
+    """Answer queries by the font query daemon if it is running, instead of the in-process index.
+
+    Queries fall back to the in-process index once the daemon becomes unreachable.
+
+    Params:
+    - path: path to the daemon socket, defaults to `get_socket_path()`.
+
+    Return: whether connected.
+    """
+    global _daemon
+    client = DaemonClient(path)
+    try:
+        client.connect()
+        client.call("ping")
+    except (OSError, ValueError, RuntimeError):
+        client.close()
+        return False
+    disconnect_daemon()
+    _daemon = client
+    return True
+
+
+def disconnect_daemon() -> None:
+    """Answer queries by the in-process index again."""
+    global _daemon
+    if (daemon := _daemon) is not None:
+        _daemon = None
+        daemon.close()
+
+
+def get_daemon() -> Optional[DaemonClient]:
+    """Get the connection to the daemon answering queries, or None if queries are answered in process."""
+    return _daemon
+
+
+def _query_daemon(op: str, *args: Any) -> tuple[bool, Any]:
+    """Run a query on the daemon if connected.
+
+    Return: (True, result) if answered, or (False, None) to answer it in process.
+    """
+    if (daemon := _daemon) is None:
+        return False, None
+    try:
+        return True, daemon.call(op, *args)
+    except (OSError, ValueError):
+        if _daemon is daemon:
+            disconnect_daemon()
+        return False, None
@@ -0,0 +1,346 @@
+"""Memory-lean storage of font references for very large font collections.
+
+Names and paths are interned into tables, and faces are stored as integer ids
+in array-backed columns (family id, style id, path id, collection index).
+`FontRef`s are created on access.
+
+Enabled by setting `PYFONTRA_COMPACT_INDEX=1` before importing fontra.
+"""
+
+from array import array
+from collections import Counter
+from collections.abc import Hashable, Iterable, Iterator, Mapping, MutableMapping
+from itertools import chain
+from pathlib import Path
+from typing import Generic, Optional, TypeVar, cast
+
+from .ngram import NgramIndex, normalize_name
+from .typing import FontFamilyName, FontRef, StyleName
+
+T = TypeVar("T", bound=Hashable)
+
+_ABSENT = -1
+_EMPTY = -2
+_END = -1
+
+
+class InternTable(Generic[T]):
+    """A table assigning sequential integer ids to distinct values."""
+
+    def __init__(self) -> None:
+        self._ids: dict[T, int] = {}
+        self._values: list[T] = []
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __getitem__(self, id_: int) -> T:
+        return self._values[id_]
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self._values)
+
+    def intern(self, value: T) -> int:
+        """Get the id of a value, adding it to the table if missing."""
+        if (id_ := self._ids.get(value)) is None:
+            id_ = self._ids[value] = len(self._values)
+            self._values.append(value)
+        return id_
+
+    def lookup(self, value: object) -> Optional[int]:
+        """Get the id of a value, or None if it is not in the table."""
+        # any value is looked up like in a dict, values of other types are just missing
+        return self._ids.get(cast(T, value))
+
+    def clear(self) -> None:
+        self._ids.clear()
+        self._values.clear()
+
+    def copy(self) -> "InternTable[T]":
+        table: InternTable[T] = InternTable()
+        table._ids = dict(self._ids)
+        table._values = list(self._values)
+        return table
+
+
+class FamilyView(MutableMapping[StyleName, FontRef]):
+    """Dict-style view of the styles of a font family in a `CompactFontRefIndex`."""
+
+    def __init__(self, index: "CompactFontRefIndex", family: FontFamilyName) -> None:
+        self._index = index
+        self._family = family
+
+    def _find(self, style: object) -> int:
+        index = self._index
+        if (style_id := index.styles.lookup(style)) is None:
+            return _END
+        for row in index._rows(self._family):
+            if index.style_ids[row] == style_id:
+                return row
+        return _END
+
+    def __getitem__(self, style: StyleName) -> FontRef:
+        if (row := self._find(style)) == _END:
+            raise KeyError(style)
+        return self._index.get_fontref(row)
+
+    def __setitem__(self, style: StyleName, fontref: FontRef) -> None:
+        self._index.set_fontref(self._family, style, fontref)
+
+    def __delitem__(self, style: StyleName) -> None:
+        if (row := self._find(style)) == _END:
+            raise KeyError(style)
+        self._index._unlink_row(row)
+
+    def __contains__(self, style: object) -> bool:
+        return self._find(style) != _END
+
+    def __iter__(self) -> Iterator[StyleName]:
+        index = self._index
+        return (index.styles[index.style_ids[row]] for row in index._rows(self._family))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._index._rows(self._family))
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class CompactFontRefIndex(MutableMapping[FontFamilyName, MutableMapping[StyleName, FontRef]]):
+    """A drop-in replacement for the `dict[FontFamilyName, dict[StyleName, FontRef]]` indexes.
+
+    Each family name, style name and font file path is stored once, and each face costs
+    20 bytes in the columns, with no per-family container. Styles of a family are linked rows.
+    Rows of removed faces are reused, while names and paths stay in the tables until cleared.
+
+    Unlike a dict, a removed and re-added family keeps its original iteration position.
+    """
+
+    def __init__(self) -> None:
+        self.families: InternTable[FontFamilyName] = InternTable()
+        self.styles: InternTable[StyleName] = InternTable()
+        self.paths: InternTable[Path] = InternTable()
+        self.family_ids = array("I")
+        self.style_ids = array("I")
+        self.path_ids = array("I")
+        self.banks = array("I")
+        self.next_rows = array("i")
+        # first row of each family id, or _ABSENT / _EMPTY
+        self._heads = array("i")
+        self._free = array("I")
+        self._len = 0
+
+    def _head(self, family: object) -> int:
+        if (family_id := self.families.lookup(family)) is None:
+            return _ABSENT
+        return self._heads[family_id]
+
+    def _rows(self, family: FontFamilyName) -> Iterator[int]:
+        row = self._head(family)
+        while row >= 0:
+            yield row
+            row = self.next_rows[row]
+
+    def _add_family(self, family: FontFamilyName) -> int:
+        family_id = self.families.intern(family)
+        if family_id == len(self._heads):
+            self._heads.append(_ABSENT)
+        if self._heads[family_id] == _ABSENT:
+            self._heads[family_id] = _EMPTY
+            self._len += 1
+        return family_id
+
+    def _unlink_row(self, row: int) -> None:
+        family_id = self.family_ids[row]
+        if (prev := self._heads[family_id]) == row:
+            self._heads[family_id] = self.next_rows[row] if self.next_rows[row] >= 0 else _EMPTY
+        else:
+            while self.next_rows[prev] != row:
+                prev = self.next_rows[prev]
+            self.next_rows[prev] = self.next_rows[row]
+        self._free.append(row)
+
+    def get_fontref(self, row: int) -> FontRef:
+        """Get the font reference stored in a row."""
+        return FontRef(self.paths[self.path_ids[row]], self.banks[row])
+
+    def set_fontref(self, family: FontFamilyName, style: StyleName, fontref: FontRef) -> None:
+        """Same as `index.setdefault(family, {})[style] = fontref` on a dict index."""
+        family_id = self._add_family(family)
+        style_id = self.styles.intern(style)
+        path_id = self.paths.intern(fontref.path)
+        tail = _END
+        for row in self._rows(family):
+            if self.style_ids[row] == style_id:
+                self.path_ids[row] = path_id
+                self.banks[row] = fontref.bank
+                return
+            tail = row
+        if self._free:
+            row = self._free.pop()
+            self.family_ids[row] = family_id
+            self.style_ids[row] = style_id
+            self.path_ids[row] = path_id
+            self.banks[row] = fontref.bank
+            self.next_rows[row] = _END
+        else:
+            row = len(self.family_ids)
+            self.family_ids.append(family_id)
+            self.style_ids.append(style_id)
+            self.path_ids.append(path_id)
+            self.banks.append(fontref.bank)
+            self.next_rows.append(_END)
+        if tail == _END:
+            self._heads[family_id] = row
+        else:
+            self.next_rows[tail] = row
+
+    def __getitem__(self, family: FontFamilyName) -> MutableMapping[StyleName, FontRef]:
+        if self._head(family) == _ABSENT:
+            raise KeyError(family)
+        return FamilyView(self, family)
+
+    def __setitem__(self, family: FontFamilyName, styles: Mapping[StyleName, FontRef]) -> None:
+        styles = dict(styles)
+        if family in self:
+            for row in list(self._rows(family)):
+                self._unlink_row(row)
+        self._add_family(family)
+        for style, fontref in styles.items():
+            self.set_fontref(family, style, fontref)
+
+    def __delitem__(self, family: FontFamilyName) -> None:
+        if (family_id := self.families.lookup(family)) is None or self._heads[family_id] == _ABSENT:
+            raise KeyError(family)
+        self._free.extend(self._rows(family))
+        self._heads[family_id] = _ABSENT
+        self._len -= 1
+
+    def __contains__(self, family: object) -> bool:
+        return self._head(family) != _ABSENT
+
+    def __iter__(self) -> Iterator[FontFamilyName]:
+        return (
+            family for family, head in zip(self.families, self._heads) if head != _ABSENT
+        )
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._len} families, {len(self.family_ids) - len(self._free)} faces)"
+
+    def setdefault(  # pyright: ignore[reportIncompatibleMethodOverride]
+        self, family: FontFamilyName, default: Mapping[StyleName, FontRef] = {}
+    ) -> MutableMapping[StyleName, FontRef]:
+        """Get the styles of a family, adding it with `default` styles if missing."""
+        if family not in self:
+            self[family] = default
+        return FamilyView(self, family)
+
+    def clear(self) -> None:
+        for table in (self.families, self.styles, self.paths):
+            table.clear()
+        for column in (
+            self.family_ids, self.style_ids, self.path_ids, self.banks,
+            self.next_rows, self._heads, self._free
+        ):
+            del column[:]
+        self._len = 0
+
+    def copy(self) -> "CompactFontRefIndex":
+        index = CompactFontRefIndex()
+        index.families = self.families.copy()
+        index.styles = self.styles.copy()
+        index.paths = self.paths.copy()
+        index.family_ids = array("I", self.family_ids)
+        index.style_ids = array("I", self.style_ids)
+        index.path_ids = array("I", self.path_ids)
+        index.banks = array("I", self.banks)
+        index.next_rows = array("i", self.next_rows)
+        index._heads = array("i", self._heads)
+        index._free = array("I", self._free)
+        index._len = self._len
+        return index
+
+
+class CompactNgramIndex(NgramIndex):
+    """A `NgramIndex` storing posting lists as arrays of name ids.
+
+    Normalized names are computed again on queries instead of being stored.
+    Removed names are skipped on queries, and purged from posting lists
+    once they outnumber the indexed ones.
+    """
+
+    def __init__(self, names: Iterable[str] = (), n: int = 3) -> None:
+        self._ids: dict[str, int] = {}
+        self._names: list[Optional[str]] = []
+        self._id_postings: dict[str, array[int]] = {}
+        self._live = 0
+        super().__init__(names, n)
+
+    def __len__(self) -> int:
+        return self._live
+
+    def __contains__(self, name: object) -> bool:
+        return (
+            isinstance(name, str) and (id_ := self._ids.get(name)) is not None and self._names[id_] is not None
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name in self._names if name is not None)
+
+    def add(self, name: str) -> None:
+        if (id_ := self._ids.get(name)) is not None:
+            if self._names[id_] is None:
+                # still in the posting lists
+                self._names[id_] = name
+                self._live += 1
+            return
+        id_ = self._ids[name] = len(self._names)
+        self._names.append(name)
+        self._live += 1
+        for gram in self._ngrams(normalize_name(name)):
+            self._own_ids(self._id_postings, self._owned, gram).append(id_)
+
+    @staticmethod
+    def _own_ids(postings: "dict[str, array[int]]", owned: set[str], key: str) -> "array[int]":
+        """Get a posting list to append to, copying it first if shared."""
+        if key not in owned:
+            postings[key] = array("I", postings.get(key, ()))
+            owned.add(key)
+        return postings[key]
+
+    def discard(self, name: str) -> None:
+        if (id_ := self._ids.get(name)) is None or self._names[id_] is None:
+            return
+        self._names[id_] = None
+        self._live -= 1
+        if len(self._names) - self._live > self._live:
+            names = [x for x in self._names if x is not None]
+            self.clear()
+            for x in names:
+                self.add(x)
+
+    def clear(self) -> None:
+        self._ids.clear()
+        self._names.clear()
+        self._id_postings.clear()
+        self._owned.clear()
+        self._live = 0
+
+    def copy(self) -> "CompactNgramIndex":
+        """Get a copy sharing posting lists with the index, until either one appends to them."""
+        index = CompactNgramIndex(n=self.n)
+        index._ids = dict(self._ids)
+        index._names = list(self._names)
+        index._id_postings = dict(self._id_postings)
+        index._live = self._live
+        self._owned = set()
+        return index
+
+    def _count_shared(self, query: str) -> dict[str, int]:
+        shared = Counter(chain.from_iterable(self._id_postings.get(gram, ()) for gram in self._ngrams(query)))
+        return {
+            name: count for id_, count in shared.items() if (name := self._names[id_]) is not None
+        }
@@ -3,6 +3,7 @@ SUPPORTED_EXT: tuple[str, ...] = (
     ".pfa", ".pfb", ".pcf", ".fnt", ".bdf", ".pfr"
 )
 SUPPORTED_EXT += tuple(f.upper() for f in SUPPORTED_EXT)  # pyright: ignore[reportConstantRedefinition]
+COLLECTION_EXT: tuple[str, ...] = tuple(f for f in SUPPORTED_EXT if f.lower() in (".ttc", ".otc"))
 
 TT_MS_ENCODING_MAPPING = [
     "utf-16-be", "utf-16-be", "sjis", "cp936", "big5", "cp949", "johab",
@@ -12,4 +13,21 @@ TT_MAC_ENCODING_MAPPING = [
     "mac-roman", "sjis", "big5", "euc-kr", "mac-arabic", "hebrew",
     "mac-greek", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "",
     "", "", "", "", "", "", "", "", "", "", ""
-]  # undone as less use
\ No newline at end of file
+]  # undone as less use
+
+# from `freetype.ft_enums`, without loading FreeType
+TT_PLATFORM_APPLE_UNICODE = 0
+TT_PLATFORM_MACINTOSH = 1
+TT_PLATFORM_MICROSOFT = 3
+
+TT_NAME_ID_FONT_FAMILY = 1
+TT_NAME_ID_FONT_SUBFAMILY = 2
+TT_NAME_ID_PREFERRED_FAMILY = 16
+TT_NAME_ID_PREFERRED_SUBFAMILY = 17
+
+SLANT_ROMAN = 0
+SLANT_ITALIC = 1
+SLANT_OBLIQUE = 2
+
+FT_STYLE_FLAG_ITALIC = 1
+FT_STYLE_FLAG_BOLD = 2
@@ -0,0 +1,99 @@
+"""Unicode coverage index of font faces."""
+
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator
+
+from .typing import FontRef
+
+PAGE_BITS = 8
+
+
+class CoverageIndex:
+    """An inverted index from codepoint pages (256 codepoints each) to faces,
+    with per-face range lists to check exact coverage.
+    """
+
+    def __init__(self) -> None:
+        # arrays take 4 bytes per codepoint instead of a pointer and an int object
+        self._starts: dict[FontRef, array[int]] = {}
+        self._ends: dict[FontRef, array[int]] = {}
+        self._pages: dict[int, set[FontRef]] = {}
+        # pages owned by this index, others are shared with copies and copied before modified
+        self._owned: set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __iter__(self) -> Iterator[FontRef]:
+        return iter(self._starts)
+
+    def __contains__(self, fontref: object) -> bool:
+        return fontref in self._starts
+
+    @staticmethod
+    def _pages_of(starts: "array[int]", ends: "array[int]") -> set[int]:
+        return {
+            page for start, end in zip(starts, ends)
+            for page in range(start >> PAGE_BITS, (end >> PAGE_BITS) + 1)
+        }
+
+    def add(self, fontref: FontRef, ranges: Iterable[tuple[int, int]]) -> None:
+        self.discard(fontref)
+        starts = self._starts[fontref] = array("I")
+        ends = self._ends[fontref] = array("I")
+        for start, end in ranges:
+            starts.append(start)
+            ends.append(end)
+        for page in self._pages_of(starts, ends):
+            self._own(page).add(fontref)
+
+    def discard(self, fontref: FontRef) -> None:
+        if (starts := self._starts.pop(fontref, None)) is None:
+            return
+        for page in self._pages_of(starts, self._ends.pop(fontref)):
+            if len(self._pages[page]) == 1:
+                del self._pages[page]
+                self._owned.discard(page)
+            else:
+                self._own(page).discard(fontref)
+
+    def _own(self, page: int) -> set[FontRef]:
+        """Get the faces of a page to modify, copying them first if shared."""
+        if page not in self._owned:
+            self._pages[page] = set(self._pages.get(page, ()))
+            self._owned.add(page)
+        return self._pages[page]
+
+    def clear(self) -> None:
+        self._starts.clear()
+        self._ends.clear()
+        self._pages.clear()
+        self._owned.clear()
+
+    def copy(self) -> "CoverageIndex":
+        # range arrays are replaced, never modified, and pages are copied once modified, so both are shared
+        index = CoverageIndex()
+        index._starts = dict(self._starts)
+        index._ends = dict(self._ends)
+        index._pages = dict(self._pages)
+        self._owned = set()
+        return index
+
+    def covers(self, fontref: FontRef, codepoint: int) -> bool:
+        """Check whether a face covers a codepoint."""
+        if (starts := self._starts.get(fontref)) is None:
+            return False
+        i = bisect_right(starts, codepoint) - 1
+        return i >= 0 and codepoint <= self._ends[fontref][i]
+
+    def faces_covering(self, codepoint: int) -> set[FontRef]:
+        """Get all faces covering a codepoint."""
+        return {
+            fontref for fontref in self._pages.get(codepoint >> PAGE_BITS, ())
+            if self.covers(fontref, codepoint)
+        }
+
+    def get_ranges(self, fontref: FontRef) -> list[tuple[int, int]]:
+        """Get the codepoint ranges covered by a face."""
+        return list(zip(self._starts.get(fontref, ()), self._ends.get(fontref, ())))
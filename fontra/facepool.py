@@ -0,0 +1,100 @@
+"""Bounded LRU pool of FreeType faces opened from font references."""
+
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Optional
+
+from typing_extensions import NamedTuple
+
+from .cache import FileStamp, get_file_stamp
+from .fontdb import _ft_open_face
+from .typing import FontRef
+
+if TYPE_CHECKING:
+    import freetype
+
+
+class FacePoolInfo(NamedTuple):
+    """Statistics of the face pool."""
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+    max_bytes: int
+    currbytes: int
+
+
+class _PooledFace(NamedTuple):
+    face: "freetype.Face"
+    stamp: FileStamp
+
+
+class FacePool:
+    """A thread-safe LRU pool of `freetype.Face` objects keyed by font references.
+
+    Faces are evicted once the pool holds more than `maxsize` faces, or font files
+    larger than `max_bytes` in total (an approximation of the memory held by FreeType).
+    A face is opened again when its file changes on disk.
+
+    Pooled faces are shared by all callers, so rendering with a face from multiple threads
+    needs to be serialized by the callers.
+    """
+
+    def __init__(self, maxsize: int = 64, max_bytes: int = 256 << 20) -> None:
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[FontRef, _PooledFace]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _evict(self, fontref: FontRef) -> None:
+        entry = self._entries.pop(fontref)
+        self._bytes -= entry.stamp[0]
+
+    def _shrink(self) -> None:
+        while self._entries and (len(self._entries) > self.maxsize or self._bytes > self.max_bytes):
+            self._evict(next(iter(self._entries)))
+
+    def open_face(self, fontref: FontRef) -> "freetype.Face":
+        """Get the face of a font reference, opening it if not pooled or changed on disk.
+
+        Faces are opened with the pool locked, as FreeType faces share one library handle.
+        """
+        stamp = get_file_stamp(fontref.path)
+        with self._lock:
+            if (entry := self._entries.get(fontref)) is not None:
+                if entry.stamp == stamp:
+                    self._entries.move_to_end(fontref)
+                    self.hits += 1
+                    return entry.face
+                self._evict(fontref)
+            self.misses += 1
+            face = _ft_open_face(fontref.path, fontref.bank)
+            if stamp is not None and stamp[0] <= self.max_bytes and self.maxsize > 0:
+                self._entries[fontref] = _PooledFace(face, stamp)
+                self._bytes += stamp[0]
+                self._shrink()
+            return face
+
+    def resize(self, maxsize: Optional[int] = None, max_bytes: Optional[int] = None) -> None:
+        """Change limits of the pool, evicting faces beyond them."""
+        with self._lock:
+            if maxsize is not None:
+                self.maxsize = maxsize
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            self._shrink()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = 0
+
+    def info(self) -> FacePoolInfo:
+        with self._lock:
+            return FacePoolInfo(
+                self.hits, self.misses, self.maxsize, len(self._entries), self.max_bytes, self._bytes
+            )
@@ -1,25 +1,794 @@
 import os
 import sys
-import traceback
+import threading
+import time
 import warnings
-from itertools import chain
+from collections.abc import Iterable, Mapping, MutableMapping, Sequence
+from contextlib import AbstractContextManager, nullcontext
+from functools import partial
+from itertools import chain, count
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Optional, Union
 
-import freetype
-import freetype.ft_errors
+from typing_extensions import NamedTuple
 
-from .consts import SUPPORTED_EXT
-from .locutil import get_font_names, get_localized_family_name, get_preferred_names
-from .typing import FontFamilyName, FontRef, StyleName
+from .cache import CacheEntry, get_file_stamp, load_cache, save_cache
+from .client import _query_daemon
+from .compact import CompactFontRefIndex, CompactNgramIndex
+from .consts import (
+    FT_STYLE_FLAG_BOLD,
+    FT_STYLE_FLAG_ITALIC,
+    SLANT_ITALIC,
+    SLANT_ROMAN,
+)
+from .coverage import CoverageIndex
+from .layers import (
+    LayeredCoverageIndex,
+    LayeredFamilies,
+    LayeredLangnames,
+    LayeredNgramIndex,
+    LayeredPrefixIndex,
+)
+from .locutil import (
+    get_font_names,
+    get_localized_family_name,
+    get_preferred_names,
+    get_sfnt_names,
+)
+from .ngram import NgramIndex
+from .prefix import PrefixIndex
+from .query import (
+    _find_family,
+    _find_font,
+    _find_style,
+    _get_family,
+    _get_font,
+    _get_font_styles,
+    _get_style,
+    _match_font_names,
+    _match_font_styles,
+)
+from .querycache import QueryCache
+from .sfnt import read_sfnt_faces, to_ranges
+from .stats import FailedFile, FileCost, _emit, _phase, _publish, _update_counts
+from .typing import (
+    FaceRecord,
+    FontAttributes,
+    FontFamilyName,
+    FontNameMatch,
+    FontRef,
+    FontRefIndex,
+    FontResolution,
+    NameKind,
+    SfntName,
+    StyleName,
+)
+from .walker import FileKey, FontFileWalker, get_file_key
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    import freetype
 
 FONTDIRS_SYSTEM: list[Path] = []
 FONTDIRS_CUSTOM: list[Path] = []
 _indexed_fontfiles_system: set[Path] = set()
 _indexed_fontfiles_custom: set[Path] = set()
 
-indexed_fontrefs: dict[FontFamilyName, dict[StyleName, FontRef]] = {}
-indexed_classical_fontrefs: dict[FontFamilyName, dict[StyleName, FontRef]] = {}
-indexed_langnames: dict[FontFamilyName, FontFamilyName] = {}
+
+# memory-lean index backend, see `fontra.compact`
+_compact_index = os.getenv("PYFONTRA_COMPACT_INDEX", "0") == "1"
+
+
+def _new_fontref_index() -> FontRefIndex:
+    return CompactFontRefIndex() if _compact_index else {}
+
+
+def _new_ngram_index() -> NgramIndex:
+    return CompactNgramIndex() if _compact_index else NgramIndex()
+
+
+def _copy_fontref_index(index: FontRefIndex) -> FontRefIndex:
+    if isinstance(index, CompactFontRefIndex):
+        return index.copy()
+    return dict(index)
+
+
+def _set_style(
+    index: MutableMapping[FontFamilyName, Any], family: FontFamilyName, style: StyleName, value: Any, fresh: bool
+) -> None:
+    """Same as `index.setdefault(family, {})[style] = value`,
+    but replaces the styles of the family instead of modifying them unless the index is `fresh`,
+    as they may be shared with other generations.
+    """
+    if isinstance(index, CompactFontRefIndex):
+        index.set_fontref(family, style, value)
+    elif fresh:
+        index.setdefault(family, {})[style] = value
+    else:
+        index[family] = {**index.get(family, {}), style: value}
+
+
+class FontIndex(NamedTuple):
+    """A generation of the index.
+
+    Generations are never modified once published. Rebuilds and incremental updates prepare
+    a new generation aside and publish it at once, so a query reading `get_font_index()` once
+    sees a consistent index without locking, even while the index is being updated.
+
+    Styles and localized names of each family are replaced instead of modified,
+    so a new generation shares them with the previous one, except those of updated families.
+    """
+    fontrefs: FontRefIndex
+    classical_fontrefs: FontRefIndex
+    langnames: dict[FontFamilyName, FontFamilyName]
+    localized_names: dict[FontFamilyName, dict[FontFamilyName, list[tuple[int, int, int]]]]
+    """Family name -> localized name -> (platform id, encoding id, language id) of name records."""
+    fontref_ngrams: NgramIndex
+    classical_ngrams: NgramIndex
+    coverage: CoverageIndex
+    attributes: dict[FontFamilyName, dict[StyleName, FontAttributes]]
+    names: PrefixIndex
+    generation: int = 0
+    snapshot_path: Optional[Path] = None
+    """Path of the read-only snapshot the index is a view of, see `fontra.snapshot`."""
+
+    def copy(self) -> "FontIndex":
+        """Get a copy to prepare the next generation in, sharing all data not modified afterwards."""
+        fontrefs = _copy_fontref_index(self.fontrefs)
+        classical_fontrefs = _copy_fontref_index(self.classical_fontrefs)
+        langnames = dict(self.langnames)
+        return self._replace(
+            fontrefs=fontrefs,
+            classical_fontrefs=classical_fontrefs,
+            langnames=langnames,
+            localized_names=dict(self.localized_names),
+            fontref_ngrams=self.fontref_ngrams.copy(),
+            classical_ngrams=self.classical_ngrams.copy(),
+            coverage=self.coverage.copy(),
+            attributes=dict(self.attributes),
+            names=self.names.copy(fontrefs, langnames, classical_fontrefs),
+        )
+
+
+def _new_font_index() -> FontIndex:
+    fontrefs, classical_fontrefs = _new_fontref_index(), _new_fontref_index()
+    langnames: dict[FontFamilyName, FontFamilyName] = {}
+    return FontIndex(
+        fontrefs, classical_fontrefs, langnames, {},
+        _new_ngram_index(), _new_ngram_index(), CoverageIndex(), {},
+        PrefixIndex(fontrefs, langnames, classical_fontrefs)
+    )
+
+
+def layer_font_index(overlay: FontIndex, base: FontIndex) -> FontIndex:
+    """Get a read-only view of an index layered over another one, see `fontra.layers`.
+
+    The generation of the view changes whenever either index changes.
+    """
+    fontrefs: Any = LayeredFamilies(overlay.fontrefs, base.fontrefs)
+    classical_fontrefs: Any = LayeredFamilies(overlay.classical_fontrefs, base.classical_fontrefs)
+    langnames: Any = LayeredLangnames(overlay.langnames, base.langnames)
+    localized_names: Any = LayeredFamilies(overlay.localized_names, base.localized_names)
+    attributes: Any = LayeredFamilies(overlay.attributes, base.attributes)
+    return FontIndex(
+        fontrefs, classical_fontrefs, langnames, localized_names,
+        LayeredNgramIndex(overlay.fontref_ngrams, base.fontref_ngrams, fontrefs),
+        LayeredNgramIndex(overlay.classical_ngrams, base.classical_ngrams, classical_fontrefs),
+        LayeredCoverageIndex(overlay.coverage, base.coverage), attributes,
+        LayeredPrefixIndex(overlay.names, base.names, langnames),
+        overlay.generation + base.generation,
+    )
+
+
+class FontDB:
+    """A font database, indexing font files of its directories.
+
+    Module-level functions query and update the default database (see `get_fontdb()`)
+    of `FONTDIRS_SYSTEM` and `FONTDIRS_CUSTOM`.
+
+    A database created with a base database is an overlay of it, like a tenant sharing the default database:
+    queries consult the index of the overlay first and then the one of the base,
+    while updating the overlay only scans its own font files, and never modifies the base.
+
+    Params:
+    - fontdirs: font directories to index by `update()`.
+    - base: database to layer the index over, None for a standalone database.
+    """
+
+    # whether updates are reported to `fontra.stats`, only done for the default database
+    _stats = False
+
+    def __init__(self, fontdirs: Iterable[Path] = (), *, base: Optional["FontDB"] = None) -> None:
+        self._fontdirs = list(fontdirs)
+        self.base = base
+        self.query_cache = QueryCache()
+        # serializes updates of the index, queries never take it
+        self._lock = threading.RLock()
+        self._index = _new_font_index()
+        self._index.names.sort()
+        # (own index, base index, layered view) of the last query
+        self._layered: Optional[tuple[FontIndex, FontIndex, FontIndex]] = None
+        self._walker = FontFileWalker()
+        # (device, inode) of walked and added font files, each physical file is indexed by one path
+        self._file_keys: dict[Path, FileKey] = {}
+        # font files contributing to each key of the current index, for incremental updates
+        self._entries: dict[Path, CacheEntry] = {}
+        # number of faces in `_entries`, counted on updates instead of on each report
+        self._faces = 0
+        self._order: dict[Path, int] = {}
+        self._counter = count()
+        self._fontref_sources: dict[FontFamilyName, set[Path]] = {}
+        self._classical_sources: dict[FontFamilyName, set[Path]] = {}
+        self._langname_sources: dict[FontFamilyName, set[Path]] = {}
+        self._indexed_keys: dict[FileKey, Path] = {}
+
+    @property
+    def fontdirs(self) -> list[Path]:
+        """Font directories indexed by `update()`."""
+        return self._fontdirs
+
+    def get_font_index(self) -> FontIndex:
+        """Get the current generation of the index, layered over the one of the base database if any."""
+        if self.base is None:
+            return self._index
+        own, base = self._index, self.base.get_font_index()
+        if (layered := self._layered) is not None and layered[0] is own and layered[1] is base:
+            return layered[2]
+        index = layer_font_index(own, base)
+        self._layered = (own, base, index)
+        return index
+
+    def get_index_generation(self) -> int:
+        """Get the generation of the index, which changes whenever it or the index of the base database is modified."""
+        return self.get_font_index().generation
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Wait until the base database is ready, see `wait_fontdb(...)`."""
+        if self.base is not None:
+            self.base.wait(timeout)
+
+    def walk(self, directories: Sequence[Path]) -> set[Path]:
+        """List font files in directories, those unchanged since the last walk are not listed again (see `fontra.walker`)."""
+        fontfiles = self._walker.walk(directories)
+        self._file_keys.update(fontfiles)
+        return set(fontfiles)
+
+    def update(self, *, workers: Optional[int] = None) -> None:
+        """Rebuild the index from font files in `fontdirs`.
+
+        Params:
+        - workers: number of processes to load font files with, loads serially if not greater than 1.
+        """
+        with self._phase("walk"):
+            fontfiles = self.walk(self.fontdirs)
+        self._rebuild(sorted(fontfiles), workers=workers)
+
+    def _phase(self, phase: str, rebuild: bool = True) -> "AbstractContextManager[None]":
+        return _phase(phase, rebuild) if self._stats else nullcontext()
+
+    def _rebuild(self, fontfiles: Iterable[Path], *, use_cache: bool = False, workers: Optional[int] = None) -> None:
+        fontfiles = _drop_duplicates(dict.fromkeys(fontfiles), self._file_keys, {})
+        with self._phase("cache_load"):
+            cached = load_cache() if use_cache else {}
+        with self._phase("stat"):
+            stamps = {fn: stamp for fn in fontfiles if (stamp := get_file_stamp(fn)) is not None}
+            pending = [
+                fn for fn, stamp in stamps.items()
+                if (entry := cached.get(fn)) is None or entry.stamp != stamp
+            ]
+        with self._phase("scan"):
+            scanned = dict(zip(pending, _scan_font_files(pending, workers, rebuild=True, emit=self._stats)))
+
+        with self._phase("index"), self._lock:
+            index = _new_font_index()
+            self._clear_provenance()
+            for fn in fontfiles:
+                if fn not in stamps:
+                    continue
+                if fn in scanned:
+                    self._index_fontfile(index, fn, CacheEntry(stamps[fn], scanned[fn]), fresh=True)
+                else:
+                    self._index_fontfile(index, fn, cached[fn], fresh=True)
+            self._publish_index(index)
+            entries = dict(self._entries)
+            counts = self._counts()
+        # the cache may have entries of font files indexed by other processes
+        if use_cache and entries != {fn: entry for fn in fontfiles if (entry := cached.get(fn)) is not None}:
+            with self._phase("cache_save"):
+                save_cache(entries, scope=set(fontfiles))
+        if self._stats:
+            _publish(len(stamps) - len(pending), counts)
+
+    def add_font_files(self, paths: Iterable[Path], *, workers: Optional[int] = None) -> set[FontFamilyName]:
+        """Add font files into the index, without rebuilding it, see `fontra.add_font_files(...)`."""
+        self._check_writable()
+        stamps = {fn: stamp for fn in paths if (stamp := get_file_stamp(fn)) is not None}
+        with self._lock:
+            pending = [
+                fn for fn, stamp in stamps.items()
+                if (entry := self._entries.get(fn)) is None or entry.stamp != stamp
+            ]
+            if not pending:
+                return set()
+            index = self._index.copy()
+            families = self._unindex_fontfiles(index, set(pending))
+            for fn in pending:
+                if (key := get_file_key(fn)) is not None:
+                    self._file_keys[fn] = key
+            pending = _drop_duplicates(pending, self._file_keys, self._indexed_keys)
+            for fn, faces in zip(pending, _scan_font_files(pending, workers, emit=self._stats)):
+                self._index_fontfile(index, fn, CacheEntry(stamps[fn], faces))
+                families.update(record.family for record in faces or ())
+            self._publish_index(index)
+            if self._stats:
+                _update_counts(self._counts())
+        return families
+
+    def remove_font_files(self, paths: Iterable[Path]) -> set[FontFamilyName]:
+        """Remove font files from the index, without rebuilding it, see `fontra.remove_font_files(...)`."""
+        self._check_writable()
+        fns = set(paths)
+        with self._lock:
+            if fns.isdisjoint(self._entries):
+                return set()
+            index = self._index.copy()
+            families = self._unindex_fontfiles(index, fns)
+            for fn in fns:
+                self._file_keys.pop(fn, None)
+            self._publish_index(index)
+            if self._stats:
+                _update_counts(self._counts())
+        return families
+
+    def refresh_directory(self, path: Path, *, workers: Optional[int] = None) -> set[FontFamilyName]:
+        """Synchronize the index with font files in a directory, see `fontra.refresh_directory(...)`."""
+        with self._phase("walk", rebuild=False):
+            fontfiles = self.walk([path])
+        with self._lock:
+            removed = {fn for fn in self._entries if fn.is_relative_to(path)} - fontfiles
+        families = self.remove_font_files(removed)
+        families.update(self.add_font_files(sorted(fontfiles), workers=workers))
+        return families
+
+    def _publish_index(self, index: FontIndex) -> None:
+        """Make a prepared index current, with the lock held."""
+        index.names.sort()
+        self._index = index._replace(generation=self._index.generation + 1)
+
+    def _clear_provenance(self) -> None:
+        self._entries.clear()
+        self._faces = 0
+        self._order.clear()
+        self._fontref_sources.clear()
+        self._classical_sources.clear()
+        self._langname_sources.clear()
+        self._indexed_keys.clear()
+
+    def _replace_index(self, index: FontIndex) -> None:
+        """Make an index not loaded from font files current, like a snapshot."""
+        with self._lock:
+            self._clear_provenance()
+            self._publish_index(index)
+
+    def _check_writable(self) -> None:
+        if (snapshot_path := self._index.snapshot_path) is not None:
+            raise RuntimeError(
+                f"The index is a read-only snapshot of {str(snapshot_path)!r}."
+                " Rebuild it with `update_fontrefs_index()` first."
+            )
+
+    def _index_fontfile(self, index: FontIndex, fn: Path, entry: CacheEntry, *, fresh: bool = False) -> None:
+        self._entries[fn] = entry
+        self._faces += len(entry.faces or ())
+        self._order[fn] = next(self._counter)
+        if (key := self._file_keys.get(fn)) is not None:
+            self._indexed_keys[key] = fn
+        for record in entry.faces or ():
+            _update_fontref_index(index, fn, record, fresh=fresh)
+            index.coverage.add(FontRef(fn, record.bank), record.coverage)
+            self._fontref_sources.setdefault(record.family, set()).add(fn)
+            for name, _ in record.classical:
+                self._classical_sources.setdefault(name, set()).add(fn)
+            for name, *_ in record.langnames:
+                self._langname_sources.setdefault(name, set()).add(fn)
+
+    def _unindex_fontfiles(self, index: FontIndex, fns: set[Path]) -> set[FontFamilyName]:
+        families: set[FontFamilyName] = set()
+        names: set[FontFamilyName] = set()
+        langnames: set[FontFamilyName] = set()
+        for fn in fns:
+            if (entry := self._entries.pop(fn, None)) is None:
+                continue
+            self._faces -= len(entry.faces or ())
+            del self._order[fn]
+            if (key := self._file_keys.get(fn)) is not None and self._indexed_keys.get(key) == fn:
+                del self._indexed_keys[key]
+            for record in entry.faces or ():
+                index.coverage.discard(FontRef(fn, record.bank))
+                families.add(record.family)
+                names.update(name for name, _ in record.classical)
+                langnames.update(name for name, *_ in record.langnames)
+        # withdraw affected keys, then restore them from the remaining font files
+        contributors: set[Path] = set()
+        withdrawals: tuple[tuple[
+            NameKind, set[FontFamilyName], MutableMapping[FontFamilyName, Any],
+            dict[FontFamilyName, set[Path]], Optional[NgramIndex],
+        ], ...] = (
+            ("family", families, index.fontrefs, self._fontref_sources, index.fontref_ngrams),
+            ("classical", names, index.classical_fontrefs, self._classical_sources, index.classical_ngrams),
+            ("localized", langnames, index.langnames, self._langname_sources, None),
+        )
+        for kind, keys, mapping, sources, ngrams in withdrawals:
+            for name in keys:
+                if mapping is index.langnames:
+                    _withdraw_localized_name(index, name)
+                elif mapping is index.fontrefs:
+                    del index.attributes[name]
+                del mapping[name]
+                index.names.discard(kind, name)
+                if ngrams is not None:
+                    ngrams.discard(name)
+                sources[name].difference_update(fns)
+                if sources[name]:
+                    contributors.update(sources[name])
+                else:
+                    del sources[name]
+        for fn in sorted(contributors, key=self._order.__getitem__):
+            for record in self._entries[fn].faces or ():
+                _update_fontref_index(index, fn, record, (families, names, langnames))
+        return families
+
+    def _counts(self) -> tuple[int, int, int, int, int]:
+        return (
+            len(self._entries),
+            self._faces,
+            len(self._index.fontrefs),
+            len(self._index.classical_fontrefs),
+            len(self._index.langnames),
+        )
+
+    def all_fonts(self, *, classical: bool = False) -> list[FontFamilyName]:
+        """See `fontra.all_fonts(...)`."""
+        self.wait()
+        index = self.get_font_index()
+        return list(index.classical_fontrefs if classical else index.fontrefs)
+
+    def get_unlocalized_name(self, name: FontFamilyName) -> FontFamilyName:
+        """See `fontra.get_unlocalized_name(...)`."""
+        self.wait()
+        return self.get_font_index().langnames.get(name, name)
+
+    def complete_font_names(
+        self, prefix: str, limit: Optional[int] = 10, *, localized: bool = True, classical: bool = False
+    ) -> list[FontNameMatch]:
+        """See `fontra.complete_font_names(...)`."""
+        self.wait()
+        kinds: list[NameKind] = ["family"]
+        if localized:
+            kinds.append("localized")
+        if classical:
+            kinds.append("classical")
+        return self.get_font_index().names.complete(prefix, kinds, limit)
+
+    def get_localized_names(self, name: FontFamilyName) -> list[FontFamilyName]:
+        """See `fontra.get_localized_names(...)`."""
+        self.wait()
+        return list(self.get_font_index().localized_names.get(name, ()))
+
+    def get_localized_name(
+        self, name: FontFamilyName, language_id: int, *, platform_id: Optional[int] = None
+    ) -> Optional[FontFamilyName]:
+        """See `fontra.get_localized_name(...)`."""
+        self.wait()
+        for locname, ids in self.get_font_index().localized_names.get(name, {}).items():
+            if any(
+                lid == language_id and (platform_id is None or pid == platform_id)
+                for pid, _, lid in ids
+            ):
+                return locname
+        return None
+
+    def fonts_covering(self, text: str) -> list[FontRef]:
+        """See `fontra.fonts_covering(...)`."""
+        self.wait()
+        codepoints = {ord(char) for char in text}
+        if not codepoints:
+            return []
+        first, *rest = codepoints
+        coverage = self.get_font_index().coverage
+        return sorted(
+            fontref for fontref in coverage.faces_covering(first)
+            if all(coverage.covers(fontref, cp) for cp in rest)
+        )
+
+    def get_font(
+        self, name: FontFamilyName, style: str, localized: bool = True, fuzzy: bool = False, classical: bool = False
+    ) -> FontRef:
+        """See `fontra.get_font(...)`."""
+        self.wait()
+        index = self.get_font_index()
+        return self.query_cache.get(
+            ("font", name, style, localized, fuzzy, classical),
+            lambda: _get_font(index, name, style, localized, fuzzy, classical),
+            index.generation
+        )
+
+    def resolve_fonts(
+        self,
+        requests: Iterable[tuple[FontFamilyName, StyleName]],
+        localized: bool = True,
+        fuzzy: bool = False,
+        classical: bool = False,
+    ) -> list[FontResolution]:
+        """See `fontra.resolve_fonts(...)`."""
+        self.wait()
+        index = self.get_font_index()
+        families: dict[FontFamilyName, Union[FontFamilyName, KeyError]] = {}
+        resolved: dict[tuple[FontFamilyName, StyleName], FontResolution] = {}
+        results: list[FontResolution] = []
+        for name, style in requests:
+            if (result := resolved.get((name, style))) is None:
+                if (family := families.get(name)) is None:
+                    try:
+                        family = self.query_cache.get(
+                            ("family", name, localized, fuzzy, classical),
+                            partial(_get_family, index, name, localized, fuzzy, classical),
+                            index.generation
+                        )
+                    except KeyError as e:
+                        family = e
+                    families[name] = family
+                if isinstance(family, KeyError):
+                    result = FontResolution(name, style, None, family.args[0])
+                else:
+                    try:
+                        result = FontResolution(name, style, self.query_cache.get(
+                            ("font", name, style, localized, fuzzy, classical),
+                            partial(_get_style, index, family, style, fuzzy, classical),
+                            index.generation
+                        ), None)
+                    except KeyError as e:
+                        result = FontResolution(name, style, None, e.args[0])
+                resolved[(name, style)] = result
+            results.append(result)
+        return results
+
+    def get_font_styles(
+        self, name: FontFamilyName, localized: bool = True, fuzzy: bool = False, classical: bool = False
+    ) -> list[StyleName]:
+        """See `fontra.get_font_styles(...)`."""
+        self.wait()
+        index = self.get_font_index()
+        return list(self.query_cache.get(
+            ("styles", name, localized, fuzzy, classical),
+            lambda: _get_font_styles(index, name, localized, fuzzy, classical),
+            index.generation
+        ))
+
+    def find_font(
+        self,
+        name: FontFamilyName,
+        weight: int = 400,
+        width: int = 5,
+        italic: bool = False,
+        localized: bool = True,
+        fuzzy: bool = False,
+    ) -> FontRef:
+        """See `fontra.find_font(...)`."""
+        self.wait()
+        index = self.get_font_index()
+        return self.query_cache.get(
+            ("find", name, weight, width, italic, localized, fuzzy),
+            lambda: _find_font(index, name, weight, width, italic, localized, fuzzy),
+            index.generation
+        )
+
+    def fallback_chain(
+        self, name: FontFamilyName, style: str, text: str,
+        localized: bool = True, fuzzy: bool = False, classical: bool = False
+    ) -> list[FontRef]:
+        """See `fontra.fallback_chain(...)`."""
+        self.wait()
+        index = self.get_font_index()
+        coverage = index.coverage
+        chain = [_get_font(index, name, style, localized, fuzzy, classical)]
+        remaining = {
+            cp for char in text
+            if not coverage.covers(chain[0], cp := ord(char))
+        }
+        while remaining:
+            counts: dict[FontRef, int] = {}
+            for cp in remaining:
+                for fontref in coverage.faces_covering(cp):
+                    counts[fontref] = counts.get(fontref, 0) + 1
+            if not counts:
+                break
+            best = min(counts, key=lambda x: (-counts[x], x))
+            chain.append(best)
+            remaining = {cp for cp in remaining if not coverage.covers(best, cp)}
+        return chain
+
+    def has_font_family(self, name: FontFamilyName, localized: bool = True, classical: bool = False) -> bool:
+        """See `fontra.has_font_family(...)`."""
+        self.wait()
+        return _find_family(self.get_font_index(), name, localized, classical) is not None
+
+    def has_font_style(self, name: FontFamilyName, style: str, localized: bool = True, classical: bool = False) -> bool:
+        """See `fontra.has_font_style(...)`."""
+        self.wait()
+        index = self.get_font_index()
+        if (family := _find_family(index, name, localized, classical)) is None:
+            return False
+        return _find_style(index, family, style, classical) is not None
+
+    def match_font_names(
+        self, font_name: str, n: Optional[int] = None, *, cutoff: float = 0.6, classical: bool = False
+    ) -> list[str]:
+        """Get at most `n` (all if None) matches of a font name, see `fontra.match_font_names(...)`."""
+        self.wait()
+        return _match_font_names(self.get_font_index(), font_name, n, cutoff, classical)
+
+    def match_font_styles(
+        self, font_name: str, font_style: str, n: Optional[int] = None, *, cutoff: float = 0.6, classical: bool = False
+    ) -> list[str]:
+        """Get at most `n` (all if None) matches of a font style, see `fontra.match_font_styles(...)`."""
+        self.wait()
+        return _match_font_styles(self.get_font_index(), font_name, font_style, n, cutoff, classical)
+
+
+class _DefaultFontDB(FontDB):
+    """The database of `FONTDIRS_SYSTEM` and `FONTDIRS_CUSTOM`, initialized by `fontra.init_fontdb(...)`."""
+
+    _stats = True
+
+    @property
+    def fontdirs(self) -> list[Path]:
+        return get_fontdirs()
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        wait_fontdb(timeout)
+
+    def update(self, *, workers: Optional[int] = None) -> None:
+        update_system_fontfiles_index()
+        update_custom_fontfiles_index()
+        update_fontrefs_index(workers=workers)
+
+    def add_font_files(self, paths: Iterable[Path], *, workers: Optional[int] = None) -> set[FontFamilyName]:
+        paths = list(paths)
+        with self._lock:
+            families = super().add_font_files(paths, workers=workers)
+            _indexed_fontfiles_custom.update(
+                fn for fn in paths if fn in self._entries and fn not in _indexed_fontfiles_system
+            )
+        return families
+
+    def remove_font_files(self, paths: Iterable[Path]) -> set[FontFamilyName]:
+        fns = set(paths)
+        with self._lock:
+            families = super().remove_font_files(fns)
+            _indexed_fontfiles_system.difference_update(fns)
+            _indexed_fontfiles_custom.difference_update(fns)
+        return families
+
+    def refresh_directory(self, path: Path, *, workers: Optional[int] = None) -> set[FontFamilyName]:
+        if any(path.is_relative_to(directory) for directory in FONTDIRS_SYSTEM):
+            # keep them before custom font files on rebuilds, the second walk is cached
+            _indexed_fontfiles_system.update(self.walk([path]))
+        return super().refresh_directory(path, workers=workers)
+
+    def _replace_index(self, index: FontIndex) -> None:
+        global _init_future, _lazy_initializer
+        # an initialization still running in the background would publish its index over this one,
+        # unless it is the caller
+        if (future := _init_future) is not None and not getattr(_init_thread, "running", False):
+            from concurrent.futures import wait
+            wait([future])
+        with self._lock:
+            _init_future = _lazy_initializer = None
+            super()._replace_index(index)
+
+
+_default_db = _DefaultFontDB()
+# module attributes holding the index before generations
+_INDEX_FIELDS = {
+    "indexed_fontrefs": "fontrefs",
+    "indexed_classical_fontrefs": "classical_fontrefs",
+    "indexed_langnames": "langnames",
+    "indexed_localized_names": "localized_names",
+    "indexed_fontref_ngrams": "fontref_ngrams",
+    "indexed_classical_ngrams": "classical_ngrams",
+    "indexed_coverage": "coverage",
+    "indexed_attributes": "attributes",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if (field := _INDEX_FIELDS.get(name)) is not None:
+        return getattr(_default_db._index, field)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_fontdb() -> FontDB:
+    """Get the default font database, which module-level functions query and update."""
+    return _default_db
+
+
+# serializes initialization and updates of the default database, queries never take it
+_init_lock = _default_db._lock
+_init_future: "Optional[Future[None]]" = None
+_lazy_initializer: Optional[Callable[[], None]] = None
+# `running` is set in the thread initializing in the background
+_init_thread = threading.local()
+
+
+def defer_fontdb_init(initializer: Callable[[], None], *, background: bool) -> "Optional[Future[None]]":
+    """Defer initialization of the font database, queries wait for it by `wait_fontdb()`.
+
+    Params:
+    - initializer: function initializing the font database.
+    - background: whether to run it in a background thread now, otherwise it runs on the first query.
+
+    Return: a future of the initialization if running in the background, otherwise None.
+    """
+    global _init_future, _lazy_initializer
+    if not background:
+        with _init_lock:
+            _init_future, _lazy_initializer = None, initializer
+        return None
+    # imported on demand, concurrent.futures is slow to import (with logging)
+    from concurrent.futures import Future
+
+    future: "Future[None]" = Future()
+
+    def finish() -> None:
+        global _init_future
+        with _init_lock:
+            if _init_future is future:
+                _init_future = None
+
+    def run() -> None:
+        _init_thread.running = True
+        try:
+            initializer()
+        except BaseException as e:
+            future.set_exception(e)
+            # later queries run on whatever was indexed instead of raising the same error again
+            finish()
+            return
+        finish()
+        future.set_result(None)
+
+    with _init_lock:
+        _init_future, _lazy_initializer = future, None
+    threading.Thread(target=run, name="fontra-init", daemon=True).start()
+    return future
+
+
+def cancel_fontdb_init() -> None:
+    """Drop initialization deferred by `defer_fontdb_init(...)`, queries no longer wait for it.
+
+    An initialization already running in the background still finishes.
+    """
+    global _init_future, _lazy_initializer
+    with _init_lock:
+        _init_future = _lazy_initializer = None
+
+
+def wait_fontdb(timeout: Optional[float] = None) -> None:
+    """Wait until the font database initialized in the background or lazily is ready.
+
+    Params:
+    - timeout: seconds to wait at most, raises `TimeoutError` if exceeded.
+    """
+    global _lazy_initializer
+    if _lazy_initializer is not None:
+        with _init_lock:
+            if (initializer := _lazy_initializer) is not None:
+                initializer()
+                _lazy_initializer = None
+    if (future := _init_future) is not None:
+        future.result(timeout)
 
 
 def update_system_fontdirs() -> None:
@@ -64,61 +833,262 @@ def get_fontdirs() -> list[Path]:
     return FONTDIRS_CUSTOM + FONTDIRS_SYSTEM
 
 
+def _drop_duplicates(
+    fns: Iterable[Path], keys_of: Mapping[Path, FileKey], indexed: Mapping[FileKey, Path]
+) -> list[Path]:
+    """Drop font files which are the same physical file as an indexed or an earlier one."""
+    keys: set[FileKey] = set()
+    result: list[Path] = []
+    for fn in fns:
+        if (key := keys_of.get(fn)) is not None:
+            if key in keys or indexed.get(key, fn) != fn:
+                continue
+            keys.add(key)
+        result.append(fn)
+    return result
+
+
 def update_system_fontfiles_index() -> None:
-    """Update system font files index."""
+    """Update system font files index.
+
+    Directories unchanged since the last update are not listed again (see `fontra.walker`).
+    """
     _indexed_fontfiles_system.clear()
-    for directory in FONTDIRS_SYSTEM:
-        for r, _, fs in os.walk(directory):
-            _indexed_fontfiles_system.update(
-                {Path(r) / fn for fn in fs if fn.endswith(SUPPORTED_EXT)}
-            )
+    with _phase("walk"):
+        _indexed_fontfiles_system.update(_default_db.walk(FONTDIRS_SYSTEM))
 
 
 def update_custom_fontfiles_index() -> None:
-    """Update font files index."""
+    """Update font files index.
+
+    Directories unchanged since the last update are not listed again (see `fontra.walker`).
+    """
     _indexed_fontfiles_custom.clear()
-    for directory in FONTDIRS_CUSTOM:
-        for r, _, fs in os.walk(directory):
-            _indexed_fontfiles_custom.update(
-                {Path(r) / fn for fn in fs if fn.endswith(SUPPORTED_EXT)}
-            )
+    with _phase("walk"):
+        _indexed_fontfiles_custom.update(_default_db.walk(FONTDIRS_CUSTOM))
 
 
-def _update_fontref_index(fn: Path, face: freetype.Face) -> None:
+def _make_face_record(
+    family: FontFamilyName, style: StyleName, bank: int,
+    names: Sequence[SfntName], coverage: list[tuple[int, int]], attributes: FontAttributes
+) -> FaceRecord:
+    return FaceRecord(
+        family, style, bank,
+        list(dict.fromkeys(chain(get_font_names(names), get_preferred_names(names)))),
+        [x for x in get_localized_family_name(names) if x[0] != family],
+        coverage, attributes
+    )
+
+
+def _read_face_record(face: "freetype.Face") -> FaceRecord:
     family = face.family_name.decode()
     style = face.style_name.decode()
-    indexed_fontrefs.setdefault(family, {})[style] = FontRef(fn, face.face_index)
-    if face.is_sfnt:
-        for name, style_ in chain(get_font_names(face), get_preferred_names(face)):
-            indexed_classical_fontrefs.setdefault(name, {})[style_] = indexed_fontrefs[family][style]
-        _ffname = get_localized_family_name(face)
-        indexed_langnames.update({fn: family for fn, *_ in _ffname if fn != family})
+    coverage = to_ranges(char for char, gid in face.get_chars() if gid)
+    attributes = FontAttributes(
+        700 if face.style_flags & FT_STYLE_FLAG_BOLD else 400, 5,
+        SLANT_ITALIC if face.style_flags & FT_STYLE_FLAG_ITALIC else SLANT_ROMAN
+    )
+    if not face.is_sfnt:
+        return FaceRecord(family, style, face.face_index, [], [], coverage, attributes)
+    return _make_face_record(
+        family, style, face.face_index, get_sfnt_names(face), coverage, attributes
+    )
+
+
+def _update_fontref_index(
+    index: FontIndex, fn: Path, record: FaceRecord,
+    keys: Optional[tuple[set[FontFamilyName], set[FontFamilyName], set[FontFamilyName]]] = None,
+    *, fresh: bool = False
+) -> None:
+    """Index a face, only names in `keys` (families, classical and localized names) if given.
+
+    Styles and localized names of the index are modified in place if it is `fresh`,
+    i.e. built from scratch and sharing nothing with published generations.
+    """
+    fontref = FontRef(fn, record.bank)
+    if keys is None or record.family in keys[0]:
+        if record.family not in index.fontrefs:
+            index.fontref_ngrams.add(record.family)
+            index.names.add("family", record.family)
+        _set_style(index.fontrefs, record.family, record.style, fontref, fresh)
+        _set_style(index.attributes, record.family, record.style, record.attributes, fresh)
+    for name, style in record.classical:
+        if keys is None or name in keys[1]:
+            if name not in index.classical_fontrefs:
+                index.classical_ngrams.add(name)
+                index.names.add("classical", name)
+            _set_style(index.classical_fontrefs, name, style, fontref, fresh)
+    for name, *ids in record.langnames:
+        if keys is None or name in keys[2]:
+            if (family := index.langnames.get(name)) is None:
+                index.names.add("localized", name)
+            elif family != record.family:
+                _withdraw_localized_name(index, name)
+            index.langnames[name] = record.family
+            _id = (ids[0], ids[1], ids[2])
+            if fresh:
+                if _id not in (_ids := index.localized_names.setdefault(record.family, {}).setdefault(name, [])):
+                    _ids.append(_id)
+            elif _id not in (_ids := (names := index.localized_names.get(record.family, {})).get(name, [])):
+                index.localized_names[record.family] = {**names, name: [*_ids, _id]}
+
+
+def _withdraw_localized_name(index: FontIndex, name: FontFamilyName) -> None:
+    family = index.langnames[name]
+    if names := {x: ids for x, ids in index.localized_names[family].items() if x != name}:
+        index.localized_names[family] = names
+    else:
+        del index.localized_names[family]
+
 
+def get_font_index() -> FontIndex:
+    """Get the current generation of the index, without waiting for initialization."""
+    return _default_db.get_font_index()
+
+
+def get_index_generation() -> int:
+    """Get the generation of the index, which changes whenever the index is modified."""
+    return _default_db.get_index_generation()
+
+
+def _replace_index(index: FontIndex) -> None:
+    """Make an index not loaded from font files current, like a snapshot."""
+    _default_db._replace_index(index)
+
+
+def _ft_open_face(fn: Path, index: int = 0) -> "freetype.Face":
+    import freetype
 
-def _ft_open_face(fn: Path, index: int = 0) -> freetype.Face:
     if os.name == "nt":
-        return freetype.Face(open(fn, "rb"), index)
+        # the font is read into memory, no need to keep the file open
+        with open(fn, "rb") as f:
+            return freetype.Face(f, index)
     return freetype.Face(str(fn), index)
 
 
-def update_fontrefs_index() -> None:
-    """Update font references index."""
-    indexed_fontrefs.clear()
-    indexed_classical_fontrefs.clear()
-    indexed_langnames.clear()
-    for fn in (*_indexed_fontfiles_system, *_indexed_fontfiles_custom):
-        try:
-            face = _ft_open_face(fn)
-        except freetype.ft_errors.FT_Exception:
-            warnings.warn(
-                f"Some error occurred when loading font {str(fn)!r}, skipped.\n"
-            )
-            traceback.print_exc()
-            continue
-        _update_fontref_index(fn, face)
+def scan_font_file(fn: Path) -> Optional[list[FaceRecord]]:
+    """Read indexed data of all faces in a font file.
+
+    Params:
+    - fn: path to the font file.
+
+    Return: a list of face records, or None if the font failed to load.
+    """
+    return _load_font_file(fn)[0]
+
+
+# name records in encodings without a codec (`LookupError`), or not valid in their encodings
+_NAME_ERRORS = (UnicodeError, LookupError)
+
+
+def _load_font_file(fn: Path) -> tuple[Optional[list[FaceRecord]], FileCost, Optional[str]]:
+    start = time.perf_counter()
+    try:
+        if (sfnt_faces := read_sfnt_faces(fn)) is not None:
+            records = [
+                _make_face_record(face.family, face.style, i, face.names, face.coverage, face.attributes)
+                for i, face in enumerate(sfnt_faces)
+            ]
+            return records, FileCost(fn, time.perf_counter() - start, len(records), "sfnt"), None
+    except _NAME_ERRORS as e:
+        return _load_failure(fn, start, "sfnt", e)
+    import freetype.ft_errors
+
+    try:
+        face = _ft_open_face(fn)
+        records = [_read_face_record(face)]
         for i in range(1, face.num_faces):
-            face = _ft_open_face(fn, i)
-            _update_fontref_index(fn, face)
+            records.append(_read_face_record(_ft_open_face(fn, i)))
+    except (freetype.ft_errors.FT_Exception, *_NAME_ERRORS) as e:
+        return _load_failure(fn, start, "freetype", e)
+    return records, FileCost(fn, time.perf_counter() - start, len(records), "freetype"), None
+
+
+def _load_failure(fn: Path, start: float, parser: str, e: Exception) -> tuple[None, FileCost, str]:
+    warnings.warn(
+        f"Some error occurred when loading font {str(fn)!r}, skipped.\n"
+    )
+    import traceback
+    traceback.print_exc()
+    return None, FileCost(fn, time.perf_counter() - start, 0, parser), str(e)
+
+
+def _scan_font_files(
+    fns: list[Path], workers: Optional[int] = None, *, rebuild: bool = False, emit: bool = True
+) -> list[Optional[list[FaceRecord]]]:
+    if workers is None or workers <= 1 or len(fns) <= 1:
+        results = list(map(_load_font_file, fns))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(workers) as executor:
+            results = list(
+                executor.map(_load_font_file, fns, chunksize=max(1, len(fns) // (workers * 4)))
+            )
+    scanned: list[Optional[list[FaceRecord]]] = []
+    for records, cost, reason in results:
+        if emit:
+            _emit(cost, rebuild)
+            if reason is not None:
+                _emit(FailedFile(cost.path, reason), rebuild)
+        scanned.append(records)
+    return scanned
+
+
+def update_fontrefs_index(*, use_cache: bool = False, workers: Optional[int] = None) -> None:
+    """Update font references index.
+
+    Params:
+    - use_cache: whether to reuse and refresh the on-disk index cache,
+      only files changed since the last run will be loaded.
+    - workers: number of processes to load font files with, loads serially if not greater than 1.
+      The resulting index does not depend on it.
+    """
+    _default_db._rebuild(
+        (*sorted(_indexed_fontfiles_system), *sorted(_indexed_fontfiles_custom)),
+        use_cache=use_cache, workers=workers
+    )
+
+
+def add_font_files(paths: Iterable[Path], *, workers: Optional[int] = None) -> set[FontFamilyName]:
+    """Add font files into the index, without rebuilding it.
+
+    Files already indexed are reloaded if they are changed on disk.
+    Added files take precedence over indexed ones providing the same font styles.
+    Files which are the same physical file (by hard link or symlink) as an indexed one are skipped.
+
+    Params:
+    - paths: paths to the font files.
+    - workers: number of processes to load font files with, loads serially if not greater than 1.
+
+    Return: a set of font family names whose styles are changed.
+    """
+    return _default_db.add_font_files(paths, workers=workers)
+
+
+def remove_font_files(paths: Iterable[Path]) -> set[FontFamilyName]:
+    """Remove font files from the index, without rebuilding it.
+
+    Params:
+    - paths: paths to the font files.
+
+    Return: a set of font family names whose styles are changed.
+    """
+    return _default_db.remove_font_files(paths)
+
+
+def refresh_directory(path: Path, *, workers: Optional[int] = None) -> set[FontFamilyName]:
+    """Synchronize the index with font files in a directory, without rebuilding it.
+
+    New and changed font files are loaded, and removed ones are withdrawn from the index.
+
+    Params:
+    - path: path to the directory.
+    - workers: number of processes to load font files with, loads serially if not greater than 1.
+
+    Return: a set of font family names whose styles are changed.
+    """
+    return _default_db.refresh_directory(path, workers=workers)
 
 
 def all_fonts(*, classical: bool = False) -> list[FontFamilyName]:
@@ -128,15 +1098,74 @@ def all_fonts(*, classical: bool = False) -> list[FontFamilyName]:
     
     The name list is not guaranteed to be sorted.
     """
-    if classical:
-        return list(indexed_classical_fontrefs)
-    return list(indexed_fontrefs)
+    answered, result = _query_daemon("all_fonts", classical)
+    if answered:
+        return result
+    return _default_db.all_fonts(classical=classical)
 
 
 def get_unlocalized_name(name: FontFamilyName) -> FontFamilyName:
     """Try convert a name into an unlocalized name."""
-    return indexed_langnames.get(name, name)
+    answered, result = _query_daemon("get_unlocalized_name", name)
+    if answered:
+        return result
+    return _default_db.get_unlocalized_name(name)
+
+
+def complete_font_names(
+    prefix: str, limit: Optional[int] = 10, *, localized: bool = True, classical: bool = False
+) -> list[FontNameMatch]:
+    """Get font names starting with a prefix, case- and whitespace-insensitively, like for autocompletion.
+
+    Params:
+    - prefix: prefix to complete, a trailing space only matches whole words.
+    - limit: maximum number of names to return, all if None.
+    - localized: whether to include localized names.
+    - classical: whether to include classical family names (which may contain styles).
+
+    Return: a list of matches sorted by names, each telling which index the name is from.
+    """
+    answered, result = _query_daemon("complete_font_names", prefix, limit, localized, classical)
+    if answered:
+        return [FontNameMatch(*x) for x in result]
+    return _default_db.complete_font_names(prefix, limit, localized=localized, classical=classical)
 
 
 def get_localized_names(name: FontFamilyName) -> list[FontFamilyName]:
-    return [k for k, v in indexed_langnames.items() if v == name]
\ No newline at end of file
+    """Get localized names of a font family."""
+    answered, result = _query_daemon("get_localized_names", name)
+    if answered:
+        return result
+    return _default_db.get_localized_names(name)
+
+
+def get_localized_name(
+    name: FontFamilyName, language_id: int, *, platform_id: Optional[int] = None
+) -> Optional[FontFamilyName]:
+    """Get the localized name of a font family in the specified language.
+
+    Params:
+    - name: font family name.
+    - language_id: language id of the sfnt name record, like `0x804` for Simplified Chinese (Windows).
+    - platform_id: platform id of the sfnt name record, any platform if not specified.
+
+    Return: a localized name, or None if the font family has no localized name in the language.
+    """
+    answered, result = _query_daemon("get_localized_name", name, language_id, platform_id)
+    if answered:
+        return result
+    return _default_db.get_localized_name(name, language_id, platform_id=platform_id)
+
+
+def fonts_covering(text: str) -> list[FontRef]:
+    """Get font faces covering all characters of a text, by the Unicode coverage index.
+
+    Params:
+    - text: text to render.
+
+    Return: a list of font references, sorted by path and collection index.
+    """
+    answered, result = _query_daemon("fonts_covering", text)
+    if answered:
+        return [FontRef(Path(path), bank) for path, bank in result]
+    return _default_db.fonts_covering(text)
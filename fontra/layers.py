@@ -0,0 +1,165 @@
+"""Read-only views of an index layered over the index of a base database, see `fontra.FontDB`.
+
+Names and faces of the overlay take precedence over the same ones of the base.
+"""
+
+import heapq
+from collections.abc import Iterator, Mapping, Sequence
+from itertools import chain
+from typing import Any, Optional, TypeVar
+
+from .coverage import CoverageIndex
+from .ngram import NgramIndex
+from .prefix import PrefixIndex
+from .typing import FontFamilyName, FontNameMatch, FontRef, NameKind, StyleName
+
+V = TypeVar("V")
+
+
+class LayeredFamilies(Mapping[FontFamilyName, Mapping[StyleName, V]]):
+    """Families of both layers, styles of a family found in both are merged."""
+
+    def __init__(
+        self, overlay: Mapping[FontFamilyName, Mapping[StyleName, V]], base: Mapping[FontFamilyName, Mapping[StyleName, V]]
+    ) -> None:
+        self._overlay = overlay
+        self._base = base
+
+    def __getitem__(self, family: FontFamilyName) -> Mapping[StyleName, V]:
+        top, bottom = self._overlay.get(family), self._base.get(family)
+        if top is None:
+            if bottom is None:
+                raise KeyError(family)
+            return bottom
+        if bottom is None:
+            return top
+        return {**bottom, **top}
+
+    def __contains__(self, family: object) -> bool:
+        return family in self._overlay or family in self._base
+
+    def __iter__(self) -> Iterator[FontFamilyName]:
+        return chain(self._overlay, (family for family in self._base if family not in self._overlay))
+
+    def __len__(self) -> int:
+        return len(self._overlay) + sum(1 for family in self._base if family not in self._overlay)
+
+
+class LayeredLangnames(Mapping[FontFamilyName, FontFamilyName]):
+    """Localized names of both layers, mapped to family names."""
+
+    def __init__(self, overlay: Mapping[FontFamilyName, FontFamilyName], base: Mapping[FontFamilyName, FontFamilyName]) -> None:
+        self._overlay = overlay
+        self._base = base
+
+    def __getitem__(self, name: FontFamilyName) -> FontFamilyName:
+        if (family := self._overlay.get(name)) is not None:
+            return family
+        return self._base[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._overlay or name in self._base
+
+    def __iter__(self) -> Iterator[FontFamilyName]:
+        return chain(self._overlay, (name for name in self._base if name not in self._overlay))
+
+    def __len__(self) -> int:
+        return len(self._overlay) + sum(1 for name in self._base if name not in self._overlay)
+
+
+class LayeredNgramIndex(NgramIndex):
+    """Read-only `NgramIndex` matching names of both layers."""
+
+    def __init__(self, overlay: NgramIndex, base: NgramIndex, families: Mapping[str, Any]) -> None:
+        self.n = overlay.n
+        self._overlay = overlay
+        self._base = base
+        self._families = families
+
+    def __len__(self) -> int:
+        return len(self._families)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._overlay or name in self._base
+
+    def add(self, name: str) -> None:
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    def discard(self, name: str) -> None:
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    def clear(self) -> None:
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    def _count_shared(self, query: str) -> dict[str, int]:
+        # a name in both layers shares the same n-grams in each
+        return {**self._base._count_shared(query), **self._overlay._count_shared(query)}
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._families)
+
+
+class LayeredCoverageIndex(CoverageIndex):
+    """Read-only `CoverageIndex` of faces of both layers, a face in both is covered as in the overlay."""
+
+    def __init__(self, overlay: CoverageIndex, base: CoverageIndex) -> None:
+        self._overlay = overlay
+        self._base = base
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __iter__(self) -> Iterator[FontRef]:
+        return chain(self._overlay, (fontref for fontref in self._base if fontref not in self._overlay))
+
+    def __contains__(self, fontref: object) -> bool:
+        return fontref in self._overlay or fontref in self._base
+
+    def add(self, fontref: FontRef, ranges: Any) -> None:
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    def discard(self, fontref: FontRef) -> None:
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    def clear(self) -> None:
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    def covers(self, fontref: FontRef, codepoint: int) -> bool:
+        return (self._overlay if fontref in self._overlay else self._base).covers(fontref, codepoint)
+
+    def faces_covering(self, codepoint: int) -> set[FontRef]:
+        return self._overlay.faces_covering(codepoint) | {
+            fontref for fontref in self._base.faces_covering(codepoint) if fontref not in self._overlay
+        }
+
+    def get_ranges(self, fontref: FontRef) -> list[tuple[int, int]]:
+        return (self._overlay if fontref in self._overlay else self._base).get_ranges(fontref)
+
+
+class LayeredPrefixIndex(PrefixIndex):
+    """Read-only `PrefixIndex` completing names of both layers."""
+
+    def __init__(self, overlay: PrefixIndex, base: PrefixIndex, langnames: Mapping[FontFamilyName, FontFamilyName]) -> None:
+        self._overlay = overlay
+        self._base = base
+        self._langnames = langnames
+
+    def add(self, kind: NameKind, name: FontFamilyName) -> None:
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    def discard(self, kind: NameKind, name: FontFamilyName) -> None:
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    def _iter_prefixed(self, kind: NameKind, prefix: str) -> Iterator[tuple[str, int, FontFamilyName]]:
+        last = None
+        for key in heapq.merge(self._overlay._iter_prefixed(kind, prefix), self._base._iter_prefixed(kind, prefix)):
+            if key != last:
+                yield key
+            last = key
+
+    def find(self, name: str, kinds: Sequence[NameKind]) -> Optional[FontNameMatch]:
+        for kind in kinds:
+            for layer in (self._overlay, self._base):
+                if (match := layer.find(name, [kind])) is not None:
+                    return self._match(kind, match.name)
+        return None
@@ -1,7 +1,10 @@
+from collections.abc import Sequence
 from itertools import product
+from typing import TYPE_CHECKING, Union
 
-import freetype
-from freetype.ft_enums import (
+from .consts import (
+    TT_MAC_ENCODING_MAPPING,
+    TT_MS_ENCODING_MAPPING,
     TT_NAME_ID_FONT_FAMILY,
     TT_NAME_ID_FONT_SUBFAMILY,
     TT_NAME_ID_PREFERRED_FAMILY,
@@ -10,8 +13,10 @@ from freetype.ft_enums import (
     TT_PLATFORM_MACINTOSH,
     TT_PLATFORM_MICROSOFT,
 )
+from .typing import SfntName
 
-from .consts import TT_MAC_ENCODING_MAPPING, TT_MS_ENCODING_MAPPING
+if TYPE_CHECKING:
+    import freetype
 
 
 def _get_encoding(pid: int, eid: int, lid: int) -> str:
@@ -26,43 +31,50 @@ def _get_encoding(pid: int, eid: int, lid: int) -> str:
     return "unicode_escape"
 
 
-def get_preferred_names(face: freetype.Face) -> list[tuple[str, str]]:
-    _ffname: set[str] = set()
-    _fsname: set[str] = set()
-    for x in (face.get_sfnt_name(i) for i in range(face.sfnt_name_count)):
-        if x.name_id == TT_NAME_ID_PREFERRED_FAMILY:
-            _ffname.add(x.string.decode(_get_encoding(x.platform_id, x.encoding_id, x.language_id)))
-        elif x.name_id == TT_NAME_ID_PREFERRED_SUBFAMILY:
-            _fsname.add(x.string.decode(_get_encoding(x.platform_id, x.encoding_id, x.language_id)))
-    return list(product(_ffname, _fsname))
+def get_sfnt_names(face: "freetype.Face") -> list[SfntName]:
+    """Get all records of the sfnt `name` table of a face."""
+    return [
+        SfntName(x.platform_id, x.encoding_id, x.language_id, x.name_id, x.string)
+        for x in (face.get_sfnt_name(i) for i in range(face.sfnt_name_count))
+    ]
 
 
-def get_font_names(face: freetype.Face) -> list[tuple[str, str]]:
-    _ffname: set[str] = set()
-    _fsname: set[str] = set()
-    for x in (face.get_sfnt_name(i) for i in range(face.sfnt_name_count)):
-        if x.name_id == TT_NAME_ID_FONT_FAMILY:
-            _ffname.add(x.string.decode(_get_encoding(x.platform_id, x.encoding_id, x.language_id)))
-        elif x.name_id == TT_NAME_ID_FONT_SUBFAMILY:
-            _fsname.add(x.string.decode(_get_encoding(x.platform_id, x.encoding_id, x.language_id)))
+def _as_sfnt_names(face: Union["freetype.Face", Sequence[SfntName]]) -> Sequence[SfntName]:
+    if isinstance(face, Sequence):
+        return face
+    return get_sfnt_names(face)
+
+
+def _get_name_pairs(names: Sequence[SfntName], family_id: int, style_id: int) -> list[tuple[str, str]]:
+    _ffname: dict[str, None] = {}
+    _fsname: dict[str, None] = {}
+    for x in names:
+        if x.name_id == family_id:
+            _ffname[x.string.decode(_get_encoding(x.platform_id, x.encoding_id, x.language_id))] = None
+        elif x.name_id == style_id:
+            _fsname[x.string.decode(_get_encoding(x.platform_id, x.encoding_id, x.language_id))] = None
     return list(product(_ffname, _fsname))
 
 
-def get_localized_family_name(face: freetype.Face) -> list[tuple[str, int, int, int]]:
-    _ffname = [
-        (x.string, x.name_id, x.platform_id, x.encoding_id, x.language_id)
-        for x in (
-            face.get_sfnt_name(i) for i in range(face.sfnt_name_count)
-        ) if x.name_id == TT_NAME_ID_PREFERRED_FAMILY
-    ]
+def get_preferred_names(face: Union["freetype.Face", Sequence[SfntName]]) -> list[tuple[str, str]]:
+    return _get_name_pairs(
+        _as_sfnt_names(face), TT_NAME_ID_PREFERRED_FAMILY, TT_NAME_ID_PREFERRED_SUBFAMILY
+    )
+
+
+def get_font_names(face: Union["freetype.Face", Sequence[SfntName]]) -> list[tuple[str, str]]:
+    return _get_name_pairs(
+        _as_sfnt_names(face), TT_NAME_ID_FONT_FAMILY, TT_NAME_ID_FONT_SUBFAMILY
+    )
+
+
+def get_localized_family_name(face: Union["freetype.Face", Sequence[SfntName]]) -> list[tuple[str, int, int, int]]:
+    names = _as_sfnt_names(face)
+    _ffname = [x for x in names if x.name_id == TT_NAME_ID_PREFERRED_FAMILY]
     if not _ffname:
-        _ffname = [
-            (x.string, x.name_id, x.platform_id, x.encoding_id, x.language_id)
-            for x in (
-                face.get_sfnt_name(i) for i in range(face.sfnt_name_count)
-            ) if x.name_id == TT_NAME_ID_FONT_FAMILY
-        ]
+        _ffname = [x for x in names if x.name_id == TT_NAME_ID_FONT_FAMILY]
     return [
-        (s.decode(_get_encoding(pid, eid, lid)), pid, eid, lid)
-        for s, _, pid, eid, lid in _ffname
-    ]
\ No newline at end of file
+        (x.string.decode(_get_encoding(x.platform_id, x.encoding_id, x.language_id)),
+         x.platform_id, x.encoding_id, x.language_id)
+        for x in _ffname
+    ]
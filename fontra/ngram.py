@@ -0,0 +1,148 @@
+"""Character n-gram index for fuzzy matching of font names."""
+
+import heapq
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from difflib import SequenceMatcher
+from itertools import chain
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a name for case- and whitespace-insensitive comparison."""
+    return " ".join(name.casefold().split())
+
+
+class NgramIndex:
+    """An inverted index from character n-grams of normalized names to names.
+
+    Names are scored like `difflib.get_close_matches(...)` on their normalized forms, so matching
+    is case- and whitespace-insensitive. Only names sharing enough n-grams with the query for
+    their lengths are scored, so names are not compared against the query one by one.
+    """
+
+    def __init__(self, names: Iterable[str] = (), n: int = 3) -> None:
+        self.n = n
+        self._normalized: dict[str, str] = {}
+        self._postings: dict[str, set[str]] = {}
+        # keys of the posting lists owned by this index, others are shared with copies and copied before modified
+        self._owned: set[str] = set()
+        for name in names:
+            self.add(name)
+
+    def __len__(self) -> int:
+        return len(self._normalized)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._normalized
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._normalized)
+
+    def _ngrams(self, normalized: str) -> set[str]:
+        # boundary marks make short names and name edges searchable
+        padded = f"\x02{normalized}\x03"
+        return {padded[i:i + self.n] for i in range(max(1, len(padded) - self.n + 1))}
+
+    @staticmethod
+    def _own(postings: dict[str, set[str]], owned: set[str], key: str) -> set[str]:
+        """Get a posting list to modify, copying it first if shared."""
+        if key not in owned:
+            postings[key] = set(postings.get(key, ()))
+            owned.add(key)
+        return postings[key]
+
+    @staticmethod
+    def _disown(postings: dict[str, set[str]], owned: set[str], key: str, name: str) -> None:
+        """Remove a name from a posting list, and the list once empty."""
+        if len(postings[key]) == 1:
+            del postings[key]
+            owned.discard(key)
+        else:
+            NgramIndex._own(postings, owned, key).discard(name)
+
+    def add(self, name: str) -> None:
+        if name in self._normalized:
+            return
+        normalized = self._normalized[name] = normalize_name(name)
+        for gram in self._ngrams(normalized):
+            self._own(self._postings, self._owned, gram).add(name)
+
+    def discard(self, name: str) -> None:
+        if (normalized := self._normalized.pop(name, None)) is None:
+            return
+        for gram in self._ngrams(normalized):
+            self._disown(self._postings, self._owned, gram, name)
+
+    def clear(self) -> None:
+        self._normalized.clear()
+        self._postings.clear()
+        self._owned.clear()
+
+    def copy(self) -> "NgramIndex":
+        """Get a copy sharing posting lists with the index, until either one modifies them."""
+        index = type(self).__new__(type(self))
+        index.n = self.n
+        index._normalized = dict(self._normalized)
+        index._postings = dict(self._postings)
+        index._owned = set()
+        self._owned = set()
+        return index
+
+    def _count_shared(self, query: str) -> dict[str, int]:
+        # counted in C by `Counter`
+        return Counter(chain.from_iterable(self._postings.get(gram, ()) for gram in self._ngrams(query)))
+
+    def get_close_matches(self, word: str, n: int = 3, cutoff: float = 0.6) -> list[str]:
+        """Get the best matches of a name, sorted by possibilities.
+
+        Params:
+        - word: name to match, case- and whitespace-insensitive.
+        - n: maximum number of matches to return.
+        - cutoff: least match possibilities, same as in `difflib.get_close_matches(...)`.
+
+        Return: a list of names, sorted by possibilities.
+        """
+        if n <= 0:
+            return []
+        query = normalize_name(word)
+        matcher = SequenceMatcher()
+        matcher.set_seq2(query)
+        result: list[tuple[float, str]] = []
+        threshold = cutoff
+
+        def score(names: Iterable[str]) -> None:
+            nonlocal threshold
+            for name in names:
+                matcher.set_seq1(normalize_name(name))
+                if (
+                    matcher.real_quick_ratio() >= threshold
+                    and matcher.quick_ratio() >= threshold
+                    and (score := matcher.ratio()) >= threshold
+                ):
+                    if len(result) < n:
+                        heapq.heappush(result, (score, name))
+                    else:
+                        heapq.heappushpop(result, (score, name))
+                    if len(result) == n:
+                        threshold = max(cutoff, result[0][0])
+
+        if cutoff <= 0:
+            # names with nothing in common still reach it
+            score(self)
+        else:
+            score(self._candidates(query, cutoff))
+        return [name for _, name in heapq.nlargest(n, result)]
+
+    def _candidates(self, query: str, cutoff: float) -> list[str]:
+        """Get names to score for a normalized query, most n-grams shared first.
+
+        Names reaching the cutoff mostly share n-grams with the query, so only names with a Dice coefficient
+        of n-grams at least a third of the cutoff are scored, where n-grams of names are counted by their lengths.
+        """
+        least = cutoff / 6
+        # n-grams of the query and of a name, less the characters of the name
+        grams = max(1, len(query) + 3 - self.n) + 3 - self.n
+        shared = self._count_shared(query)
+        candidates = [name for name, count in shared.items() if count >= least * (grams + len(name))]
+        candidates.sort(key=shared.__getitem__, reverse=True)
+        return candidates
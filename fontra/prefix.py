@@ -0,0 +1,114 @@
+"""Sorted index of normalized font names for prefix completion and case-insensitive lookup."""
+
+import heapq
+from bisect import bisect_left
+from collections.abc import Collection, Iterator, Mapping, Sequence
+from itertools import islice
+from typing import Optional
+
+from .ngram import normalize_name
+from .typing import FontFamilyName, FontNameMatch, NameKind
+
+NAME_KINDS: tuple[NameKind, ...] = ("family", "localized", "classical")
+
+
+def normalize_prefix(prefix: str) -> str:
+    """Normalize a typed prefix like `normalize_name(...)`, keeping a trailing space as a word boundary."""
+    normalized = normalize_name(prefix)
+    if normalized and prefix[-1:].isspace():
+        normalized += " "
+    return normalized
+
+
+class PrefixIndex:
+    """Names of an index sorted by their normalized forms, by kind.
+
+    Names are not stored twice, the index reads them from the mappings of the font index
+    (family names, localized name -> family name, classical family names).
+    Keys are sorted at once by `sort()` before the font index is published, so building it stays linear,
+    and names added to or removed from a copy are inserted into or deleted from the sorted keys.
+    A published index is only read.
+    """
+
+    def __init__(
+        self,
+        families: Collection[FontFamilyName],
+        langnames: Mapping[FontFamilyName, FontFamilyName],
+        classical: Collection[FontFamilyName],
+    ) -> None:
+        self._sources: dict[NameKind, Collection[FontFamilyName]] = {
+            "family": families, "localized": langnames, "classical": classical
+        }
+        self._langnames = langnames
+        # (normalized name, name) of each kind, sorted
+        self._keys: dict[NameKind, list[tuple[str, FontFamilyName]]] = {}
+
+    def sort(self) -> None:
+        """Sort keys of the names in the source mappings, if not sorted yet."""
+        for kind, names in self._sources.items():
+            if kind not in self._keys:
+                self._keys[kind] = sorted((normalize_name(name), name) for name in names)
+
+    def _sorted(self, kind: NameKind) -> list[tuple[str, FontFamilyName]]:
+        return self._keys[kind]
+
+    def add(self, kind: NameKind, name: FontFamilyName) -> None:
+        """Record a name added into the source mapping of a kind, before publishing."""
+        if (keys := self._keys.get(kind)) is None:
+            return
+        key = (normalize_name(name), name)
+        if (i := bisect_left(keys, key)) == len(keys) or keys[i] != key:
+            keys.insert(i, key)
+
+    def discard(self, kind: NameKind, name: FontFamilyName) -> None:
+        """Record a name removed from the source mapping of a kind, before publishing."""
+        if (keys := self._keys.get(kind)) is None:
+            return
+        key = (normalize_name(name), name)
+        if (i := bisect_left(keys, key)) < len(keys) and keys[i] == key:
+            del keys[i]
+
+    def copy(
+        self,
+        families: Collection[FontFamilyName],
+        langnames: Mapping[FontFamilyName, FontFamilyName],
+        classical: Collection[FontFamilyName],
+    ) -> "PrefixIndex":
+        """Get a copy over copies of the source mappings."""
+        index = PrefixIndex(families, langnames, classical)
+        index._keys = {kind: list(keys) for kind, keys in self._keys.items()}
+        return index
+
+    def _match(self, kind: NameKind, name: FontFamilyName) -> FontNameMatch:
+        return FontNameMatch(name, self._langnames[name] if kind == "localized" else name, kind)
+
+    def _iter_prefixed(self, kind: NameKind, prefix: str) -> Iterator[tuple[str, int, FontFamilyName]]:
+        keys = self._sorted(kind)
+        rank = NAME_KINDS.index(kind)
+        for i in range(bisect_left(keys, (prefix,)), len(keys)):
+            normalized, name = keys[i]
+            if not normalized.startswith(prefix):
+                break
+            yield normalized, rank, name
+
+    def complete(self, prefix: str, kinds: Sequence[NameKind], limit: Optional[int] = None) -> list[FontNameMatch]:
+        """Get names starting with a prefix, case- and whitespace-insensitively.
+
+        Params:
+        - prefix: prefix to complete, normalized by `normalize_prefix(...)`.
+        - kinds: kinds of names to lookup.
+        - limit: maximum number of names to return, all if None.
+
+        Return: a list of matches, sorted by normalized names, then by kinds in the order of `NAME_KINDS`.
+        """
+        merged = heapq.merge(*(self._iter_prefixed(kind, normalize_prefix(prefix)) for kind in kinds))
+        return [self._match(NAME_KINDS[rank], name) for _, rank, name in islice(merged, limit)]
+
+    def find(self, name: str, kinds: Sequence[NameKind]) -> Optional[FontNameMatch]:
+        """Get the first name equal to a name case- and whitespace-insensitively, trying kinds in order."""
+        normalized = normalize_name(name)
+        for kind in kinds:
+            keys = self._sorted(kind)
+            if (i := bisect_left(keys, (normalized,))) < len(keys) and keys[i][0] == normalized:
+                return self._match(kind, keys[i][1])
+        return None
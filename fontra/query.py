@@ -0,0 +1,102 @@
+"""Queries over a generation of the index, shared by all font databases (see `fontra.FontDB`)."""
+
+from difflib import get_close_matches
+from typing import TYPE_CHECKING, Optional
+
+from .consts import SLANT_ITALIC, SLANT_OBLIQUE, SLANT_ROMAN
+from .ngram import normalize_name
+from .typing import FontAttributes, FontFamilyName, FontRef, NameKind, StyleName
+
+if TYPE_CHECKING:
+    from .fontdb import FontIndex
+
+
+def _match_font_names(index: "FontIndex", font_name: str, n: Optional[int], cutoff: float, classical: bool) -> list[str]:
+    ngrams = index.classical_ngrams if classical else index.fontref_ngrams
+    return ngrams.get_close_matches(font_name, len(ngrams) if n is None else n, cutoff)
+
+
+def _match_font_styles(
+    index: "FontIndex", font_name: str, font_style: str, n: Optional[int], cutoff: float, classical: bool
+) -> list[str]:
+    if font_name not in index.fontrefs:
+        raise KeyError(
+            f"Font {font_name!r} not found. Please use `match_font_name({font_name!r})` first."
+        )
+    styles = (index.classical_fontrefs if classical else index.fontrefs)[font_name]
+    return get_close_matches(font_style, styles, len(styles) if n is None else n, cutoff)
+
+
+def _get_font(index: "FontIndex", name: FontFamilyName, style: str, localized: bool, fuzzy: bool, classical: bool) -> FontRef:
+    return _get_style(index, _get_family(index, name, localized, fuzzy, classical), style, fuzzy, classical)
+
+
+def _find_family(index: "FontIndex", name: FontFamilyName, localized: bool, classical: bool) -> Optional[FontFamilyName]:
+    """Get the family of a name, equal to it exactly, or else case- and whitespace-insensitively (see `normalize_name(...)`)."""
+    name = index.langnames.get(name, name) if localized and not classical else name
+    if name in (index.classical_fontrefs if classical else index.fontrefs):
+        return name
+    kinds: list[NameKind] = ["classical"] if classical else ["family", "localized"] if localized else ["family"]
+    if (found := index.names.find(name, kinds)) is not None:
+        return found.family
+    return None
+
+
+def _find_style(index: "FontIndex", name: FontFamilyName, style: str, classical: bool) -> Optional[StyleName]:
+    """Get the style of a family equal to a style exactly, or else case- and whitespace-insensitively."""
+    if style in (styles := (index.classical_fontrefs if classical else index.fontrefs)[name]):
+        return style
+    normalized = normalize_name(style)
+    return next((st for st in styles if normalize_name(st) == normalized), None)
+
+
+def _get_family(index: "FontIndex", name: FontFamilyName, localized: bool, fuzzy: bool, classical: bool) -> FontFamilyName:
+    if (found := _find_family(index, name, localized, classical)) is not None:
+        return found
+    match = next(iter(_match_font_names(index, name, 1, 0.6, classical)), None)
+    if fuzzy and match:
+        return match
+    raise KeyError(
+        f"Font {name!r} not found."
+        + (f" Did you mean {match!r} ?" if match else "")
+    )
+
+
+def _get_style(index: "FontIndex", name: FontFamilyName, style: str, fuzzy: bool, classical: bool) -> FontRef:
+    _fonts = (index.classical_fontrefs if classical else index.fontrefs)[name]
+    if (found := _find_style(index, name, style, classical)) is not None:
+        return _fonts[found]
+    match = next(iter(_match_font_styles(index, name, style, 1, 0.6, classical)), None)
+    if fuzzy and match:
+        return _fonts[match]
+    raise KeyError(
+        f"Font style {style!r} of font {name!r} not found."
+        + (f" Did you mean {match!r} ?" if match else "")
+    )
+
+
+def _get_font_styles(index: "FontIndex", name: FontFamilyName, localized: bool, fuzzy: bool, classical: bool) -> list[StyleName]:
+    family = _get_family(index, name, localized, fuzzy, classical)
+    return [st for st in (index.classical_fontrefs if classical else index.fontrefs)[family]]
+
+
+def _find_font(
+    index: "FontIndex", name: FontFamilyName, weight: int, width: int, italic: bool, localized: bool, fuzzy: bool
+) -> FontRef:
+    name = _get_family(index, name, localized, fuzzy, False)
+    slant_costs = (
+        {SLANT_ITALIC: 0, SLANT_OBLIQUE: 1, SLANT_ROMAN: 2} if italic
+        else {SLANT_ROMAN: 0, SLANT_OBLIQUE: 1, SLANT_ITALIC: 2}
+    )
+    heavier = weight > 500
+
+    def distance(attrs: FontAttributes) -> tuple[int, int, int, bool]:
+        return (
+            slant_costs[attrs.slant],
+            abs(attrs.width - width),
+            abs(attrs.weight - weight),
+            attrs.weight < weight if heavier else attrs.weight > weight,
+        )
+
+    styles = index.attributes[name]
+    return index.fontrefs[name][min(styles, key=lambda st: distance(styles[st]))]
@@ -0,0 +1,88 @@
+"""Bounded LRU cache for query results, invalidated by index generations."""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Callable, Optional, TypeVar, cast
+
+from typing_extensions import NamedTuple
+
+T = TypeVar("T")
+
+
+class QueryCacheInfo(NamedTuple):
+    """Statistics of the query cache."""
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class QueryCache:
+    """A thread-safe LRU cache of query results, including raised `KeyError`s.
+
+    All entries are dropped once a query passes a newer index generation,
+    results of queries passing an older one are not cached.
+    """
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._generation = 0
+        self._entries: "OrderedDict[Hashable, tuple[bool, object]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, key: Hashable, generation: int) -> Optional[tuple[bool, object]]:
+        with self._lock:
+            if generation > self._generation:
+                self._entries.clear()
+                self._generation = generation
+            if generation == self._generation and (entry := self._entries.get(key)) is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+            return None
+
+    def _store(self, key: Hashable, entry: tuple[bool, object], generation: int) -> None:
+        with self._lock:
+            # the index changed while querying, the result is of an older generation
+            if generation != self._generation or self.maxsize <= 0:
+                return
+            self._entries[key] = entry
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get(self, key: Hashable, query: Callable[[], T], generation: int) -> T:
+        """Get the cached result of a query, or run and cache it.
+
+        A cached `KeyError` is raised again with the same message.
+
+        Params:
+        - key: key of the query.
+        - query: function running the query.
+        - generation: generation of the index the query reads.
+        """
+        entry = self._lookup(key, generation)
+        if entry is None:
+            try:
+                result = query()
+            except KeyError as e:
+                self._store(key, (False, e.args), generation)
+                raise
+            self._store(key, (True, result), generation)
+            return result
+        ok, value = entry
+        if not ok:
+            raise KeyError(*cast("tuple[object, ...]", value))
+        return cast(T, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def info(self) -> QueryCacheInfo:
+        with self._lock:
+            return QueryCacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
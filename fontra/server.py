@@ -0,0 +1,162 @@
+"""Font query daemon over a Unix domain socket, see `fontra.client` for the protocol.
+
+The daemon answers queries by its in-process index, which should be initialized
+(and usually watched) before serving.
+"""
+
+import asyncio
+import json
+import os
+import signal
+import socket
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, Optional
+
+from . import (
+    all_fonts,
+    complete_font_names,
+    fallback_chain,
+    find_font,
+    fonts_covering,
+    get_font,
+    get_font_styles,
+    get_localized_name,
+    get_localized_names,
+    get_unlocalized_name,
+    has_font_family,
+    has_font_style,
+    match_font_name,
+    match_font_names,
+    match_font_style,
+    match_font_styles,
+    resolve_fonts,
+)
+from .client import STATUS_ERROR, STATUS_KEY_ERROR, STATUS_OK, disconnect_daemon, get_socket_path
+from .fontdb import get_fontdirs, get_index_generation
+from .typing import FontRef
+
+
+def _resolve_fonts(requests: list[list[str]], localized: bool, fuzzy: bool, classical: bool) -> list[Any]:
+    return [
+        [x.name, x.style, None if x.fontref is None else [str(x.fontref.path), x.fontref.bank], x.error]
+        for x in resolve_fonts([(name, style) for name, style in requests], localized, fuzzy, classical)
+    ]
+
+
+def _fontref(fontref: FontRef) -> list[Any]:
+    return [str(fontref.path), fontref.bank]
+
+
+# query functions by op, taking and returning JSON-compatible data
+_OPS: dict[str, Callable[..., Any]] = {
+    "ping": get_index_generation,
+    "get_fontdirs": lambda: [str(x) for x in get_fontdirs()],
+    "all_fonts": lambda classical=False: all_fonts(classical=classical),
+    "complete_font_names": lambda prefix, limit=10, localized=True, classical=False: [
+        list(x) for x in complete_font_names(prefix, limit, localized=localized, classical=classical)
+    ],
+    "get_font": lambda *args: _fontref(get_font(*args)),
+    "find_font": lambda *args: _fontref(find_font(*args)),
+    "fallback_chain": lambda *args: [_fontref(x) for x in fallback_chain(*args)],
+    "fonts_covering": lambda text: [_fontref(x) for x in fonts_covering(text)],
+    "has_font_family": has_font_family,
+    "has_font_style": has_font_style,
+    "get_font_styles": get_font_styles,
+    "get_unlocalized_name": get_unlocalized_name,
+    "get_localized_names": get_localized_names,
+    "get_localized_name": lambda name, language_id, platform_id=None: get_localized_name(
+        name, language_id, platform_id=platform_id
+    ),
+    "match_font_name": lambda name, cutoff=0.6, classical=False: match_font_name(
+        name, cutoff=cutoff, classical=classical
+    ),
+    "match_font_names": lambda name, cutoff=0.6, classical=False: match_font_names(
+        name, cutoff=cutoff, classical=classical
+    ),
+    "match_font_style": lambda name, style, cutoff=0.6, classical=False: match_font_style(
+        name, style, cutoff=cutoff, classical=classical
+    ),
+    "match_font_styles": lambda name, style, cutoff=0.6, classical=False: match_font_styles(
+        name, style, cutoff=cutoff, classical=classical
+    ),
+    "resolve_fonts": _resolve_fonts,
+}
+
+
+def _answer(line: bytes) -> bytes:
+    try:
+        op, *args = json.loads(line)
+        if (query := _OPS.get(op)) is None:
+            raise ValueError(f"unknown op {op!r}")
+        response = [STATUS_OK, query(*args)]
+    except KeyError as e:
+        response = [STATUS_KEY_ERROR, e.args[0] if e.args else ""]
+    except Exception as e:
+        response = [STATUS_ERROR, f"{type(e).__name__}: {e}"]
+    return json.dumps(response, ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while line := await reader.readline():
+            writer.write(_answer(line))
+            await writer.drain()
+    except (ConnectionError, ValueError):
+        # client gone, or a request line over the stream limit
+        pass
+    finally:
+        writer.close()
+
+
+def _remove_stale_socket(path: Path) -> None:
+    if not path.exists():
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(path))
+        except OSError:
+            path.unlink()
+            return
+    raise RuntimeError(f"A daemon is already serving on {str(path)!r}.")
+
+
+async def _serve(path: Path, ready: Optional[Callable[[Path], None]]) -> None:
+    # only accessible by the user from the moment it is bound
+    umask = os.umask(0o177)
+    try:
+        server = await asyncio.start_unix_server(_handle, path=str(path), limit=1 << 24)
+    finally:
+        os.umask(umask)
+    if ready is not None:
+        ready(path)
+    try:
+        # stop gracefully on SIGTERM, only possible in the main thread
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, server.close)
+    except (RuntimeError, ValueError, NotImplementedError):
+        pass
+    async with server:
+        try:
+            await server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+
+
+def serve(path: Optional[Path] = None, *, ready: Optional[Callable[[Path], None]] = None) -> None:
+    """Serve font queries over a Unix domain socket until interrupted.
+
+    Params:
+    - path: path to the socket, defaults to `fontra.client.get_socket_path()`.
+    - ready: called with the path once the daemon accepts connections.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise RuntimeError("Unix domain sockets are not supported on this platform.")
+    path = path or get_socket_path()
+    # always answer by the in-process index
+    disconnect_daemon()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _remove_stale_socket(path)
+    try:
+        asyncio.run(_serve(path, ready))
+    finally:
+        path.unlink(missing_ok=True)
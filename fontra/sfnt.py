@@ -0,0 +1,364 @@
+"""Minimal sfnt reader, which only parses what is needed for indexing.
+
+Reading names this way avoids creating FreeType faces (and loading glyph data)
+for TrueType/OpenType fonts and collections.
+"""
+
+import mmap
+import struct
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from typing import Optional, Union
+
+from typing_extensions import NamedTuple
+
+from .consts import SLANT_ITALIC, SLANT_OBLIQUE, SLANT_ROMAN
+from .typing import FontAttributes, SfntName
+
+SFNT_TAGS = (b"\x00\x01\x00\x00", b"OTTO", b"true")
+TTC_TAG = b"ttcf"
+
+NAME_ID_FAMILY = 1
+NAME_ID_SUBFAMILY = 2
+NAME_ID_TYPOGRAPHIC_FAMILY = 16
+NAME_ID_TYPOGRAPHIC_SUBFAMILY = 17
+NAME_ID_WWS_FAMILY = 21
+NAME_ID_WWS_SUBFAMILY = 22
+
+_FS_SELECTION_ITALIC = 1 << 0
+_FS_SELECTION_WWS = 1 << 8
+_FS_SELECTION_OBLIQUE = 1 << 9
+_MAC_STYLE_BOLD = 1 << 0
+_MAC_STYLE_ITALIC = 1 << 1
+
+_UCS4_CMAPS = ((3, 10), (0, 6), (0, 4))
+_UNICODE_CMAPS = ((3, 1), (0, 3), (0, 2), (0, 1), (0, 0))
+
+# smaller files are read at once, which is cheaper than mapping them
+_READ_LIMIT = 1 << 16
+# printable ASCII as is, other bytes as "?", like `tt_face_get_name` of FreeType
+_ASCII_TABLE = bytes(x if 32 <= x <= 127 else 0x3F for x in range(256))
+
+_Buffer = Union[bytes, mmap.mmap]
+
+
+class SfntFace(NamedTuple):
+    """Names, Unicode coverage and style attributes of a face read from the sfnt tables."""
+    family: str
+    style: str
+    names: list[SfntName]
+    coverage: list[tuple[int, int]]
+    attributes: FontAttributes
+
+
+def _read_tables(buf: _Buffer, offset: int) -> dict[bytes, tuple[int, int]]:
+    num_tables, = struct.unpack_from(">H", buf, offset + 4)
+    size, directory_end = len(buf), offset + 12 + 16 * num_tables
+    if directory_end > size:
+        raise ValueError("table directory exceeds the end of file")
+    tables: dict[bytes, tuple[int, int]] = {}
+    for tag, _, toffset, tlength in struct.iter_unpack(">4sLLL", buf[offset + 12:directory_end]):
+        if toffset + tlength > size:
+            raise ValueError(f"table {tag!r} exceeds the end of file")
+        tables[tag] = (toffset, tlength)
+    return tables
+
+
+def _read_names(buf: _Buffer, offset: int, length: int) -> list[SfntName]:
+    _, count, string_offset = struct.unpack_from(">HHH", buf, offset)
+    storage_start = offset + 6 + 12 * count
+    storage_limit = offset + length
+    if storage_start > storage_limit:
+        raise ValueError("name records exceed the name table")
+    names: list[SfntName] = []
+    for pid, eid, lid, nid, slength, soffset in struct.iter_unpack(">6H", buf[offset + 6:storage_start]):
+        start = offset + string_offset + soffset
+        # entries ignored by FreeType are skipped as well
+        if slength == 0 or start < storage_start or start + slength > storage_limit:
+            continue
+        names.append(SfntName(pid, eid, lid, nid, buf[start:start + slength]))
+    return names
+
+
+def to_ranges(codepoints: Iterable[int]) -> list[tuple[int, int]]:
+    """Merge codepoints into sorted inclusive ranges."""
+    ranges: list[tuple[int, int]] = []
+    for cp in sorted(set(codepoints)):
+        if ranges and ranges[-1][1] + 1 == cp:
+            ranges[-1] = (ranges[-1][0], cp)
+        else:
+            ranges.append((cp, cp))
+    return ranges
+
+
+def _merge_ranges(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    if not ranges:
+        return []
+    # usually sorted already, which takes a single pass
+    ranges = sorted(ranges)
+    merged: list[tuple[int, int]] = []
+    first, last = ranges[0]
+    for start, end in ranges:
+        if start <= last + 1:
+            if end > last:
+                last = end
+        else:
+            merged.append((first, last))
+            first, last = start, end
+    merged.append((first, last))
+    return merged
+
+
+def _mapped_ranges(first: int, glyphs: Sequence[int]) -> list[tuple[int, int]]:
+    # ranges of codepoints from `first` not mapped to glyph 0, found by runs between zeros
+    ranges: list[tuple[int, int]] = []
+    j = 0
+    while True:
+        try:
+            z = glyphs.index(0, j)
+        except ValueError:
+            z = len(glyphs)
+        if j < z:
+            ranges.append((first + j, first + z - 1))
+        if z == len(glyphs):
+            return ranges
+        j = z + 1
+
+
+def _read_cmap_format4(buf: _Buffer, offset: int) -> list[tuple[int, int]]:
+    seg_count = struct.unpack_from(">H", buf, offset + 6)[0] // 2
+    ends = struct.unpack_from(f">{seg_count}H", buf, offset + 14)
+    starts = struct.unpack_from(f">{seg_count}H", buf, offset + 16 + 2 * seg_count)
+    deltas = struct.unpack_from(f">{seg_count}H", buf, offset + 16 + 4 * seg_count)
+    range_offsets_pos = offset + 16 + 6 * seg_count
+    range_offsets = struct.unpack_from(f">{seg_count}H", buf, range_offsets_pos)
+    ranges: list[tuple[int, int]] = []
+    for i, (start, end, delta, range_offset) in enumerate(zip(starts, ends, deltas, range_offsets)):
+        if start > end or start == 0xFFFF:
+            continue
+        if range_offset == 0:
+            # only the codepoint mapped to glyph 0 is missing
+            missing = (-delta) & 0xFFFF
+            if start <= missing <= end:
+                ranges.extend(r for r in ((start, missing - 1), (missing + 1, end)) if r[0] <= r[1])
+            else:
+                ranges.append((start, end))
+            continue
+        glyphs = struct.unpack_from(
+            f">{end - start + 1}H", buf, range_offsets_pos + 2 * i + range_offset
+        )
+        ranges.extend(_mapped_ranges(start, glyphs))
+    return ranges
+
+
+def _read_cmap_subtable(buf: _Buffer, offset: int) -> Optional[list[tuple[int, int]]]:
+    fmt, = struct.unpack_from(">H", buf, offset)
+    if fmt == 0:
+        return _mapped_ranges(0, buf[offset + 6:offset + 262])
+    if fmt == 4:
+        return _merge_ranges(_read_cmap_format4(buf, offset))
+    if fmt == 6:
+        first, count = struct.unpack_from(">HH", buf, offset + 6)
+        glyphs = struct.unpack_from(f">{count}H", buf, offset + 10)
+        return _mapped_ranges(first, glyphs)
+    if fmt in (12, 13):
+        num_groups, = struct.unpack_from(">L", buf, offset + 12)
+        groups = struct.unpack_from(f">{3 * num_groups}L", buf, offset + 16)
+        starts, ends, gids = groups[0::3], groups[1::3], groups[2::3]
+        if 0 not in gids:
+            return _merge_ranges([r for r in zip(starts, ends) if r[0] <= r[1]])
+        ranges: list[tuple[int, int]] = []
+        for start, end, gid in zip(starts, ends, gids):
+            if gid == 0:
+                if fmt == 13:
+                    continue
+                # only the first codepoint maps to glyph 0
+                start += 1
+            if start <= end:
+                ranges.append((start, end))
+        return _merge_ranges(ranges)
+    return None
+
+
+def _read_coverage(buf: _Buffer, offset: int, length: int) -> list[tuple[int, int]]:
+    num_tables, = struct.unpack_from(">H", buf, offset + 2)
+    subtables: dict[tuple[int, int], int] = {}
+    for i in range(num_tables):
+        pid, eid, soffset = struct.unpack_from(">HHL", buf, offset + 4 + 8 * i)
+        if soffset >= length:
+            raise ValueError("cmap subtable exceeds the cmap table")
+        subtables.setdefault((pid, eid), offset + soffset)
+    # prefer UCS-4 charmaps like FreeType does, then any other Unicode charmap
+    for ids in (_UCS4_CMAPS, _UNICODE_CMAPS):
+        for key in ids:
+            if key in subtables and (ranges := _read_cmap_subtable(buf, subtables[key])) is not None:
+                return ranges
+    return []
+
+
+def _to_ascii(name: SfntName) -> str:
+    string = name.string
+    if name.platform_id != 1:
+        # big-endian 16-bit units, those below 256 are their low bytes
+        high, string = string[0:len(string) - 1:2], string[1::2]
+        if high.count(0) != len(high):
+            units = [int.from_bytes(name.string[i:i + 2], "big") for i in range(0, len(name.string) - 1, 2)]
+            if 0 in units:
+                units = units[:units.index(0)]
+            return "".join(chr(x) if 32 <= x <= 127 else "?" for x in units)
+    if (end := string.find(0)) >= 0:
+        string = string[:end]
+    return string.translate(_ASCII_TABLE).decode("latin-1")
+
+
+def _get_ft_name(names: Sequence[SfntName], name_id: int) -> Optional[str]:
+    # follows `tt_face_get_name` of FreeType to get identical face names
+    found_apple = found_apple_roman = found_apple_english = -1
+    found_win = found_unicode = -1
+    is_english = False
+    for n, x in enumerate(names):
+        if x.name_id != name_id:
+            continue
+        if x.platform_id in (0, 2):
+            found_unicode = n
+        elif x.platform_id == 1:
+            if x.language_id == 0:
+                found_apple_english = n
+            elif x.encoding_id == 0:
+                found_apple_roman = n
+        elif x.platform_id == 3:
+            if (found_win == -1 or (x.language_id & 0x3FF) == 0x009) and x.encoding_id in (0, 1, 10):
+                is_english = (x.language_id & 0x3FF) == 0x009
+                found_win = n
+    found_apple = found_apple_english if found_apple_english >= 0 else found_apple_roman
+    if found_win >= 0 and not (found_apple >= 0 and not is_english):
+        return _to_ascii(names[found_win])
+    if found_apple >= 0:
+        return _to_ascii(names[found_apple])
+    if found_unicode >= 0:
+        return _to_ascii(names[found_unicode])
+    return None
+
+
+def _get_first_ft_name(names: dict[int, list[SfntName]], *name_ids: int) -> Optional[str]:
+    for name_id in name_ids:
+        if name_id in names and (name := _get_ft_name(names[name_id], name_id)) is not None:
+            return name
+    return None
+
+
+def _read_attributes(buf: _Buffer, tables: dict[bytes, tuple[int, int]]) -> FontAttributes:
+    mac_style = 0
+    if (head := tables.get(b"head") or tables.get(b"bhed")) and head[1] >= 46:
+        mac_style, = struct.unpack_from(">H", buf, head[0] + 44)
+    weight = 700 if mac_style & _MAC_STYLE_BOLD else 400
+    width = 5
+    slant = SLANT_ITALIC if mac_style & _MAC_STYLE_ITALIC else SLANT_ROMAN
+    if (os2 := tables.get(b"OS/2")) and os2[1] >= 8:
+        weight_class, width_class = struct.unpack_from(">HH", buf, os2[0] + 4)
+        if 1 <= weight_class <= 9:
+            # some fonts use a scale of 1 to 9
+            weight_class *= 100
+        if 1 <= weight_class <= 1000:
+            weight = weight_class
+        if 1 <= width_class <= 9:
+            width = width_class
+        if os2[1] >= 64:
+            fs_selection, = struct.unpack_from(">H", buf, os2[0] + 62)
+            if fs_selection & _FS_SELECTION_OBLIQUE:
+                slant = SLANT_OBLIQUE
+            elif fs_selection & _FS_SELECTION_ITALIC:
+                slant = SLANT_ITALIC
+    return FontAttributes(weight, width, slant)
+
+
+def _read_face(buf: _Buffer, offset: int) -> Optional[SfntFace]:
+    if buf[offset:offset + 4] not in SFNT_TAGS:
+        return None
+    tables = _read_tables(buf, offset)
+    if b"name" not in tables or (b"head" not in tables and b"bhed" not in tables):
+        return None
+    names = _read_names(buf, *tables[b"name"])
+    wws = False
+    if (os2 := tables.get(b"OS/2")) and os2[1] >= 78:
+        fs_selection, = struct.unpack_from(">H", buf, os2[0] + 62)
+        wws = bool(fs_selection & _FS_SELECTION_WWS)
+    lookups: tuple[tuple[int, ...], ...]
+    if wws:
+        lookups = (
+            (NAME_ID_TYPOGRAPHIC_FAMILY, NAME_ID_FAMILY),
+            (NAME_ID_TYPOGRAPHIC_SUBFAMILY, NAME_ID_SUBFAMILY)
+        )
+    else:
+        lookups = (
+            (NAME_ID_WWS_FAMILY, NAME_ID_TYPOGRAPHIC_FAMILY, NAME_ID_FAMILY),
+            (NAME_ID_WWS_SUBFAMILY, NAME_ID_TYPOGRAPHIC_SUBFAMILY, NAME_ID_SUBFAMILY)
+        )
+    names_by_id: dict[int, list[SfntName]] = {}
+    for x in names:
+        names_by_id.setdefault(x.name_id, []).append(x)
+    family, style = (_get_first_ft_name(names_by_id, *ids) for ids in lookups)
+    if family is None or style is None:
+        return None
+    coverage = _read_coverage(buf, *tables[b"cmap"]) if b"cmap" in tables else []
+    return SfntFace(family, style, names, coverage, _read_attributes(buf, tables))
+
+
+def _read_faces(buf: _Buffer) -> Optional[list[SfntFace]]:
+    if buf[:4] == TTC_TAG:
+        num_fonts, = struct.unpack_from(">L", buf, 8)
+        offsets = struct.unpack_from(f">{num_fonts}L", buf, 12)
+    else:
+        offsets = (0,)
+    faces: list[SfntFace] = []
+    for offset in offsets:
+        if (face := _read_face(buf, offset)) is None:
+            return None
+        faces.append(face)
+    return faces
+
+
+def read_sfnt_faces(fn: Path) -> Optional[list[SfntFace]]:
+    """Read names of all faces in a TrueType/OpenType font or collection.
+
+    Params:
+    - fn: path to the font file.
+
+    Return: a list of faces ordered by face index,
+    or None if the file is not a supported sfnt font or is malformed.
+    """
+    try:
+        with open(fn, "rb") as f:
+            if len(data := f.read(_READ_LIMIT)) < _READ_LIMIT:
+                return _read_faces(data)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                return _read_faces(buf)
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def read_sfnt_versions(fn: Path) -> Optional[list[bytes]]:
+    """Read sfnt versions of all faces in a TrueType/OpenType font or collection.
+
+    Params:
+    - fn: path to the font file.
+
+    Return: a list of sfnt version tags ordered by face index (`b"OTTO"` for CFF outlines),
+    or None if the file is not a supported sfnt font or is malformed.
+    """
+    try:
+        with open(fn, "rb") as f:
+            header = f.read(12)
+            if header[:4] != TTC_TAG:
+                return [header[:4]] if header[:4] in SFNT_TAGS else None
+            num_fonts, = struct.unpack_from(">L", header, 8)
+            offsets = struct.unpack(f">{num_fonts}L", f.read(4 * num_fonts))
+            versions: list[bytes] = []
+            for offset in offsets:
+                f.seek(offset)
+                if (version := f.read(4)) not in SFNT_TAGS:
+                    return None
+                versions.append(version)
+            return versions
+    except (OSError, ValueError, struct.error):
+        return None
@@ -0,0 +1,523 @@
+"""Read-only font index snapshots, shared between processes by memory mapping.
+
+A snapshot is written once by `build_snapshot(...)` (or `fontra snapshot build`),
+then attached by `load_snapshot(...)` in every process. Lookups read the mapped file in place,
+so processes share the OS page cache instead of each holding a copy of the index.
+
+Layout, in native byte order:
+- a header with the magic, version, n-gram size and (offset, length) of each section.
+- a string table sorted by UTF-8 bytes, as `count + 1` offsets and the UTF-8 data.
+- tables of fixed-width records of unsigned 32-bit integers, referring to strings by ids,
+  each sorted by its first column.
+"""
+
+import mmap
+import os
+import struct
+from bisect import bisect_right
+from collections import Counter
+from collections.abc import Iterable, Iterator, Mapping
+from pathlib import Path
+from typing import Any, Callable, Optional, TypeVar, cast
+
+from . import fontdb
+from .cache import get_cache_dir
+from .coverage import PAGE_BITS
+from .ngram import NgramIndex, normalize_name
+from .prefix import PrefixIndex
+from .typing import FontAttributes, FontFamilyName, FontRef, StyleName
+
+SNAPSHOT_MAGIC = b"FONTRASS"
+SNAPSHOT_VERSION = 1
+
+V = TypeVar("V")
+
+# section name -> record width in 32-bit integers, 0 for raw bytes
+_SECTIONS = {
+    "string_offsets": 1,
+    "string_data": 0,
+    # family id, first face, face count
+    "families": 3,
+    # style id, path id, bank, weight, width, slant
+    "faces": 6,
+    "classical_families": 3,
+    "classical_faces": 6,
+    # localized name id, family id
+    "langnames": 2,
+    # family id, first name, name count
+    "locname_families": 3,
+    # localized name id, platform id, encoding id, language id
+    "locnames": 4,
+    # n-gram id, first posting, posting count
+    "grams": 3,
+    # family id
+    "postings": 1,
+    "classical_grams": 3,
+    "classical_postings": 1,
+    # path id, bank, first range, range count
+    "coverage_faces": 4,
+    "coverage_starts": 1,
+    "coverage_ends": 1,
+    # page, first face, face count
+    "coverage_pages": 3,
+    # coverage face index
+    "coverage_page_faces": 1,
+}
+_HEADER = struct.Struct(f"=8sIII{len(_SECTIONS) * 2}Q")
+_BYTE_ORDER_MARK = 0x01020304
+_ALIGNMENT = 8
+
+
+def get_snapshot_file() -> Path:
+    """Get the default path of the index snapshot file."""
+    return get_cache_dir() / f"index-v{SNAPSHOT_VERSION}.snapshot"
+
+
+class _Table:
+    """Fixed-width records of unsigned 32-bit integers, sorted by the first column."""
+
+    def __init__(self, data: memoryview, width: int) -> None:
+        self.data = data
+        self.width = width
+
+    def __len__(self) -> int:
+        return len(self.data) // self.width
+
+    def get(self, i: int, column: int) -> int:
+        return self.data[i * self.width + column]
+
+    def find(self, key: int) -> int:
+        """Get the index of the first record with the key, or -1 if not found."""
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.data[mid * self.width] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < len(self) and self.data[lo * self.width] == key else -1
+
+
+class Snapshot:
+    """A memory-mapped index snapshot file."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError(f"{str(path)!r} is not a fontra index snapshot.")
+        magic, version, byte_order_mark, self.n, *sections = _HEADER.unpack_from(self._mmap)
+        if magic != SNAPSHOT_MAGIC or byte_order_mark != _BYTE_ORDER_MARK:
+            raise ValueError(f"{str(path)!r} is not a fontra index snapshot.")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported version {version} of index snapshot {str(path)!r}.")
+        buf = memoryview(self._mmap)
+        self._tables: dict[str, _Table] = {}
+        for (name, width), offset, length in zip(_SECTIONS.items(), sections[::2], sections[1::2]):
+            if offset + length > len(buf):
+                raise ValueError(f"Index snapshot {str(path)!r} is truncated.")
+            if width:
+                self._tables[name] = _Table(buf[offset:offset + length].cast("I"), width)
+            else:
+                self._string_data = buf[offset:offset + length]
+        self._string_offsets = self._tables["string_offsets"].data
+
+    def table(self, name: str) -> _Table:
+        return self._tables[name]
+
+    def string(self, id_: int) -> str:
+        return str(
+            self._string_data[self._string_offsets[id_]:self._string_offsets[id_ + 1]],
+            "utf-8", "surrogateescape"
+        )
+
+    def string_id(self, string: object) -> int:
+        """Get the id of a string by binary search, or -1 if not found."""
+        if not isinstance(string, str):
+            return -1
+        key = string.encode("utf-8", "surrogateescape")
+        data, offsets = self._string_data, self._string_offsets
+        lo, hi = 0, len(offsets) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if data[offsets[mid]:offsets[mid + 1]].tobytes() < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(offsets) - 1 and data[offsets[lo]:offsets[lo + 1]].tobytes() == key:
+            return lo
+        return -1
+
+    def fontref(self, path_id: int, bank: int) -> FontRef:
+        return FontRef(Path(self.string(path_id)), bank)
+
+
+class SnapshotStyles(Mapping[StyleName, V]):
+    """Read-only view of the styles of a font family in a snapshot."""
+
+    def __init__(self, snapshot: Snapshot, faces: _Table, first: int, count: int, value: Callable[[int], V]) -> None:
+        self._snapshot = snapshot
+        self._faces = faces
+        self._range = range(first, first + count)
+        self._value = value
+
+    def __getitem__(self, style: StyleName) -> V:
+        if (style_id := self._snapshot.string_id(style)) >= 0:
+            for i in self._range:
+                if self._faces.get(i, 0) == style_id:
+                    return self._value(i)
+        raise KeyError(style)
+
+    def __iter__(self) -> Iterator[StyleName]:
+        return (self._snapshot.string(self._faces.get(i, 0)) for i in self._range)
+
+    def __len__(self) -> int:
+        return len(self._range)
+
+
+class SnapshotFamilies(Mapping[FontFamilyName, Mapping[StyleName, V]]):
+    """Read-only view of a font family index in a snapshot, sorted by family names."""
+
+    def __init__(self, snapshot: Snapshot, families: _Table, faces: _Table, value: Callable[[int], V]) -> None:
+        self._snapshot = snapshot
+        self._families = families
+        self._faces = faces
+        self._value = value
+
+    def _find(self, family: object) -> int:
+        if (family_id := self._snapshot.string_id(family)) < 0:
+            return -1
+        return self._families.find(family_id)
+
+    def __getitem__(self, family: FontFamilyName) -> Mapping[StyleName, V]:
+        if (i := self._find(family)) < 0:
+            raise KeyError(family)
+        return SnapshotStyles(
+            self._snapshot, self._faces, self._families.get(i, 1), self._families.get(i, 2), self._value
+        )
+
+    def __contains__(self, family: object) -> bool:
+        return self._find(family) >= 0
+
+    def __iter__(self) -> Iterator[FontFamilyName]:
+        return (self._snapshot.string(self._families.get(i, 0)) for i in range(len(self._families)))
+
+    def __len__(self) -> int:
+        return len(self._families)
+
+
+class SnapshotLangnames(Mapping[FontFamilyName, FontFamilyName]):
+    """Read-only view of the localized name to family name map in a snapshot."""
+
+    def __init__(self, snapshot: Snapshot) -> None:
+        self._snapshot = snapshot
+        self._table = snapshot.table("langnames")
+
+    def __getitem__(self, name: FontFamilyName) -> FontFamilyName:
+        if (name_id := self._snapshot.string_id(name)) < 0 or (i := self._table.find(name_id)) < 0:
+            raise KeyError(name)
+        return self._snapshot.string(self._table.get(i, 1))
+
+    def __iter__(self) -> Iterator[FontFamilyName]:
+        return (self._snapshot.string(self._table.get(i, 0)) for i in range(len(self._table)))
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+
+class SnapshotLocalizedNames(Mapping[FontFamilyName, dict[FontFamilyName, list[tuple[int, int, int]]]]):
+    """Read-only view of localized names of font families in a snapshot."""
+
+    def __init__(self, snapshot: Snapshot) -> None:
+        self._snapshot = snapshot
+        self._families = snapshot.table("locname_families")
+        self._names = snapshot.table("locnames")
+
+    def __getitem__(self, family: FontFamilyName) -> dict[FontFamilyName, list[tuple[int, int, int]]]:
+        if (family_id := self._snapshot.string_id(family)) < 0 or (i := self._families.find(family_id)) < 0:
+            raise KeyError(family)
+        first = self._families.get(i, 1)
+        result: dict[FontFamilyName, list[tuple[int, int, int]]] = {}
+        for j in range(first, first + self._families.get(i, 2)):
+            result.setdefault(self._snapshot.string(self._names.get(j, 0)), []).append(
+                (self._names.get(j, 1), self._names.get(j, 2), self._names.get(j, 3))
+            )
+        return result
+
+    def __iter__(self) -> Iterator[FontFamilyName]:
+        return (self._snapshot.string(self._families.get(i, 0)) for i in range(len(self._families)))
+
+    def __len__(self) -> int:
+        return len(self._families)
+
+
+class SnapshotNgramIndex(NgramIndex):
+    """Read-only `NgramIndex` over the posting lists in a snapshot."""
+
+    def __init__(self, snapshot: Snapshot, grams: _Table, postings: _Table, families: Mapping[str, Any]) -> None:
+        self.n = snapshot.n
+        self._snapshot = snapshot
+        self._grams = grams
+        self._postings_table = postings
+        self._families = families
+
+    def __len__(self) -> int:
+        return len(self._families)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._families
+
+    def add(self, name: str) -> None:
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    def discard(self, name: str) -> None:
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    def clear(self) -> None:
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    def _count_shared(self, query: str) -> dict[str, int]:
+        shared: Counter[int] = Counter()
+        for gram in self._ngrams(query):
+            if (gram_id := self._snapshot.string_id(gram)) < 0 or (i := self._grams.find(gram_id)) < 0:
+                continue
+            first = self._grams.get(i, 1)
+            shared.update(self._postings_table.data[first:first + self._grams.get(i, 2)])
+        return {self._snapshot.string(name_id): count for name_id, count in shared.items()}
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._families)
+
+
+class SnapshotCoverageIndex:
+    """Read-only `CoverageIndex` over the codepoint ranges in a snapshot."""
+
+    def __init__(self, snapshot: Snapshot) -> None:
+        self._snapshot = snapshot
+        self._faces = snapshot.table("coverage_faces")
+        self._starts = snapshot.table("coverage_starts").data
+        self._ends = snapshot.table("coverage_ends").data
+        self._pages = snapshot.table("coverage_pages")
+        self._page_faces = snapshot.table("coverage_page_faces").data
+
+    def __len__(self) -> int:
+        return len(self._faces)
+
+    def __iter__(self) -> Iterator[FontRef]:
+        return (self._fontref(i) for i in range(len(self._faces)))
+
+    def __contains__(self, fontref: object) -> bool:
+        return isinstance(fontref, FontRef) and self._find(fontref) >= 0
+
+    def _fontref(self, i: int) -> FontRef:
+        return self._snapshot.fontref(self._faces.get(i, 0), self._faces.get(i, 1))
+
+    def _find(self, fontref: FontRef) -> int:
+        if (path_id := self._snapshot.string_id(str(fontref.path))) < 0 or (i := self._faces.find(path_id)) < 0:
+            return -1
+        while i < len(self._faces) and self._faces.get(i, 0) == path_id:
+            if self._faces.get(i, 1) == fontref.bank:
+                return i
+            i += 1
+        return -1
+
+    def _covers(self, i: int, codepoint: int) -> bool:
+        first = self._faces.get(i, 2)
+        j = bisect_right(self._starts, codepoint, first, first + self._faces.get(i, 3)) - 1
+        return j >= first and codepoint <= self._ends[j]
+
+    def covers(self, fontref: FontRef, codepoint: int) -> bool:
+        """Check whether a face covers a codepoint."""
+        return (i := self._find(fontref)) >= 0 and self._covers(i, codepoint)
+
+    def faces_covering(self, codepoint: int) -> set[FontRef]:
+        """Get all faces covering a codepoint."""
+        if (p := self._pages.find(codepoint >> PAGE_BITS)) < 0:
+            return set()
+        first = self._pages.get(p, 1)
+        return {
+            self._fontref(i) for i in self._page_faces[first:first + self._pages.get(p, 2)]
+            if self._covers(i, codepoint)
+        }
+
+    def get_ranges(self, fontref: FontRef) -> list[tuple[int, int]]:
+        """Get the codepoint ranges covered by a face."""
+        if (i := self._find(fontref)) < 0:
+            return []
+        first = self._faces.get(i, 2)
+        end = first + self._faces.get(i, 3)
+        return list(zip(self._starts[first:end], self._ends[first:end]))
+
+
+def _build_sections() -> tuple[int, dict[str, bytes]]:
+    from array import array
+
+    font_index = fontdb.get_font_index()
+    fontrefs = font_index.fontrefs
+    classical_fontrefs = font_index.classical_fontrefs
+    ngrams = font_index.fontref_ngrams
+    classical_ngrams = font_index.classical_ngrams
+    langnames = font_index.langnames
+    localized_names = font_index.localized_names
+    coverage = cast(Iterable[FontRef], font_index.coverage)
+    family_grams = {name: ngrams._ngrams(normalize_name(name)) for name in fontrefs}
+    classical_grams = {name: classical_ngrams._ngrams(normalize_name(name)) for name in classical_fontrefs}
+    strings: set[str] = set()
+    for index in (fontrefs, classical_fontrefs):
+        for family, styles in index.items():
+            strings.add(family)
+            for style, fontref in styles.items():
+                strings.update((style, str(fontref.path)))
+    strings.update(langnames)
+    strings.update(langnames.values())
+    for family, names in localized_names.items():
+        strings.add(family)
+        strings.update(names)
+    for grams in (*family_grams.values(), *classical_grams.values()):
+        strings.update(grams)
+    strings.update(str(fontref.path) for fontref in coverage)
+
+    encoded = sorted(x.encode("utf-8", "surrogateescape") for x in strings)
+    ids = {x.decode("utf-8", "surrogateescape"): i for i, x in enumerate(encoded)}
+    offsets = array("I", [0])
+    for x in encoded:
+        offsets.append(offsets[-1] + len(x))
+    sections: dict[str, Any] = {"string_offsets": offsets, "string_data": b"".join(encoded)}
+
+    def families_section(name: str, index: Mapping[str, Mapping[str, FontRef]], with_attributes: bool) -> None:
+        families, faces = array("I"), array("I")
+        for family in sorted(index, key=ids.__getitem__):
+            styles = index[family]
+            families.extend((ids[family], len(faces) // 6, len(styles)))
+            for style, fontref in styles.items():
+                attrs = font_index.attributes[family][style] if with_attributes else FontAttributes(0, 0, 0)
+                faces.extend((ids[style], ids[str(fontref.path)], fontref.bank, *attrs))
+        sections[name + "families"] = families
+        sections[name + "faces"] = faces
+
+    def grams_section(name: str, grams_of: dict[str, set[str]]) -> None:
+        postings: dict[int, list[int]] = {}
+        for family, grams in grams_of.items():
+            for gram in grams:
+                postings.setdefault(ids[gram], []).append(ids[family])
+        grams_table, postings_table = array("I"), array("I")
+        for gram_id in sorted(postings):
+            grams_table.extend((gram_id, len(postings_table), len(postings[gram_id])))
+            postings_table.extend(sorted(postings[gram_id]))
+        sections[name + "grams"] = grams_table
+        sections[name + "postings"] = postings_table
+
+    families_section("", fontrefs, True)
+    families_section("classical_", classical_fontrefs, False)
+    grams_section("", family_grams)
+    grams_section("classical_", classical_grams)
+    sections["langnames"] = array("I", (
+        x for name in sorted(langnames, key=ids.__getitem__)
+        for x in (ids[name], ids[langnames[name]])
+    ))
+    locname_families, locnames = array("I"), array("I")
+    for family in sorted(localized_names, key=ids.__getitem__):
+        rows = [
+            (ids[name], *id_) for name, ids_ in localized_names[family].items() for id_ in ids_
+        ]
+        locname_families.extend((ids[family], len(locnames) // 4, len(rows)))
+        for row in rows:
+            locnames.extend(row)
+    sections["locname_families"] = locname_families
+    sections["locnames"] = locnames
+
+    coverage_faces, starts, ends = array("I"), array("I"), array("I")
+    pages: dict[int, list[int]] = {}
+    for i, fontref in enumerate(sorted(coverage, key=lambda x: (ids[str(x.path)], x.bank))):
+        ranges = font_index.coverage.get_ranges(fontref)
+        coverage_faces.extend((ids[str(fontref.path)], fontref.bank, len(starts), len(ranges)))
+        for start, end in ranges:
+            starts.append(start)
+            ends.append(end)
+        for page in {
+            page for start, end in ranges for page in range(start >> PAGE_BITS, (end >> PAGE_BITS) + 1)
+        }:
+            pages.setdefault(page, []).append(i)
+    coverage_pages, page_faces = array("I"), array("I")
+    for page in sorted(pages):
+        coverage_pages.extend((page, len(page_faces), len(pages[page])))
+        page_faces.extend(pages[page])
+    sections.update(
+        coverage_faces=coverage_faces, coverage_starts=starts, coverage_ends=ends,
+        coverage_pages=coverage_pages, coverage_page_faces=page_faces
+    )
+    return ngrams.n, {name: bytes(sections[name]) for name in _SECTIONS}
+
+
+def build_snapshot(path: Optional[Path] = None) -> Path:
+    """Write the current index into a snapshot file, replacing it atomically.
+
+    Params:
+    - path: path to the snapshot file, defaults to `get_snapshot_file()`.
+
+    Return: path to the snapshot file.
+    """
+    fontdb.wait_fontdb()
+    path = path or get_snapshot_file()
+    n, sections = _build_sections()
+    layout: list[int] = []
+    offset = _HEADER.size
+    for data in sections.values():
+        offset += -offset % _ALIGNMENT
+        layout.extend((offset, len(data)))
+        offset += len(data)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, _BYTE_ORDER_MARK, n, *layout))
+        for data, section_offset in zip(sections.values(), layout[::2]):
+            f.write(b"\0" * (section_offset - f.tell()))
+            f.write(data)
+    os.replace(tmp, path)
+    return path
+
+
+def load_snapshot(path: Optional[Path] = None) -> None:
+    """Attach the index to a snapshot file, replacing the current index.
+
+    The snapshot is read-only: `add_font_files(...)` and `remove_font_files(...)` raise
+    `RuntimeError` until the index is rebuilt by `update_fontrefs_index(...)`.
+    An initialization running in the background (see `init_fontdb(background=True)`)
+    is waited for first, so it does not replace the snapshot once done.
+
+    Params:
+    - path: path to the snapshot file, defaults to `get_snapshot_file()`.
+    """
+    path = path or get_snapshot_file()
+    snapshot = Snapshot(path)
+
+    def fontref(i: int) -> FontRef:
+        return snapshot.fontref(faces.get(i, 1), faces.get(i, 2))
+
+    def attributes(i: int) -> FontAttributes:
+        return FontAttributes(faces.get(i, 3), faces.get(i, 4), faces.get(i, 5))
+
+    def classical_fontref(i: int) -> FontRef:
+        return snapshot.fontref(classical_faces.get(i, 1), classical_faces.get(i, 2))
+
+    families, faces = snapshot.table("families"), snapshot.table("faces")
+    classical_families, classical_faces = snapshot.table("classical_families"), snapshot.table("classical_faces")
+    fontrefs = SnapshotFamilies(snapshot, families, faces, fontref)
+    classical_fontrefs = SnapshotFamilies(snapshot, classical_families, classical_faces, classical_fontref)
+    langnames = SnapshotLangnames(snapshot)
+    fontdb._replace_index(fontdb.FontIndex(
+        cast(Any, fontrefs),
+        cast(Any, classical_fontrefs),
+        cast(Any, langnames),
+        cast(Any, SnapshotLocalizedNames(snapshot)),
+        SnapshotNgramIndex(snapshot, snapshot.table("grams"), snapshot.table("postings"), fontrefs),
+        SnapshotNgramIndex(
+            snapshot, snapshot.table("classical_grams"), snapshot.table("classical_postings"), classical_fontrefs
+        ),
+        cast(Any, SnapshotCoverageIndex(snapshot)),
+        cast(Any, SnapshotFamilies(snapshot, families, faces, attributes)),
+        # sorted when published
+        PrefixIndex(fontrefs, langnames, classical_fontrefs),
+        snapshot_path=path,
+    ))
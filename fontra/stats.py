@@ -0,0 +1,163 @@
+"""Instrumentation of font indexing: phase timings, per-file load costs and failures."""
+
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+from typing_extensions import NamedTuple, TypeAlias
+
+
+class PhaseTiming(NamedTuple):
+    """Time spent in a phase of indexing.
+
+    Phases are `walk` (listing font files), `stat` (checking files against the cache),
+    `cache_load`, `scan` (loading font files), `index` (building the index) and `cache_save`.
+    """
+    phase: str
+    seconds: float
+
+
+class FileCost(NamedTuple):
+    """Time spent loading a font file."""
+    path: Path
+    seconds: float
+    faces: int
+    parser: str
+    """`"sfnt"` if read by the sfnt table reader, `"freetype"` if FreeType was needed."""
+
+
+class FailedFile(NamedTuple):
+    """A font file which failed to load."""
+    path: Path
+    reason: str
+
+
+IndexEvent: TypeAlias = Union[PhaseTiming, FileCost, FailedFile]
+IndexHook: TypeAlias = Callable[[IndexEvent], None]
+
+
+class IndexStats:
+    """Statistics of building the index, and of incremental updates since then."""
+
+    def __init__(self) -> None:
+        self.phases: dict[str, float] = {}
+        """Seconds spent in each phase, see `PhaseTiming`."""
+        self.loaded: list[FileCost] = []
+        """Font files loaded (not reused from the cache), in loading order."""
+        self.failures: list[FailedFile] = []
+        self.cached_files = 0
+        """Number of font files reused from the cache."""
+        self.files = 0
+        self.faces = 0
+        self.families = 0
+        self.classical_families = 0
+        self.localized_names = 0
+
+    def record(self, event: IndexEvent) -> None:
+        if isinstance(event, PhaseTiming):
+            self.phases[event.phase] = self.phases.get(event.phase, 0.0) + event.seconds
+        elif isinstance(event, FileCost):
+            self.loaded.append(event)
+        else:
+            self.failures.append(event)
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.phases.values())
+
+    def slowest(self, n: int = 10) -> list[FileCost]:
+        """Get the `n` font files which took the longest to load."""
+        return sorted(self.loaded, key=lambda x: -x.seconds)[:n]
+
+    def as_dict(self, slowest: int = 10) -> dict[str, Any]:
+        """Get the statistics as JSON-serializable data, with the `slowest` font files."""
+        return {
+            "total_seconds": self.total_seconds,
+            "phases": dict(self.phases),
+            "files": self.files,
+            "loaded_files": len(self.loaded),
+            "cached_files": self.cached_files,
+            "faces": self.faces,
+            "families": self.families,
+            "classical_families": self.classical_families,
+            "localized_names": self.localized_names,
+            "slowest": [
+                {"path": str(x.path), "seconds": x.seconds, "faces": x.faces, "parser": x.parser}
+                for x in self.slowest(slowest)
+            ],
+            "failures": [{"path": str(x.path), "reason": x.reason} for x in self.failures],
+        }
+
+
+_hooks: list[IndexHook] = []
+_lock = threading.Lock()
+# statistics of the current index, and of the rebuild being collected
+_stats = IndexStats()
+_next_stats: Optional[IndexStats] = None
+
+
+def add_index_hook(hook: IndexHook) -> None:
+    """Call a function with every `PhaseTiming`, `FileCost` and `FailedFile` event of indexing.
+
+    Hooks are called in the indexing thread, exceptions raised by them abort indexing.
+    """
+    with _lock:
+        _hooks.append(hook)
+
+
+def remove_index_hook(hook: IndexHook) -> None:
+    """Stop calling a function added by `add_index_hook(...)`."""
+    with _lock:
+        _hooks.remove(hook)
+
+
+def get_index_stats() -> IndexStats:
+    """Get statistics of the last index build, including incremental updates since then."""
+    return _stats
+
+
+def _emit(event: IndexEvent, rebuild: bool) -> None:
+    global _next_stats
+    with _lock:
+        if rebuild:
+            if _next_stats is None:
+                _next_stats = IndexStats()
+            _next_stats.record(event)
+        else:
+            _stats.record(event)
+        hooks = tuple(_hooks)
+    for hook in hooks:
+        hook(event)
+
+
+@contextmanager
+def _phase(phase: str, rebuild: bool = True) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _emit(PhaseTiming(phase, time.perf_counter() - start), rebuild)
+
+
+def _publish(cached_files: int, counts: tuple[int, int, int, int, int]) -> None:
+    """Make the statistics collected for a rebuild current.
+
+    `counts` are numbers of files, faces, families, classical families and localized names in the index.
+    """
+    global _stats, _next_stats
+    with _lock:
+        stats = _next_stats or IndexStats()
+        stats.cached_files = cached_files
+        _stats, _next_stats = stats, None
+    _update_counts(counts)
+
+
+def _update_counts(counts: tuple[int, int, int, int, int]) -> None:
+    with _lock:
+        (
+            _stats.files, _stats.faces, _stats.families,
+            _stats.classical_families, _stats.localized_names
+        ) = counts
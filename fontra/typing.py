@@ -1,6 +1,8 @@
+from collections.abc import MutableMapping
 from pathlib import Path
+from typing import Optional
 
-from typing_extensions import NamedTuple, TypeAlias
+from typing_extensions import Literal, NamedTuple, TypeAlias
 
 FontFamilyName: TypeAlias = str
 StyleName: TypeAlias = str
@@ -9,4 +11,61 @@ StyleName: TypeAlias = str
 class FontRef(NamedTuple):
     """Data for locating font style."""
     path: Path
-    bank: int
\ No newline at end of file
+    bank: int
+
+
+class FontAttributes(NamedTuple):
+    """Numeric style attributes of a face."""
+    weight: int
+    """Weight class, from 100 (thin) to 900 (black)."""
+    width: int
+    """Width class, from 1 (ultra-condensed) to 9 (ultra-expanded)."""
+    slant: int
+    """One of `SLANT_ROMAN`, `SLANT_ITALIC` and `SLANT_OBLIQUE` in `fontra.consts`."""
+
+
+class FontResolution(NamedTuple):
+    """Result of resolving a requested font style, see `fontra.resolve_fonts(...)`."""
+    name: FontFamilyName
+    style: StyleName
+    fontref: Optional[FontRef]
+    """The font reference, or None if not resolved."""
+    error: Optional[str]
+    """Why the font was not resolved, or None if resolved."""
+
+
+NameKind: TypeAlias = Literal["family", "localized", "classical"]
+"""Which names a font name is indexed as: family names, localized names or classical family names."""
+
+
+class FontNameMatch(NamedTuple):
+    """A font name found by `fontra.complete_font_names(...)`."""
+    name: FontFamilyName
+    """The name as indexed."""
+    family: FontFamilyName
+    """The family name to query by, which differs from `name` for localized names."""
+    kind: NameKind
+
+
+FontRefIndex: TypeAlias = "MutableMapping[FontFamilyName, MutableMapping[StyleName, FontRef]]"
+"""Index of font references by family names and styles, a dict or a `fontra.compact.CompactFontRefIndex`."""
+
+
+class FaceRecord(NamedTuple):
+    """Indexed data derived from a single font face."""
+    family: FontFamilyName
+    style: StyleName
+    bank: int
+    classical: list[tuple[FontFamilyName, StyleName]]
+    langnames: list[tuple[FontFamilyName, int, int, int]]
+    coverage: list[tuple[int, int]]
+    attributes: FontAttributes
+
+
+class SfntName(NamedTuple):
+    """A record of the sfnt `name` table."""
+    platform_id: int
+    encoding_id: int
+    language_id: int
+    name_id: int
+    string: bytes
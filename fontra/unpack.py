@@ -0,0 +1,237 @@
+"""Unpack TrueType/OpenType collections into font files named by their indexed family and style names.
+
+Members are extracted by fontTools (install `fontra[tools]`), in parallel across processes.
+Each output directory keeps a manifest of the source of each extracted font,
+so members of collections unchanged since the last run are not extracted again.
+"""
+
+import hashlib
+import json
+import os
+import re
+from collections.abc import Iterable
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from typing_extensions import NamedTuple
+
+from .cache import get_file_stamp
+from .consts import COLLECTION_EXT
+from .fontdb import scan_font_file
+from .sfnt import read_sfnt_versions
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+MANIFEST_NAME = ".fontra-unpack.json"
+MANIFEST_VERSION = 1
+
+_UNSAFE_CHARS = re.compile(r'[\s\\/:*?"<>|\x00-\x1f]+')
+
+
+class UnpackJob(NamedTuple):
+    """A member of a collection to extract."""
+    source: Path
+    bank: int
+    output: Path
+
+
+class UnpackResult(NamedTuple):
+    """Members extracted, skipped as unchanged, and failed with reasons."""
+    extracted: list[UnpackJob]
+    skipped: list[UnpackJob]
+    failed: list[tuple[UnpackJob, str]]
+
+
+def is_collection(path: Path) -> bool:
+    """Check whether a path is named like a font collection (by `COLLECTION_EXT`)."""
+    return path.name.endswith(COLLECTION_EXT)
+
+
+def find_collections(paths: Iterable[Path]) -> list[Path]:
+    """Get font collections (by `COLLECTION_EXT`) of files and directories, searched recursively.
+
+    Files given which are not font collections are not included, see `is_collection(...)`.
+
+    Return: a sorted list of paths of font collections, without duplicates.
+    """
+    collections: set[Path] = set()
+    for path in paths:
+        if path.is_dir():
+            collections.update(
+                Path(r) / fn for r, _, fs in os.walk(path) for fn in fs if fn.endswith(COLLECTION_EXT)
+            )
+        elif is_collection(path) and path.is_file():
+            collections.add(path)
+    return sorted(collections)
+
+
+def _member_names(source: Path) -> list[str]:
+    """Get output file names of members, like `NotoSansCJKjp-Bold.otf`."""
+    versions = read_sfnt_versions(source) or []
+    records = {record.bank: record for record in scan_font_file(source) or ()}
+    names: list[str] = []
+    for bank, version in enumerate(versions):
+        if (record := records.get(bank)) is not None:
+            stem = "-".join(_UNSAFE_CHARS.sub("", x) or "_" for x in (record.family, record.style))
+        else:
+            stem = f"{source.stem}#{bank}"
+        names.append(stem + (".otf" if version == b"OTTO" else ".ttf"))
+    return names
+
+
+def plan_unpack(collections: Iterable[Path], output: Optional[Path] = None) -> list[UnpackJob]:
+    """Get members of font collections to extract.
+
+    Params:
+    - collections: paths to font collections.
+    - output: directory to extract all members into,
+      defaults to a `<collection name>_fonts` directory beside each collection.
+
+    Return: a list of jobs, members with the same names in an output directory are suffixed by face indices.
+    """
+    jobs: list[UnpackJob] = []
+    taken: set[Path] = set()
+    for source in collections:
+        output_dir = output or source.parent / f"{source.stem}_fonts"
+        for bank, name in enumerate(_member_names(source)):
+            stem, ext = os.path.splitext(name)
+            candidate = output_dir / name
+            n = 1
+            while candidate in taken:
+                candidate = output_dir / (f"{stem}#{bank}{ext}" if n == 1 else f"{stem}#{bank}-{n}{ext}")
+                n += 1
+            taken.add(candidate)
+            jobs.append(UnpackJob(source, bank, candidate))
+    return jobs
+
+
+def _file_digest(fn: Path) -> str:
+    digest = hashlib.sha256()
+    with open(fn, "rb") as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_manifest(output_dir: Path) -> dict[str, Any]:
+    try:
+        with open(output_dir / MANIFEST_NAME, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != MANIFEST_VERSION or not isinstance(files := data["files"], dict):
+            return {}
+        return files
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+
+
+def _save_manifest(output_dir: Path, files: dict[str, Any]) -> None:
+    path = output_dir / MANIFEST_NAME
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "files": files}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def extract_member(job: UnpackJob) -> UnpackJob:
+    """Extract a member of a collection, replacing the output file at once when done."""
+    from fontTools.ttLib.ttFont import (  # pyright: ignore[reportMissingTypeStubs]
+        TTFont,
+    )
+
+    tmp = job.output.with_name(f"{job.output.name}.{os.getpid()}.tmp")
+    try:
+        with TTFont(str(job.source), fontNumber=job.bank) as font:
+            font.save(str(tmp))  # pyright: ignore[reportUnknownMemberType]
+        os.replace(tmp, job.output)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return job
+
+
+def unpack_collections(
+    jobs: list[UnpackJob],
+    *,
+    workers: Optional[int] = None,
+    force: bool = False,
+    callback: Optional[Callable[[UnpackJob, Optional[str]], None]] = None,
+) -> UnpackResult:
+    """Extract members of font collections, skipping those extracted from unchanged collections.
+
+    A collection is unchanged if its size and modification time, or else its SHA-256 digest,
+    are the same as when the existing output file was extracted.
+
+    Params:
+    - jobs: members to extract, like the result of `plan_unpack(...)`.
+    - workers: number of processes to extract members with, extracts serially if not greater than 1.
+    - force: whether to extract all members again.
+    - callback: called with each job and an error message (None if done), in the order of completion.
+
+    Return: jobs extracted, skipped and failed.
+    """
+    manifests = {output_dir: _load_manifest(output_dir) for output_dir in {job.output.parent for job in jobs}}
+    digests: dict[Path, str] = {}
+
+    def digest_of(source: Path) -> str:
+        if (digest := digests.get(source)) is None:
+            digest = digests[source] = _file_digest(source)
+        return digest
+
+    result = UnpackResult([], [], [])
+    pending: list[UnpackJob] = []
+    for job in jobs:
+        entry = manifests[job.output.parent].get(job.output.name)
+        stamp = list(get_file_stamp(job.source) or ())
+        if (
+            not force and isinstance(entry, dict) and job.output.exists()
+            and entry.get("source") == str(job.source) and entry.get("bank") == job.bank
+            and (entry.get("stamp") == stamp or entry.get("digest") == digest_of(job.source))
+        ):
+            entry["stamp"] = stamp
+            result.skipped.append(job)
+            if callback is not None:
+                callback(job, None)
+        else:
+            pending.append(job)
+    for output_dir in {job.output.parent for job in pending}:
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    def done(job: UnpackJob, error: Optional[str]) -> None:
+        if error is None:
+            manifests[job.output.parent][job.output.name] = {
+                "source": str(job.source), "bank": job.bank,
+                "stamp": list(get_file_stamp(job.source) or ()), "digest": digest_of(job.source),
+            }
+            result.extracted.append(job)
+        else:
+            result.failed.append((job, error))
+        if callback is not None:
+            callback(job, error)
+
+    if workers is None or workers <= 1 or len(pending) <= 1:
+        for job in pending:
+            try:
+                extract_member(job)
+            except Exception as e:
+                done(job, f"{type(e).__name__}: {e}")
+            else:
+                done(job, None)
+    else:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        with ProcessPoolExecutor(workers) as executor:
+            futures: "dict[Future[UnpackJob], UnpackJob]" = {
+                executor.submit(extract_member, job): job for job in pending
+            }
+            for future in as_completed(futures):
+                if (exc := future.exception()) is not None:
+                    done(futures[future], f"{type(exc).__name__}: {exc}")
+                else:
+                    done(futures[future], None)
+    for output_dir, files in manifests.items():
+        if output_dir.is_dir():
+            _save_manifest(output_dir, files)
+    return result
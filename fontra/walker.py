@@ -0,0 +1,142 @@
+"""Font file discovery by `os.scandir`, reusing listings of unchanged directories."""
+
+import os
+import stat
+import threading
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Optional
+
+from typing_extensions import NamedTuple, TypeAlias
+
+from .consts import SUPPORTED_EXT
+
+FileKey: TypeAlias = tuple[int, int]
+"""(st_dev, st_ino) identifying a physical file."""
+
+# directories modified this recently may change again within the same mtime tick,
+# so their listings are not reused
+_RACY_NS = 2_000_000_000
+
+
+class _DirListing(NamedTuple):
+    mtime: int
+    fontfiles: list[tuple[Path, FileKey]]
+    subdirs: list[Path]
+
+
+def get_file_key(fn: Path) -> Optional[FileKey]:
+    """Get (device, inode) of a file, following symlinks.
+
+    Return: the key, or None if the file cannot be accessed.
+    """
+    try:
+        st = os.stat(fn)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino)
+
+
+def _list_directory(directory: Path, dev: int, mtime: int) -> Optional[_DirListing]:
+    fontfiles: list[tuple[Path, FileKey]] = []
+    subdirs: list[Path] = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        subdirs.append(Path(entry.path))
+                    elif entry.name.endswith(SUPPORTED_EXT) and entry.is_file():
+                        if entry.is_symlink():
+                            st = entry.stat()
+                            key = (st.st_dev, st.st_ino)
+                        else:
+                            # a file is on the device of its directory, no need to stat it
+                            key = (dev, entry.inode())
+                        fontfiles.append((Path(entry.path), key))
+                except OSError:
+                    continue
+    except OSError:
+        return None
+    fontfiles.sort()
+    subdirs.sort()
+    return _DirListing(mtime, fontfiles, subdirs)
+
+
+class FontFileWalker:
+    """Walker of font directories, remembering the listing of each directory.
+
+    A directory whose modification time is unchanged since the last walk is not listed again,
+    its font files and subdirectories are taken from the last listing (subdirectories are still visited,
+    as changes inside them do not touch their parent).
+
+    Symlinked directories are followed, each physical directory is walked once.
+    Font files are deduplicated by (device, inode), so hard links and symlinks
+    to a file already found are skipped.
+    """
+
+    def __init__(self) -> None:
+        self._listings: dict[Path, _DirListing] = {}
+        self._lock = threading.Lock()
+
+    def walk(self, roots: Sequence[Path], *, threads: int = 4) -> dict[Path, FileKey]:
+        """Find font files in directories.
+
+        Params:
+        - roots: directories to walk recursively.
+        - threads: number of threads to walk roots concurrently with, walks serially if not greater than 1.
+
+        Return: a dict maps font file paths to their keys, the first path of each physical file only.
+        The result does not depend on `threads`.
+        """
+        if threads > 1 and len(roots) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(min(threads, len(roots))) as executor:
+                results = list(executor.map(self._walk_root, roots))
+        else:
+            results = [self._walk_root(root) for root in roots]
+        fontfiles: dict[Path, FileKey] = {}
+        keys: set[FileKey] = set()
+        for result in results:
+            for fn, key in result:
+                if key not in keys:
+                    keys.add(key)
+                    fontfiles[fn] = key
+        return fontfiles
+
+    def _walk_root(self, root: Path) -> list[tuple[Path, FileKey]]:
+        racy = time.time_ns() - _RACY_NS
+        fontfiles: list[tuple[Path, FileKey]] = []
+        visited: dict[Path, _DirListing] = {}
+        directories: set[FileKey] = set()
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            try:
+                st = os.stat(directory)
+            except OSError:
+                continue
+            if not stat.S_ISDIR(st.st_mode) or (st.st_dev, st.st_ino) in directories:
+                continue
+            directories.add((st.st_dev, st.st_ino))
+            with self._lock:
+                listing = self._listings.get(directory)
+            if listing is None or listing.mtime != st.st_mtime_ns:
+                listing = _list_directory(directory, st.st_dev, st.st_mtime_ns if st.st_mtime_ns < racy else -1)
+                if listing is None:
+                    continue
+            visited[directory] = listing
+            fontfiles.extend(listing.fontfiles)
+            stack.extend(reversed(listing.subdirs))
+        with self._lock:
+            for directory in [x for x in self._listings if x.is_relative_to(root) and x not in visited]:
+                del self._listings[directory]
+            self._listings.update(visited)
+        return fontfiles
+
+    def clear(self) -> None:
+        """Forget all directory listings, the next walk lists every directory again."""
+        with self._lock:
+            self._listings.clear()
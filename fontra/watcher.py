@@ -0,0 +1,287 @@
+"""Keep the font index current by watching font directories."""
+
+import os
+import struct
+import sys
+import threading
+import time
+import warnings
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+from .consts import SUPPORTED_EXT
+from .fontdb import get_fontdirs, refresh_directory
+from .typing import FontFamilyName
+
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_INOTIFY_MASK = (
+    IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+ChangeCallback = Callable[[set[FontFamilyName]], None]
+
+
+class _PollingBackend:
+    def __init__(self, directories: list[Path], interval: float) -> None:
+        self.directories = directories
+        self.interval = interval
+        self._stamps = self._scan()
+        self._wakeup = threading.Event()
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        stamps: dict[Path, tuple[int, int]] = {}
+        for directory in self.directories:
+            for r, _, fs in os.walk(directory):
+                for fn in fs:
+                    if not fn.endswith(SUPPORTED_EXT):
+                        continue
+                    try:
+                        st = os.stat(path := Path(r) / fn)
+                    except OSError:
+                        continue
+                    stamps[path] = (st.st_size, st.st_mtime_ns)
+        return stamps
+
+    def wait(self, timeout: Optional[float]) -> set[Path]:
+        if self._wakeup.wait(self.interval if timeout is None else min(timeout, self.interval)):
+            return set()
+        stamps = self._scan()
+        changed = {
+            fn.parent for fn in stamps.keys() ^ self._stamps.keys()
+        } | {
+            fn.parent for fn, stamp in stamps.items() if self._stamps.get(fn, stamp) != stamp
+        }
+        self._stamps = stamps
+        return changed
+
+    def close(self) -> None:
+        self._wakeup.set()
+
+
+class _InotifyBackend:
+    def __init__(self, directories: list[Path]) -> None:
+        import ctypes
+        import ctypes.util
+        import selectors
+
+        self.directories = directories
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd: int = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._wakeup_r, self._wakeup_w = os.pipe()
+        # not `select.select`, which fails on descriptors above FD_SETSIZE in processes with many files open
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._fd, selectors.EVENT_READ)
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ)
+        self._released = False
+        self._release_lock = threading.Lock()
+        self._watches: dict[int, Path] = {}
+        for directory in directories:
+            self._add_watches(directory)
+
+    def _add_watches(self, directory: Path) -> None:
+        for r, _, _ in os.walk(directory):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(r), _INOTIFY_MASK)
+            if wd >= 0:
+                self._watches[wd] = Path(r)
+
+    def wait(self, timeout: Optional[float]) -> set[Path]:
+        if not any(key.fd == self._fd for key, _ in self._selector.select(timeout)):
+            return set()
+        try:
+            data = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return set()
+        changed: set[Path] = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _INOTIFY_EVENT.unpack_from(data, offset)
+            name = data[offset + _INOTIFY_EVENT.size:offset + _INOTIFY_EVENT.size + length]
+            offset += _INOTIFY_EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                changed.update(self.directories)
+                continue
+            if (directory := self._watches.get(wd)) is None:
+                continue
+            if mask & IN_IGNORED:
+                del self._watches[wd]
+                continue
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                changed.add(directory)
+                continue
+            path = directory / os.fsdecode(name.rstrip(b"\0"))
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._add_watches(path)
+                changed.add(path)
+            elif path.name.endswith(SUPPORTED_EXT):
+                changed.add(directory)
+        return changed
+
+    def close(self) -> None:
+        with self._release_lock:
+            # the watching thread may have exited and released the descriptors already
+            if not self._released:
+                os.write(self._wakeup_w, b"\0")
+
+    def release(self) -> None:
+        with self._release_lock:
+            if self._released:
+                return
+            self._released = True
+            self._selector.close()
+            for fd in (self._fd, self._wakeup_r, self._wakeup_w):
+                os.close(fd)
+
+
+def _minimal_directories(directories: Iterable[Path]) -> list[Path]:
+    result: list[Path] = []
+    for directory in sorted(directories, key=lambda x: len(x.parts)):
+        if not any(directory.is_relative_to(x) for x in result):
+            result.append(directory)
+    return result
+
+
+class FontWatcher:
+    """Background thread applying changes in font directories to the index.
+
+    Changes are batched until no more change arrives in `debounce` seconds (or `max_delay` seconds
+    passed since the first change of the batch), then changed directories are refreshed with `refresh_directory(...)`.
+    """
+
+    def __init__(
+        self,
+        callback: Optional[ChangeCallback] = None,
+        *,
+        directories: Optional[list[Path]] = None,
+        debounce: float = 0.5,
+        max_delay: float = 5.0,
+        interval: float = 2.0,
+        polling: bool = False,
+    ) -> None:
+        """Create a watcher, call `start()` to run it.
+
+        Params:
+        - callback: called with the set of changed font family names after each batch.
+        - directories: directories to watch, defaults to `get_fontdirs()`.
+        - debounce: seconds to wait for more changes before applying a batch.
+        - max_delay: seconds to wait at most before applying a batch, even if changes keep arriving.
+        - interval: seconds between scans when polling.
+        - polling: whether to always poll modification times instead of using inotify.
+        """
+        self.callback = callback
+        self.directories = [x for x in (directories or get_fontdirs()) if x.is_dir()]
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.interval = interval
+        self.polling = polling or not sys.platform.startswith("linux")
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._backend: Optional[Union[_InotifyBackend, _PollingBackend]] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "FontWatcher":
+        if self.running:
+            return self
+        self._stopped.clear()
+        self._backend = None
+        if not self.polling:
+            try:
+                self._backend = _InotifyBackend(self.directories)
+            except (OSError, AttributeError):
+                pass
+        if self._backend is None:
+            self._backend = _PollingBackend(self.directories, self.interval)
+        self._thread = threading.Thread(target=self._run, name="fontra-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._backend is not None:
+            self._backend.close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _apply(self, directories: set[Path]) -> None:
+        families: set[FontFamilyName] = set()
+        for directory in _minimal_directories(directories):
+            families.update(refresh_directory(directory))
+        if families and self.callback is not None:
+            self.callback(families)
+
+    def _run(self) -> None:
+        backend = self._backend
+        assert backend is not None
+        pending: set[Path] = set()
+        first = deadline = 0.0
+        try:
+            while not self._stopped.is_set():
+                timeout = max(0.0, deadline - time.monotonic()) if pending else None
+                if changed := backend.wait(timeout):
+                    if not pending:
+                        first = time.monotonic()
+                    pending.update(changed)
+                    deadline = min(time.monotonic() + self.debounce, first + self.max_delay)
+                if pending and time.monotonic() >= deadline:
+                    try:
+                        self._apply(pending)
+                    except Exception:
+                        warnings.warn(
+                            f"Some error occurred when applying changes in {sorted(map(str, pending))}, skipped.\n"
+                        )
+                        import traceback
+                        traceback.print_exc()
+                    pending = set()
+        finally:
+            if isinstance(backend, _InotifyBackend):
+                backend.release()
+
+
+_default_watcher: Optional[FontWatcher] = None
+
+
+def watch(callback: Optional[ChangeCallback] = None, **kwargs: Any) -> FontWatcher:
+    """Start watching font directories (from `get_fontdirs()`) in a background thread.
+
+    Params:
+    - callback: called with the set of changed font family names after each batch.
+    - kwargs: other options passed into `FontWatcher(...)`.
+
+    Return: the running watcher.
+    """
+    global _default_watcher
+    if _default_watcher is not None:
+        _default_watcher.stop()
+    _default_watcher = FontWatcher(callback, **kwargs).start()
+    return _default_watcher
+
+
+def unwatch() -> None:
+    """Stop watching font directories started by `watch(...)`."""
+    global _default_watcher
+    if _default_watcher is not None:
+        _default_watcher.stop()
+        _default_watcher = None
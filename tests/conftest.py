@@ -0,0 +1,113 @@
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import pytest
+
+import fontra
+from fontra import fontdb
+
+
+def _build_font(
+    family: str,
+    style: str,
+    chars: str = "ABCabc",
+    *,
+    localized: Optional[dict[str, str]] = None,
+    typographic: Optional[tuple[str, str]] = None,
+    weight: int = 400,
+    width: int = 5,
+    fs_selection: int = 0x40,
+    mac_style: int = 0,
+    cff: bool = False,
+) -> Any:
+    from fontTools.fontBuilder import FontBuilder
+    from fontTools.pens.t2CharStringPen import T2CharStringPen
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+    glyphs = [".notdef", *(f"uni{ord(c):04X}" for c in chars)]
+    builder = FontBuilder(1000, isTTF=not cff)
+    builder.setupGlyphOrder(glyphs)
+    builder.setupCharacterMap({ord(c): f"uni{ord(c):04X}" for c in chars})
+    if cff:
+        pen: Any = T2CharStringPen(500, None)
+        pen.moveTo((0, 0))
+        pen.lineTo((0, 100))
+        pen.lineTo((100, 0))
+        pen.closePath()
+        charstring = pen.getCharString()
+        builder.setupCFF(f"{family}-{style}".replace(" ", ""), {"FullName": f"{family} {style}"}, {
+            name: charstring for name in glyphs
+        }, {})
+    else:
+        pen = TTGlyphPen(None)
+        pen.moveTo((0, 0))
+        pen.lineTo((0, 100))
+        pen.lineTo((100, 0))
+        pen.closePath()
+        glyph = pen.glyph()
+        builder.setupGlyf({name: glyph for name in glyphs})
+    builder.setupHorizontalMetrics({name: (500, 0) for name in glyphs})
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    names: dict[str, Any] = {"familyName": {"en": family, **(localized or {})}, "styleName": style}
+    if typographic is not None:
+        names["typographicFamily"], names["typographicSubfamily"] = typographic
+    builder.setupNameTable(names)
+    builder.setupOS2(usWeightClass=weight, usWidthClass=width, fsSelection=fs_selection)
+    head: Any = builder.font["head"]
+    head.macStyle = mac_style
+    builder.setupPost()
+    return builder.font
+
+
+@pytest.fixture(scope="session")
+def fontdir(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """A directory of small fonts built by fontTools, covering the cases the sfnt reader handles."""
+    pytest.importorskip("fontTools")
+    from fontTools.ttLib import TTCollection
+
+    path = tmp_path_factory.mktemp("fonts")
+    _build_font("Alpha Sans", "Regular").save(path / "alpha.ttf")
+    _build_font("Alpha Sans", "Bold", weight=700, fs_selection=0x20, mac_style=1).save(path / "alpha-bold.ttf")
+    _build_font("Beta Serif", "Regular", "AB中文", localized={"zh-CN": "测试宋体", "ja": "テスト明朝"}).save(
+        path / "beta.ttf"
+    )
+    collection = TTCollection()
+    collection.fonts = [
+        _build_font("Gamma Mono", "Regular"),
+        _build_font("Gamma Mono", "Italic", fs_selection=0x01, mac_style=2),
+        _build_font("Gamma Mono", "Condensed Oblique", width=3, fs_selection=0x200),
+    ]
+    collection.save(path / "gamma.ttc")
+    light = _build_font(
+        "Delta Display Light", "Regular", "AZ\U0001F600", typographic=("Delta Display", "Light"), weight=300
+    )
+    light.save(path / "delta-light.ttf")
+    _build_font("Epsilon Text", "Regular", "xyz", cff=True).save(path / "epsilon.otf")
+    return path
+
+
+@pytest.fixture
+def make_font() -> Callable[..., Path]:
+    """Build a font like `_build_font(...)` and save it to a path, returning the path."""
+    pytest.importorskip("fontTools")
+
+    def make(path: Path, family: str, style: str, chars: str = "ABCabc", **kwargs: Any) -> Path:
+        _build_font(family, style, chars, **kwargs).save(path)
+        return path
+
+    return make
+
+
+@pytest.fixture
+def default_fontdb(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """Isolate the default database from system fonts and the user cache, and reset it afterwards."""
+    monkeypatch.setenv("PYFONTRA_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("XDG_DATA_DIRS", str(tmp_path / "share"))
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.delenv("PYFONTRA_CUSTOM_FONTDIRS", raising=False)
+    yield
+    fontra.wait_fontdb(10)
+    fontdb.cancel_fontdb_init()
+    fontdb.FONTDIRS_CUSTOM.clear()
+    fontdb.get_fontdb()._replace_index(fontdb._new_font_index())
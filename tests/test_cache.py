@@ -0,0 +1,51 @@
+from pathlib import Path
+
+from fontra.cache import CacheEntry, load_cache, save_cache
+from fontra.typing import FaceRecord, FontAttributes
+
+
+def _entry(family: str, size: int = 100) -> CacheEntry:
+    return CacheEntry((size, 1_700_000_000_000_000_000, 42), [
+        FaceRecord(
+            family, "Regular", 0,
+            [(family, "Regular"), (f"{family} Legacy", "Regular")],
+            [(f"{family} 本地", 3, 1, 0x804)],
+            [(0x20, 0x7E), (0x4E00, 0x9FFF)],
+            FontAttributes(400, 5, 0),
+        ),
+        FaceRecord(family, "Bold", 1, [], [], [], FontAttributes(700, 5, 0)),
+    ])
+
+
+def test_round_trip(tmp_path: Path) -> None:
+    path = tmp_path / "cache"
+    entries = {Path("/fonts/a.ttc"): _entry("A"), Path("/fonts/broken.ttf"): CacheEntry((1, 2, 3), None)}
+    save_cache(entries, path)
+    assert load_cache(path) == entries
+
+
+def test_missing_or_invalid(tmp_path: Path) -> None:
+    path = tmp_path / "cache"
+    assert load_cache(path) == {}
+    path.write_bytes(b"\x00not a cache")
+    assert load_cache(path) == {}
+    path.write_text('{"version": 3, "files": []}', encoding="utf-8")
+    assert load_cache(path) == {}
+
+
+def test_keeps_entries_of_other_files(tmp_path: Path) -> None:
+    path = tmp_path / "cache"
+    save_cache({Path("/a/1.ttf"): _entry("A1"), Path("/a/2.ttf"): _entry("A2")}, path)
+    save_cache({Path("/b/1.ttf"): _entry("B1")}, path)
+    assert set(load_cache(path)) == {Path("/a/1.ttf"), Path("/a/2.ttf"), Path("/b/1.ttf")}
+    # updated entries replace saved ones
+    save_cache({Path("/a/1.ttf"): _entry("A1", 200)}, path)
+    assert load_cache(path)[Path("/a/1.ttf")] == _entry("A1", 200)
+
+
+def test_scope_drops_removed_files(tmp_path: Path) -> None:
+    path = tmp_path / "cache"
+    save_cache({Path("/a/1.ttf"): _entry("A1"), Path("/a/2.ttf"): _entry("A2"), Path("/b/1.ttf"): _entry("B1")}, path)
+    save_cache({Path("/a/1.ttf"): _entry("A1")}, path, scope={Path("/a/1.ttf"), Path("/a/2.ttf")})
+    assert set(load_cache(path)) == {Path("/a/1.ttf"), Path("/b/1.ttf")}
+    assert not list(tmp_path.glob("*.tmp"))
@@ -0,0 +1,31 @@
+import subprocess
+import sys
+
+import pytest
+
+
+def _run(*args: str) -> str:
+    return subprocess.run(
+        [sys.executable, "-m", "fontra", *args], check=True, capture_output=True, text=True
+    ).stdout
+
+
+@pytest.mark.parametrize("option", ["--version", "-v"])
+def test_version_without_cli(option: str) -> None:
+    code = (
+        "import sys; from fontra.__main__ import main;"
+        f" sys.argv = ['fontra', {option!r}]; main();"
+        " print(*(m for m in ('typer', 'fontra.cli') if m in sys.modules))"
+    )
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    version, imported = output.splitlines()
+    assert version.startswith("Fontra, version: ")
+    assert imported == ""
+
+
+def test_version_with_other_options() -> None:
+    assert _run("--no-daemon", "--version").startswith("Fontra, version: ")
+
+
+def test_help() -> None:
+    assert "fontdirs" in _run("--help")
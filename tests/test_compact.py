@@ -0,0 +1,89 @@
+import random
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+
+from fontra import fontdb
+from fontra.compact import CompactFontRefIndex
+from fontra.fontdb import FontDB
+from fontra.typing import FontRef
+
+
+def _items(index: Any) -> dict[str, list[tuple[str, FontRef]]]:
+    return {family: list(styles.items()) for family, styles in index.items()}
+
+
+def test_same_as_dict() -> None:
+    rng = random.Random(5)
+    compact = CompactFontRefIndex()
+    expected: dict[str, dict[str, FontRef]] = {}
+    families = [f"Family {i}" for i in range(20)]
+    for _ in range(3000):
+        family, style = rng.choice(families), rng.choice(["Regular", "Bold", "Italic", "Light"])
+        op = rng.randrange(10)
+        if op < 6:
+            fontref = FontRef(Path(f"/fonts/{rng.randrange(30)}.ttc"), rng.randrange(3))
+            compact.set_fontref(family, style, fontref)
+            expected.setdefault(family, {})[style] = fontref
+        elif op < 8 and style in expected.get(family, {}):
+            del compact[family][style]
+            del expected[family][style]
+        elif op == 8 and family in expected:
+            del compact[family]
+            del expected[family]
+        else:
+            styles = {style: FontRef(Path("/fonts/set.ttf"), 0)}
+            compact[family] = styles
+            expected[family] = dict(styles)
+        assert len(compact) == len(expected)
+    assert _items(compact) == _items(expected)
+    assert all(family in compact for family in expected)
+    assert "Missing" not in compact
+    with pytest.raises(KeyError):
+        compact["Missing"]
+    # paths and names are stored once
+    assert len(compact.paths) <= 31
+    assert len(compact.families) == len(families)
+
+
+def test_copy_is_independent() -> None:
+    index = CompactFontRefIndex()
+    index.set_fontref("Alpha", "Regular", FontRef(Path("/a.ttf"), 0))
+    index.set_fontref("Alpha", "Bold", FontRef(Path("/b.ttf"), 0))
+    copy = index.copy()
+    copy.set_fontref("Alpha", "Regular", FontRef(Path("/c.ttf"), 1))
+    del copy["Alpha"]["Bold"]
+    copy.set_fontref("Beta", "Regular", FontRef(Path("/d.ttf"), 0))
+    assert _items(index) == {"Alpha": [("Regular", FontRef(Path("/a.ttf"), 0)), ("Bold", FontRef(Path("/b.ttf"), 0))]}
+    assert _items(copy) == {
+        "Alpha": [("Regular", FontRef(Path("/c.ttf"), 1))], "Beta": [("Regular", FontRef(Path("/d.ttf"), 0))]
+    }
+    index.clear()
+    assert len(index) == 0 and list(index) == []
+    assert len(copy) == 2
+
+
+def test_database(tmp_path: Path, fontdir: Path, make_font: Callable[..., Path], monkeypatch: pytest.MonkeyPatch) -> None:
+    def contents(db: FontDB) -> tuple[Any, ...]:
+        index = db.get_font_index()
+        return (
+            _items(index.fontrefs),
+            _items(index.classical_fontrefs),
+            sorted(db.all_fonts()),
+            db.match_font_names("Gama Mono"),
+            db.complete_font_names("", None, classical=True),
+            db.find_font("Gamma Mono", italic=True),
+        )
+
+    extra = make_font(tmp_path / "extra.ttf", "Alpha Sans", "Black", weight=900)
+    results = []
+    for compact in (False, True):
+        monkeypatch.setattr(fontdb, "_compact_index", compact)
+        db = FontDB([fontdir])
+        db.update()
+        assert isinstance(db.get_font_index().fontrefs, CompactFontRefIndex) == compact
+        db.add_font_files([extra])
+        db.remove_font_files([fontdir / "alpha-bold.ttf"])
+        results.append(contents(db))
+    assert results[0] == results[1]
@@ -0,0 +1,44 @@
+from pathlib import Path
+
+from fontra.coverage import CoverageIndex
+from fontra.typing import FontRef
+
+LATIN = FontRef(Path("latin.ttf"), 0)
+CJK = FontRef(Path("cjk.ttc"), 1)
+
+
+def _index() -> CoverageIndex:
+    index = CoverageIndex()
+    index.add(LATIN, [(0x20, 0x7E), (0xC0, 0x17F)])
+    index.add(CJK, [(0x20, 0x7E), (0x4E00, 0x9FFF)])
+    return index
+
+
+def test_covers() -> None:
+    index = _index()
+    assert index.covers(LATIN, ord("A")) and index.covers(LATIN, 0x100)
+    assert not index.covers(LATIN, 0x7F) and not index.covers(LATIN, 0x4E00)
+    assert index.faces_covering(ord("A")) == {LATIN, CJK}
+    assert index.faces_covering(0x4E2D) == {CJK}
+    assert index.faces_covering(0x3042) == set()
+
+
+def test_discard() -> None:
+    index = _index()
+    index.discard(CJK)
+    assert index.faces_covering(ord("A")) == {LATIN}
+    assert index.faces_covering(0x4E2D) == set()
+    assert list(index) == [LATIN]
+
+
+def test_copy_is_independent() -> None:
+    index = _index()
+    copy = index.copy()
+    copy.discard(LATIN)
+    copy.add(CJK, [(0x3040, 0x309F)])
+    index.add(FontRef(Path("more.ttf"), 0), [(0x41, 0x5A)])
+    assert index.faces_covering(ord("A")) == {LATIN, CJK, FontRef(Path("more.ttf"), 0)}
+    assert index.faces_covering(0x4E2D) == {CJK}
+    assert copy.faces_covering(ord("A")) == set()
+    assert copy.faces_covering(0x3042) == {CJK}
+    assert copy.get_ranges(CJK) == [(0x3040, 0x309F)]
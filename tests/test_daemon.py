@@ -0,0 +1,63 @@
+import stat
+import subprocess
+import sys
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import pytest
+
+import fontra
+from fontra import fontdb
+from fontra.client import get_daemon
+
+
+@pytest.fixture
+def daemon(fontdir: Path, tmp_path: Path, default_fontdb: None, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """A daemon indexing `fontdir`, in another process sharing the environment, returning its socket path."""
+    path = tmp_path / "fontra.sock"
+    monkeypatch.setenv("PYFONTRA_SOCKET", str(path))
+    code = (
+        "import sys; from pathlib import Path; import fontra; from fontra.server import serve;"
+        " fontra.init_fontdb(Path(sys.argv[1]), accept_envvars=False, use_cache=False);"
+        " serve(ready=lambda path: print('ready', flush=True))"
+    )
+    process = subprocess.Popen([sys.executable, "-c", code, str(fontdir)], stdout=subprocess.PIPE, text=True)
+    try:
+        assert process.stdout is not None and process.stdout.readline() == "ready\n"
+        yield path
+    finally:
+        fontra.disconnect_daemon()
+        process.terminate()
+        process.wait(10)
+
+
+def test_answered_by_daemon(fontdir: Path, daemon: Path) -> None:
+    assert fontra.init_fontdb(fontdir, accept_envvars=False, daemon=True) is None
+    assert get_daemon() is not None
+    assert fontra.get_font("Alpha Sans", "Bold").path == fontdir / "alpha-bold.ttf"
+    assert sorted(fontra.all_fonts()) == ["Alpha Sans", "Beta Serif", "Delta Display", "Epsilon Text", "Gamma Mono"]
+    # indexed in process only once the daemon goes away
+    assert fontdb._lazy_initializer is not None
+
+
+def test_other_fontdirs_indexed_in_process(
+    fontdir: Path, tmp_path: Path, daemon: Path, make_font: Callable[..., Path], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    other = tmp_path / "other"
+    other.mkdir()
+    make_font(other / "zeta.ttf", "Zeta Sans", "Regular")
+    with pytest.warns(UserWarning, match="other font directories"):
+        fontra.init_fontdb(other, accept_envvars=False, daemon=True)
+    assert get_daemon() is None
+    assert fontra.all_fonts() == ["Zeta Sans"]
+    fontdb.FONTDIRS_CUSTOM.clear()
+    # also with the directories of `PYFONTRA_CUSTOM_FONTDIRS`
+    monkeypatch.setenv("PYFONTRA_CUSTOM_FONTDIRS", str(other))
+    with pytest.warns(UserWarning, match="other font directories"):
+        fontra.init_fontdb(fontdir, daemon=True)
+    assert get_daemon() is None
+    assert "Zeta Sans" in fontra.all_fonts()
+
+
+def test_socket_only_for_user(daemon: Path) -> None:
+    assert stat.S_IMODE(daemon.stat().st_mode) == 0o600
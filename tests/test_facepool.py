@@ -0,0 +1,73 @@
+import os
+import threading
+from pathlib import Path
+from typing import Callable
+
+from fontra.facepool import FacePool, FacePoolInfo
+from fontra.typing import FontRef
+
+
+def test_pooled(fontdir: Path) -> None:
+    pool = FacePool()
+    fontref = FontRef(fontdir / "gamma.ttc", 1)
+    face = pool.open_face(fontref)
+    assert face.style_name == b"Italic"
+    assert pool.open_face(fontref) is face
+    assert pool.open_face(FontRef(fontref.path, 2)).style_name == b"Condensed Oblique"
+    size = fontref.path.stat().st_size
+    assert pool.info() == FacePoolInfo(1, 2, 64, 2, 256 << 20, 2 * size)
+    pool.clear()
+    assert pool.info() == FacePoolInfo(0, 0, 64, 0, 256 << 20, 0)
+    assert pool.open_face(fontref) is not face
+
+
+def test_limits(fontdir: Path) -> None:
+    fontrefs = [FontRef(fontdir / name, 0) for name in ("alpha.ttf", "alpha-bold.ttf", "beta.ttf")]
+    pool = FacePool(maxsize=2)
+    faces = [pool.open_face(fontref) for fontref in fontrefs]
+    # least recently used evicted
+    assert pool.open_face(fontrefs[0]) is not faces[0]
+    assert pool.open_face(fontrefs[2]) is faces[2]
+    assert pool.info().currsize == 2
+    pool.resize(max_bytes=fontrefs[2].path.stat().st_size)
+    assert pool.info().currsize == 1
+    assert pool.open_face(fontrefs[2]) is faces[2]
+    pool.resize(maxsize=0)
+    assert pool.info().currsize == 0
+    assert pool.open_face(fontrefs[2]) is not pool.open_face(fontrefs[2])
+
+
+def test_reopened_once_changed(tmp_path: Path, make_font: Callable[..., Path]) -> None:
+    path = make_font(tmp_path / "a.ttf", "Before Sans", "Regular")
+    pool = FacePool()
+    face = pool.open_face(FontRef(path, 0))
+    assert face.family_name == b"Before Sans"
+    make_font(path, "After Sans", "Regular")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert pool.open_face(FontRef(path, 0)).family_name == b"After Sans"
+    assert pool.info().currsize == 1
+
+
+def test_threads(fontdir: Path) -> None:
+    pool = FacePool(maxsize=3)
+    fontrefs = [FontRef(fontdir / "gamma.ttc", bank) for bank in range(3)] + [FontRef(fontdir / "beta.ttf", 0)]
+    errors: list[BaseException] = []
+
+    def run(offset: int) -> None:
+        try:
+            for i in range(200):
+                fontref = fontrefs[(i + offset) % len(fontrefs)]
+                assert pool.open_face(fontref).face_index == fontref.bank
+        except BaseException as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    info = pool.info()
+    assert info.hits + info.misses == 800
+    assert info.currsize == 3
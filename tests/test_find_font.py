@@ -0,0 +1,65 @@
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+
+from fontra.fontdb import FontDB
+
+FACES = {
+    "light": dict(style="Light", weight=300),
+    "regular": dict(style="Regular"),
+    "medium": dict(style="Medium", weight=500),
+    "semibold": dict(style="SemiBold", weight=600),
+    "bold": dict(style="Bold", weight=700, fs_selection=0x20),
+    "italic": dict(style="Italic", fs_selection=0x01),
+    "bold-italic": dict(style="Bold Italic", weight=700, fs_selection=0x21),
+    "condensed": dict(style="Condensed", width=3),
+}
+
+
+@pytest.fixture
+def db(tmp_path: Path, make_font: Callable[..., Path]) -> FontDB:
+    for name, attributes in FACES.items():
+        make_font(tmp_path / f"{name}.ttf", "Nearest Sans", localized={"ja": "最寄り"}, **attributes)
+    make_font(tmp_path / "oblique-regular.ttf", "Oblique Sans", "Regular")
+    make_font(tmp_path / "oblique.ttf", "Oblique Sans", "Oblique", fs_selection=0x200)
+    make_font(tmp_path / "italic-only.ttf", "Italic Serif", "Italic", fs_selection=0x01)
+    db = FontDB([tmp_path])
+    db.update()
+    return db
+
+
+@pytest.mark.parametrize("kwargs,expected", [
+    ({}, "regular"),
+    ({"weight": 600}, "semibold"),
+    ({"weight": 900}, "bold"),
+    ({"weight": 100}, "light"),
+    # ties go lighter up to 500, heavier above
+    ({"weight": 450}, "regular"),
+    ({"weight": 550}, "semibold"),
+    ({"italic": True}, "italic"),
+    ({"italic": True, "weight": 700}, "bold-italic"),
+    ({"italic": True, "weight": 300}, "italic"),
+    # width is matched before weight
+    ({"width": 3, "weight": 700}, "condensed"),
+    ({"width": 4}, "condensed"),
+    ({"width": 6, "weight": 700}, "bold"),
+])
+def test_nearest(db: FontDB, tmp_path: Path, kwargs: dict[str, Any], expected: str) -> None:
+    assert db.find_font("Nearest Sans", **kwargs).path == tmp_path / f"{expected}.ttf"
+
+
+def test_slant(db: FontDB, tmp_path: Path) -> None:
+    assert db.find_font("Oblique Sans", italic=True).path == tmp_path / "oblique.ttf"
+    assert db.find_font("Oblique Sans").path == tmp_path / "oblique-regular.ttf"
+    assert db.find_font("Italic Serif", weight=700).path == tmp_path / "italic-only.ttf"
+
+
+def test_names(db: FontDB, tmp_path: Path) -> None:
+    assert db.find_font("最寄り", weight=700).path == tmp_path / "bold.ttf"
+    assert db.find_font("nearest sans", weight=700).path == tmp_path / "bold.ttf"
+    assert db.find_font("Nearest Sanz", weight=700, fuzzy=True).path == tmp_path / "bold.ttf"
+    with pytest.raises(KeyError, match="Did you mean 'Nearest Sans'"):
+        db.find_font("Nearest Sanz")
+    with pytest.raises(KeyError):
+        db.find_font("最寄り", localized=False)
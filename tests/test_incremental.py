@@ -0,0 +1,119 @@
+from pathlib import Path
+from typing import Any, Callable
+
+from fontra.fontdb import FontDB
+from fontra.prefix import NAME_KINDS
+from fontra.typing import FontNameMatch
+
+MakeFont = Callable[..., Path]
+
+
+def _contents(db: FontDB) -> tuple[Any, ...]:
+    index = db.get_font_index()
+    return (
+        {family: dict(styles) for family, styles in index.fontrefs.items()},
+        {family: dict(styles) for family, styles in index.classical_fontrefs.items()},
+        dict(index.langnames),
+        {family: {name: sorted(ids) for name, ids in names.items()} for family, names in index.localized_names.items()},
+        {family: dict(styles) for family, styles in index.attributes.items()},
+        db.complete_font_names("", None, classical=True),
+        db.match_font_names("Shard Sans"),
+        db.fonts_covering("x"),
+    )
+
+
+def test_family_shared_across_files(tmp_path: Path, make_font: MakeFont) -> None:
+    regular = make_font(tmp_path / "a.ttf", "Shared Sans", "Regular")
+    bold = make_font(tmp_path / "b.ttf", "Shared Sans", "Bold", weight=700)
+    db = FontDB([tmp_path])
+    db.update()
+    assert db.remove_font_files([bold]) == {"Shared Sans"}
+    assert db.get_font_styles("Shared Sans") == ["Regular"]
+    assert db.get_font("Shared Sans", "Regular").path == regular
+    assert db.find_font("Shared Sans", 700).path == regular
+    db.remove_font_files([regular])
+    assert not db.has_font_family("Shared Sans")
+    assert db.match_font_names("Shared Sans") == []
+    assert db.complete_font_names("Shared") == []
+
+
+def test_withdraw_localized_names(tmp_path: Path, make_font: MakeFont) -> None:
+    first = make_font(tmp_path / "a.ttf", "Song Serif", "Regular", localized={"zh-CN": "宋体"})
+    db = FontDB([tmp_path])
+    db.update()
+    # a later file takes the localized name over to another family
+    second = make_font(tmp_path / "b.ttf", "Song Serif Pro", "Regular", localized={"zh-CN": "宋体"})
+    db.add_font_files([second])
+    assert db.get_unlocalized_name("宋体") == "Song Serif Pro"
+    assert db.get_localized_names("Song Serif") == []
+    # and gives it back once removed
+    db.remove_font_files([second])
+    assert db.get_unlocalized_name("宋体") == "Song Serif"
+    assert db.get_localized_names("Song Serif") == ["宋体"]
+    assert db.get_localized_names("Song Serif Pro") == []
+    db.remove_font_files([first])
+    assert db.get_unlocalized_name("宋体") == "宋体"
+    assert db.get_localized_names("Song Serif") == []
+    assert db.complete_font_names("宋") == []
+
+
+def test_added_files_take_precedence(tmp_path: Path, make_font: MakeFont) -> None:
+    old = make_font(tmp_path / "b.ttf", "Over Sans", "Regular")
+    db = FontDB([tmp_path])
+    db.update()
+    new = make_font(tmp_path / "a.ttf", "Over Sans", "Regular", "xyz")
+    db.add_font_files([new])
+    assert db.get_font("Over Sans", "Regular").path == new
+    assert db.fonts_covering("x") == [db.get_font("Over Sans", "Regular")]
+    db.remove_font_files([new])
+    assert db.get_font("Over Sans", "Regular").path == old
+    assert db.fonts_covering("x") == []
+
+
+def test_incremental_same_as_rebuild(tmp_path: Path, make_font: MakeFont) -> None:
+    fontdir = tmp_path / "fonts"
+    fontdir.mkdir()
+    make_font(fontdir / "1.ttf", "Shared Sans", "Regular", localized={"ja": "共有"})
+    make_font(fontdir / "2.ttf", "Shared Sans", "Bold", weight=700)
+    make_font(fontdir / "3.ttf", "Other Serif", "Regular", "xyz", typographic=("Other", "Serif"))
+    db = FontDB([fontdir])
+    db.update()
+    make_font(fontdir / "4.ttf", "Shared Sans", "Italic", localized={"ja": "共有"}, fs_selection=0x01)
+    make_font(fontdir / "5.ttf", "Other Serif", "Regular", localized={"zh-CN": "其他"})
+    db.add_font_files([fontdir / "4.ttf", fontdir / "5.ttf"])
+    (fontdir / "1.ttf").unlink()
+    (fontdir / "3.ttf").unlink()
+    make_font(fontdir / "2.ttf", "Shard Sans", "Bold", weight=700)
+    assert db.refresh_directory(fontdir) >= {"Shared Sans", "Shard Sans"}
+
+    rebuilt = FontDB([fontdir])
+    rebuilt.update()
+    assert _contents(db) == _contents(rebuilt)
+
+
+def test_published_index_not_modified(tmp_path: Path, make_font: MakeFont) -> None:
+    make_font(tmp_path / "a.ttf", "Kept Sans", "Regular", localized={"ja": "保持"})
+    db = FontDB([tmp_path])
+    db.update()
+    index = db.get_font_index()
+
+    def contents() -> tuple[Any, ...]:
+        return (
+            {family: dict(styles) for family, styles in index.fontrefs.items()},
+            {family: {name: list(ids) for name, ids in names.items()} for family, names in index.localized_names.items()},
+            {family: dict(styles) for family, styles in index.attributes.items()},
+            {kind: list(keys) for kind, keys in index.names._keys.items()},
+        )
+
+    # names are sorted before publishing, not by queries
+    expected = contents()
+    assert set(expected[-1]) == set(NAME_KINDS)
+    assert db.complete_font_names("k") == [FontNameMatch("Kept Sans", "Kept Sans", "family")]
+    assert db.get_font("kept  sans", "Regular").path == tmp_path / "a.ttf"
+    assert contents() == expected
+    # updates prepare a new generation
+    db.add_font_files([make_font(tmp_path / "b.ttf", "Kept Sans", "Bold", localized={"ja": "保持"}, weight=700)])
+    db.add_font_files([make_font(tmp_path / "c.ttf", "Kept Serif", "Regular")])
+    assert db.get_font_styles("Kept Sans") == ["Regular", "Bold"]
+    assert [x.name for x in db.complete_font_names("kept")] == ["Kept Sans", "Kept Serif"]
+    assert contents() == expected
@@ -0,0 +1,80 @@
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+import fontra
+from fontra import fontdb
+
+
+def _init(fontdir: Path, **kwargs: bool) -> "Optional[Future[None]]":
+    return fontra.init_fontdb(fontdir, accept_envvars=False, use_cache=False, **kwargs)
+
+
+def test_sync(fontdir: Path, default_fontdb: None) -> None:
+    assert _init(fontdir) is None
+    assert fontra.has_font_family("Alpha Sans")
+    assert fontra.get_font_styles("Gamma Mono") == ["Regular", "Italic", "Condensed Oblique"]
+
+
+def test_background(fontdir: Path, default_fontdb: None) -> None:
+    future = _init(fontdir, background=True)
+    assert future is not None
+    fontra.wait_fontdb(10)
+    assert future.done()
+    assert fontdb._init_future is None
+    assert fontra.has_font_family("Alpha Sans")
+
+
+def test_lazy(fontdir: Path, default_fontdb: None) -> None:
+    generation = fontdb.get_index_generation()
+    assert _init(fontdir, lazy=True) is None
+    # nothing is indexed until the first query
+    assert fontdb.get_index_generation() == generation
+    assert fontra.has_font_family("Alpha Sans")
+    assert fontdb.get_index_generation() > generation
+    assert fontdb._lazy_initializer is None
+
+
+def test_failed_background(fontdir: Path, default_fontdb: None) -> None:
+    _init(fontdir)
+    release = threading.Event()
+
+    def fail() -> None:
+        release.wait(10)
+        raise RuntimeError("failed")
+
+    future = fontdb.defer_fontdb_init(fail, background=True)
+    assert future is not None
+    threading.Timer(0.2, release.set).start()
+    # raised to queries waiting for it
+    with pytest.raises(RuntimeError):
+        fontra.wait_fontdb(10)
+    assert isinstance(future.exception(10), RuntimeError)
+    # later queries run on the index as it is
+    fontra.wait_fontdb(0)
+    assert fontdb._init_future is None
+    assert fontra.has_font_family("Alpha Sans")
+
+
+def test_sync_drops_deferred(fontdir: Path, default_fontdb: None) -> None:
+    calls: list[str] = []
+    fontdb.defer_fontdb_init(lambda: calls.append("lazy"), background=False)
+    _init(fontdir)
+    assert fontra.has_font_family("Alpha Sans")
+    assert calls == []
+
+    started, release = threading.Event(), threading.Event()
+
+    def slow() -> None:
+        started.set()
+        release.wait(10)
+
+    fontdb.defer_fontdb_init(slow, background=True)
+    started.wait(10)
+    _init(fontdir)
+    # queries no longer wait for the initialization still running in the background
+    fontra.wait_fontdb(0)
+    release.set()
@@ -0,0 +1,63 @@
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from fontra.fontdb import FontDB
+
+MakeFont = Callable[..., Path]
+
+
+@pytest.fixture
+def base(tmp_path: Path, make_font: MakeFont) -> FontDB:
+    fontdir = tmp_path / "base"
+    fontdir.mkdir()
+    make_font(fontdir / "shared.ttf", "Shared Sans", "Regular", "ABC")
+    make_font(fontdir / "shared-bold.ttf", "Shared Sans", "Bold", "ABC", weight=700)
+    make_font(fontdir / "base.ttf", "Base Serif", "Regular", "AB", localized={"ja": "ベース"})
+    db = FontDB([fontdir])
+    db.update()
+    return db
+
+
+def test_names(tmp_path: Path, make_font: MakeFont, base: FontDB) -> None:
+    fontdir = tmp_path / "overlay"
+    fontdir.mkdir()
+    regular = make_font(fontdir / "shared.ttf", "Shared Sans", "Regular", "ABC")
+    make_font(fontdir / "own.ttf", "Own Mono", "Regular", "xyz")
+    overlay = FontDB([fontdir], base=base)
+    overlay.update()
+    # styles of a family in both layers are merged, the ones of the overlay take precedence
+    assert overlay.get_font("Shared Sans", "Regular").path == regular
+    assert overlay.get_font("Shared Sans", "Bold").path == tmp_path / "base" / "shared-bold.ttf"
+    assert sorted(overlay.all_fonts()) == ["Base Serif", "Own Mono", "Shared Sans"]
+    assert overlay.get_unlocalized_name("ベース") == "Base Serif"
+    assert [x.name for x in overlay.complete_font_names("s")] == ["Shared Sans"]
+    assert overlay.match_font_names("Own Mon") == ["Own Mono"]
+    # the base is not modified by the overlay
+    assert base.get_font("Shared Sans", "Regular").path == tmp_path / "base" / "shared.ttf"
+    assert not base.has_font_family("Own Mono")
+    overlay.remove_font_files([regular])
+    assert overlay.get_font("Shared Sans", "Regular").path == tmp_path / "base" / "shared.ttf"
+
+
+def test_coverage_of_replaced_face(tmp_path: Path, make_font: MakeFont, base: FontDB) -> None:
+    path = tmp_path / "base" / "base.ttf"
+    # the overlay indexes the font file changed since indexed by the base
+    make_font(path, "Base Serif", "Regular", "xy")
+    overlay = FontDB([path.parent], base=base)
+    overlay.add_font_files([path])
+    fontref = overlay.get_font("Base Serif", "Regular")
+    coverage = overlay.get_font_index().coverage
+    assert not coverage.covers(fontref, ord("A"))
+    assert coverage.covers(fontref, ord("x"))
+    assert coverage.get_ranges(fontref) == [(ord("x"), ord("y"))]
+    assert overlay.fonts_covering("A") == sorted([
+        base.get_font("Shared Sans", "Regular"), base.get_font("Shared Sans", "Bold")
+    ])
+    assert overlay.fonts_covering("x") == [fontref]
+    assert overlay.fallback_chain("Shared Sans", "Regular", "Ax") == [base.get_font("Shared Sans", "Regular"), fontref]
+    assert list(coverage).count(fontref) == 1
+    assert len(coverage) == 3
+    # the base keeps its own coverage
+    assert base.fonts_covering("A") == sorted([*overlay.fonts_covering("A"), fontref])
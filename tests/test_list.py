@@ -0,0 +1,78 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture
+def env(fontdir: Path, tmp_path: Path) -> dict[str, str]:
+    return {
+        **os.environ,
+        "PYFONTRA_CUSTOM_FONTDIRS": str(fontdir),
+        "PYFONTRA_CACHE_DIR": str(tmp_path / "cache"),
+        "XDG_DATA_DIRS": str(tmp_path / "share"),
+        "HOME": str(tmp_path / "home"),
+    }
+
+
+def _list(env: dict[str, str], *args: str) -> str:
+    return subprocess.run(
+        [sys.executable, "-m", "fontra", "--no-daemon", "list", *args],
+        check=True, capture_output=True, text=True, env=env
+    ).stdout
+
+
+def test_json(env: dict[str, str], fontdir: Path) -> None:
+    rows = json.loads(_list(env, "--format", "json", "--sort", "--paths", "--localized"))
+    by_name = {(row["name"], row["style"]): row for row in rows}
+    assert len(by_name) == len(rows)
+    assert [row["name"] for row in rows] == sorted(row["name"] for row in rows)
+    assert set(by_name) == {
+        ("Alpha Sans", "Regular"), ("Alpha Sans", "Bold"), ("Beta Serif", "Regular"), ("Delta Display", "Light"),
+        ("Epsilon Text", "Regular"),
+        ("Gamma Mono", "Regular"), ("Gamma Mono", "Italic"), ("Gamma Mono", "Condensed Oblique"),
+    }
+    assert by_name["Beta Serif", "Regular"] == {
+        "name": "Beta Serif", "style": "Regular", "localized": ["测试宋体", "テスト明朝"],
+        "path": str(fontdir / "beta.ttf"), "bank": 0,
+    }
+    assert by_name["Gamma Mono", "Italic"]["path"] == str(fontdir / "gamma.ttc")
+    assert by_name["Gamma Mono", "Italic"]["bank"] == 1
+    assert json.loads(_list(env, "--format", "json", "--prefix", "zeta")) == []
+
+
+def test_jsonl_and_tsv(env: dict[str, str]) -> None:
+    args = ("--sort", "--prefix", "ALPHA", "--paths")
+    rows = [json.loads(line) for line in _list(env, "--format", "jsonl", *args).splitlines()]
+    assert sorted(row["style"] for row in rows if row["name"] == "Alpha Sans") == ["Bold", "Regular"]
+    assert len(rows) == 2
+    lines = _list(env, "--format", "tsv", *args).splitlines()
+    assert lines[0] == "name\tstyle\tpath\tbank"
+    assert [line.split("\t") for line in lines[1:]] == [
+        [row["name"], row["style"], row["path"], str(row["bank"])] for row in rows
+    ]
+
+
+def test_pagination(env: dict[str, str]) -> None:
+    def families(*args: str) -> list[str]:
+        rows = [json.loads(line) for line in _list(env, "--format", "jsonl", "--sort", *args).splitlines()]
+        return list(dict.fromkeys(row["name"] for row in rows))
+
+    assert families() == ["Alpha Sans", "Beta Serif", "Delta Display", "Epsilon Text", "Gamma Mono"]
+    # by families, not rows
+    assert families("--offset", "1", "--limit", "2") == ["Beta Serif", "Delta Display"]
+    assert families("--offset", "4", "--limit", "3") == ["Gamma Mono"]
+    assert families("--limit", "0") == []
+    assert "2 font(s) found." in _list(env, "--sort", "--limit", "2")
+
+
+def test_stops_with_reader(env: dict[str, str]) -> None:
+    process = subprocess.run(
+        f"{sys.executable} -m fontra --no-daemon list --format jsonl | head -n 1",
+        shell=True, check=True, capture_output=True, text=True, env=env
+    )
+    assert json.loads(process.stdout)["style"]
+    assert "Error" not in process.stderr
@@ -0,0 +1,30 @@
+from pathlib import Path
+from typing import Callable
+
+from fontra.fontdb import FontDB
+
+
+def test_localized_names(tmp_path: Path, make_font: Callable[..., Path]) -> None:
+    make_font(tmp_path / "a.ttf", "Beta Serif", "Regular", localized={"ja": "テスト明朝"})
+    bold = make_font(tmp_path / "b.ttf", "Beta Serif", "Bold", localized={"ja": "テスト明朝", "zh-TW": "測試宋體"})
+    make_font(tmp_path / "c.ttf", "Other Sans", "Regular")
+    db = FontDB([tmp_path])
+    db.update()
+    assert db.get_localized_names("Beta Serif") == ["テスト明朝", "測試宋體"]
+    assert db.get_localized_names("Other Sans") == []
+    assert db.get_localized_names("Missing") == []
+    assert db.get_unlocalized_name("測試宋體") == "Beta Serif"
+    assert db.get_unlocalized_name("Other Sans") == "Other Sans"
+    # by Windows and Macintosh language ids
+    assert db.get_localized_name("Beta Serif", 0x411) == "テスト明朝"
+    assert db.get_localized_name("Beta Serif", 11, platform_id=1) == "テスト明朝"
+    assert db.get_localized_name("Beta Serif", 11, platform_id=3) is None
+    assert db.get_localized_name("Beta Serif", 0x404, platform_id=3) == "測試宋體"
+    assert db.get_localized_name("Beta Serif", 0x804) is None
+    assert db.get_localized_name("Other Sans", 0x411) is None
+    # (platform id, encoding id, language id) of each name record, once
+    assert db.get_font_index().localized_names["Beta Serif"]["テスト明朝"] == [(1, 1, 11), (3, 1, 0x411)]
+    db.remove_font_files([bold])
+    assert db.get_localized_names("Beta Serif") == ["テスト明朝"]
+    assert db.get_localized_name("Beta Serif", 0x404) is None
+    assert db.get_unlocalized_name("測試宋體") == "測試宋體"
@@ -0,0 +1,70 @@
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from fontra.fontdb import FontDB
+from fontra.typing import FontNameMatch
+
+
+@pytest.fixture
+def db(tmp_path: Path, make_font: Callable[..., Path]) -> FontDB:
+    make_font(tmp_path / "alpha.ttf", "Alpha Sans", "Regular")
+    make_font(tmp_path / "alpha-bold.ttf", "Alpha Sans", "Semi Bold", weight=600)
+    make_font(tmp_path / "serif.ttf", "Alpha Serif", "Regular", localized={"zh-CN": "阿尔法宋体"})
+    make_font(tmp_path / "delta.ttf", "Delta Display Light", "Regular", typographic=("Delta Display", "Light"))
+    db = FontDB([tmp_path])
+    db.update()
+    return db
+
+
+def test_complete(db: FontDB) -> None:
+    assert db.complete_font_names("ALPHA  s") == [
+        FontNameMatch("Alpha Sans", "Alpha Sans", "family"), FontNameMatch("Alpha Serif", "Alpha Serif", "family")
+    ]
+    assert db.complete_font_names("alpha s", 1) == [FontNameMatch("Alpha Sans", "Alpha Sans", "family")]
+    assert db.complete_font_names("阿尔") == [FontNameMatch("阿尔法宋体", "Alpha Serif", "localized")]
+    assert db.complete_font_names("阿尔", localized=False) == []
+    # a trailing space completes whole words only
+    assert db.complete_font_names("delta display ", classical=True) == [
+        FontNameMatch("Delta Display Light", "Delta Display Light", "classical")
+    ]
+    # sorted by normalized names, then by kinds
+    assert db.complete_font_names("delta", classical=True) == [
+        FontNameMatch("Delta Display", "Delta Display", "family"),
+        FontNameMatch("Delta Display", "Delta Display", "classical"),
+        FontNameMatch("Delta Display Light", "Delta Display Light", "classical"),
+    ]
+    assert db.complete_font_names("gamma") == []
+
+
+@pytest.mark.parametrize("name,style", [
+    ("alpha sans", "regular"),
+    ("  ALPHA   SANS ", "semi  bold"),
+    ("阿尔法宋体", "REGULAR"),
+])
+def test_case_and_whitespace_insensitive(db: FontDB, name: str, style: str) -> None:
+    fontref = db.get_font(name, style)
+    assert db.get_font(name, style, fuzzy=True) == fontref
+    assert db.has_font_family(name)
+    assert db.has_font_style(name, style)
+    assert db.resolve_fonts([(name, style)])[0].fontref == fontref
+
+
+def test_classical(db: FontDB) -> None:
+    assert db.get_font("delta display light", "regular", classical=True).path.name == "delta.ttf"
+    assert db.has_font_family("delta display light", classical=True)
+    assert db.has_font_style("DELTA DISPLAY", "light", classical=True)
+    assert not db.has_font_style("Delta Display", "Bold", classical=True)
+    assert not db.has_font_family("delta display light")
+
+
+def test_not_found(db: FontDB) -> None:
+    assert not db.has_font_family("Alpha Sand")
+    assert not db.has_font_style("Alpha Sans", "Black")
+    assert not db.has_font_family("阿尔法宋体", localized=False)
+    with pytest.raises(KeyError, match="Did you mean 'Alpha Sans'"):
+        db.get_font("Alpha Sand", "Regular")
+    with pytest.raises(KeyError, match="Did you mean 'Semi Bold'"):
+        db.get_font("alpha sans", "SemiBold")
+    assert db.get_font("Alpha Sand", "SemiBold", fuzzy=True).path.name == "alpha-bold.ttf"
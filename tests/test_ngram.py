@@ -0,0 +1,140 @@
+import difflib
+import heapq
+import random
+
+import pytest
+
+from fontra.compact import CompactNgramIndex
+from fontra.layers import LayeredNgramIndex
+from fontra.ngram import NgramIndex, normalize_name
+
+
+def _random_names(rng: random.Random, count: int) -> list[str]:
+    alphabet = "abcdeABC x"
+    return list(dict.fromkeys(
+        "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 12))) for _ in range(count)
+    ))
+
+
+def _family_names(rng: random.Random, count: int) -> list[str]:
+    words = ("Sans", "Serif", "Mono", "Gothic", "Mincho", "Display", "Text", "Code", "Condensed", "UI", "Pro")
+    names: set[str] = set()
+    while len(names) < count:
+        brand = "".join(rng.choice("bcdfghklmnprstvz") + rng.choice("aeiou") for _ in range(rng.randint(2, 4)))
+        names.add(" ".join([brand.title(), *rng.sample(words, rng.randint(1, 2))]))
+    return sorted(names)
+
+
+NAMES = _random_names(random.Random(7), 300) + ["abcde", "Noto Sans", "noto  sans", "NOTO SANS Mono"]
+QUERIES = ["axcxe", "abcde", "NOTO SANS", "Noto Sans", "", "zzz"] + [
+    "".join(random.Random(i).choice("abcdeABC x") for _ in range(i % 14)) for i in range(40)
+]
+FAMILIES = _family_names(random.Random(7), 2000)
+
+
+def _reference(query: str, names: list[str], n: int, cutoff: float) -> list[str]:
+    """`difflib.get_close_matches(...)` over normalized names."""
+    matcher = difflib.SequenceMatcher()
+    matcher.set_seq2(normalize_name(query))
+    scores: list[tuple[float, str]] = []
+    for name in names:
+        matcher.set_seq1(normalize_name(name))
+        if (
+            matcher.real_quick_ratio() >= cutoff
+            and matcher.quick_ratio() >= cutoff
+            and (score := matcher.ratio()) >= cutoff
+        ):
+            scores.append((score, name))
+    return [name for _, name in heapq.nlargest(n, scores)]
+
+
+def _typo(name: str, rng: random.Random) -> str:
+    chars = list(name)
+    i = rng.randrange(len(chars))
+    op = rng.randrange(3)
+    if op == 0:
+        del chars[i]
+    elif op == 1:
+        chars.insert(i, rng.choice("abcdefghijklmnopqrstuvwxyz"))
+    else:
+        chars[i] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    return "".join(chars)
+
+
+def _indexes(names: list[str]) -> list[NgramIndex]:
+    compact = CompactNgramIndex(names)
+    # removed and added again, so posting lists keep stale entries
+    for name in names[::7]:
+        compact.discard(name)
+        compact.add(name)
+    half = len(names) // 2
+    layered = LayeredNgramIndex(NgramIndex(names[:half + 20]), NgramIndex(names[half:]), dict.fromkeys(names))
+    return [compact, layered]
+
+
+@pytest.mark.parametrize("index", _indexes(NAMES), ids=lambda x: type(x).__name__)
+@pytest.mark.parametrize("n,cutoff", [(1, 0.6), (3, 0.6), (50, 0.3), (5, 0.0), (3, 0.8), (3, 1.0)])
+def test_same_for_all_kinds(index: NgramIndex, n: int, cutoff: float) -> None:
+    expected = NgramIndex(NAMES)
+    for query in QUERIES:
+        assert index.get_close_matches(query, n, cutoff) == expected.get_close_matches(query, n, cutoff), query
+
+
+@pytest.mark.parametrize("n,cutoff", [(1, 0.6), (3, 0.6), (50, 0.3), (5, 0.0), (3, 0.8), (3, 1.0)])
+def test_scored_like_difflib(n: int, cutoff: float) -> None:
+    index = NgramIndex(NAMES)
+    for query in QUERIES:
+        matches = index.get_close_matches(query, n, cutoff)
+        # a subset of all matches of difflib, in the same order
+        expected = _reference(query, NAMES, len(NAMES), cutoff)
+        assert matches == [x for x in expected if x in matches], query
+        if cutoff <= 0:
+            assert matches == expected[:n], query
+
+
+@pytest.mark.parametrize("index", [NgramIndex(FAMILIES), *_indexes(FAMILIES)], ids=lambda x: type(x).__name__)
+def test_best_matches_of_typos(index: NgramIndex) -> None:
+    rng = random.Random(3)
+    for name in rng.sample(FAMILIES, 50):
+        query = _typo(name, rng)
+        assert index.get_close_matches(query, 1) == _reference(query, FAMILIES, 1, 0.6), query
+
+
+def test_case_and_whitespace_insensitive() -> None:
+    index = NgramIndex(["Noto Sans", "Noto Serif", "Source Han Sans"])
+    assert index.get_close_matches("  noto   SANS ", 1) == ["Noto Sans"]
+    assert index.get_close_matches("SOURCE HANSANS", 1) == ["Source Han Sans"]
+    assert index.get_close_matches("noto serif", 3, 1.0) == ["Noto Serif"]
+    assert NgramIndex(["Straße Sans"]).get_close_matches("STRASSE SANS", 1, 1.0) == ["Straße Sans"]
+
+
+def test_miss_scores_few_names() -> None:
+    index = NgramIndex(_family_names(random.Random(11), 12000))
+    for query in ("Arial", "Helvetica Neue", "Times New Roman", "Courier"):
+        assert index.get_close_matches(query, 1) == []
+        assert len(index._candidates(normalize_name(query), 0.6)) < 100, query
+
+
+def test_after_discard() -> None:
+    index = NgramIndex(NAMES)
+    removed = set(NAMES[::3])
+    for name in removed:
+        index.discard(name)
+    rest = NgramIndex([x for x in NAMES if x not in removed])
+    for query in QUERIES[:10]:
+        assert index.get_close_matches(query, 5, 0.5) == rest.get_close_matches(query, 5, 0.5)
+
+
+@pytest.mark.parametrize("cls", [NgramIndex, CompactNgramIndex], ids=lambda x: x.__name__)
+def test_copy_is_independent(cls: type[NgramIndex]) -> None:
+    index = cls(NAMES)
+    copy = index.copy()
+    for name in NAMES[::2]:
+        copy.discard(name)
+    copy.add("Noto Serif")
+    index.add("Noto Sans CJK")
+    expected_index = NgramIndex(NAMES + ["Noto Sans CJK"])
+    expected_copy = NgramIndex(NAMES[1::2] + ["Noto Serif"])
+    for query in QUERIES[:10] + ["Noto Serif", "Noto Sans CJK"]:
+        assert index.get_close_matches(query, 5, 0.5) == expected_index.get_close_matches(query, 5, 0.5), query
+        assert copy.get_close_matches(query, 5, 0.5) == expected_copy.get_close_matches(query, 5, 0.5), query
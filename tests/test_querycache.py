@@ -0,0 +1,79 @@
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from fontra.fontdb import FontDB
+from fontra.querycache import QueryCache, QueryCacheInfo
+
+
+def test_lru() -> None:
+    cache = QueryCache(2)
+    calls: list[str] = []
+
+    def query(key: str) -> Callable[[], str]:
+        def run() -> str:
+            calls.append(key)
+            return key.upper()
+        return run
+
+    assert cache.get("a", query("a"), 1) == "A"
+    assert cache.get("b", query("b"), 1) == "B"
+    assert cache.get("a", query("a"), 1) == "A"
+    # least recently used dropped
+    assert cache.get("c", query("c"), 1) == "C"
+    assert cache.get("b", query("b"), 1) == "B"
+    assert calls == ["a", "b", "c", "b"]
+    assert cache.info() == QueryCacheInfo(1, 4, 2, 2)
+    cache.clear()
+    assert cache.info() == QueryCacheInfo(0, 0, 2, 0)
+
+
+def test_key_error() -> None:
+    cache = QueryCache()
+    calls: list[int] = []
+
+    def query() -> str:
+        calls.append(1)
+        raise KeyError("Font 'x' not found. Did you mean 'y' ?")
+
+    for _ in range(2):
+        with pytest.raises(KeyError, match="Did you mean 'y'"):
+            cache.get("x", query, 1)
+    assert calls == [1]
+
+
+def test_generations() -> None:
+    cache = QueryCache()
+    assert cache.get("a", lambda: 1, 1) == 1
+    # a newer generation drops all entries
+    assert cache.get("a", lambda: 2, 2) == 2
+    assert cache.get("a", lambda: 3, 2) == 2
+    # results of an older generation are not cached
+    assert cache.get("b", lambda: 4, 1) == 4
+    assert cache.get("b", lambda: 5, 2) == 5
+    assert cache.info().currsize == 2
+    disabled = QueryCache(0)
+    assert disabled.get("a", lambda: 1, 1) == 1
+    assert disabled.get("a", lambda: 2, 1) == 2
+
+
+def test_invalidated_by_updates(tmp_path: Path, make_font: Callable[..., Path]) -> None:
+    make_font(tmp_path / "a.ttf", "Cached Sans", "Regular")
+    db = FontDB([tmp_path])
+    db.update()
+    fontref = db.get_font("Cached Sans", "Regular")
+    assert db.get_font("Cached Sans", "Regular") == fontref
+    assert db.get_font_styles("Cached Sans") == ["Regular"]
+    with pytest.raises(KeyError, match="Did you mean 'Regular'"):
+        db.get_font("Cached Sans", "Regulr")
+    with pytest.raises(KeyError, match="Did you mean 'Regular'"):
+        db.get_font("Cached Sans", "Regulr")
+    assert db.query_cache.info()[:2] == (2, 3)
+    bold = make_font(tmp_path / "b.ttf", "Cached Sans", "Regulr")
+    db.add_font_files([bold])
+    assert db.get_font("Cached Sans", "Regulr").path == bold
+    assert db.get_font_styles("Cached Sans") == ["Regular", "Regulr"]
+    db.remove_font_files([bold])
+    with pytest.raises(KeyError):
+        db.get_font("Cached Sans", "Regulr")
@@ -0,0 +1,94 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from fontra import query
+from fontra.fontdb import FontDB
+from fontra.typing import FontRef, FontResolution
+
+
+@pytest.fixture
+def db(fontdir: Path) -> FontDB:
+    db = FontDB([fontdir])
+    db.update()
+    return db
+
+
+def test_resolve(db: FontDB, fontdir: Path) -> None:
+    results = db.resolve_fonts([
+        ("Alpha Sans", "Bold"), ("测试宋体", "Regular"), ("Alpha Sans", "Black"), ("Missing", "Regular"),
+    ])
+    assert results[0] == FontResolution("Alpha Sans", "Bold", FontRef(fontdir / "alpha-bold.ttf", 0), None)
+    assert results[1] == FontResolution("测试宋体", "Regular", FontRef(fontdir / "beta.ttf", 0), None)
+    assert results[2].fontref is None and results[2].error == "Font style 'Black' of font 'Alpha Sans' not found."
+    assert results[3].fontref is None and results[3].error is not None and "'Missing' not found" in results[3].error
+    # the same as one by one
+    for result in results:
+        if result.fontref is not None:
+            assert db.get_font(result.name, result.style) == result.fontref
+        else:
+            with pytest.raises(KeyError):
+                db.get_font(result.name, result.style)
+    assert db.resolve_fonts([]) == []
+    fuzzy = db.resolve_fonts([("Alpha Sanz", "Bold")], fuzzy=True)
+    assert fuzzy[0].fontref == FontRef(fontdir / "alpha-bold.ttf", 0)
+
+
+def test_resolved_once(db: FontDB, monkeypatch: pytest.MonkeyPatch) -> None:
+    db.query_cache.maxsize = 0
+    matched: list[str] = []
+
+    def match_font_names(index: Any, font_name: str, *args: Any) -> list[str]:
+        matched.append(font_name)
+        return match_font_names_(index, font_name, *args)
+
+    match_font_names_ = query._match_font_names
+    monkeypatch.setattr(query, "_match_font_names", match_font_names)
+    requests = [("Gama Mono", style) for style in ("Regular", "Italic", "Regular")] * 100
+    results = db.resolve_fonts(requests, fuzzy=True)
+    assert [result.style for result in results] == [style for _, style in requests]
+    assert len({result.fontref for result in results}) == 2
+    # a missing family is fuzzy matched once for all its styles
+    assert matched == ["Gama Mono"]
+
+
+def test_cli_streams(fontdir: Path, tmp_path: Path) -> None:
+    env = {
+        **os.environ,
+        "PYFONTRA_CUSTOM_FONTDIRS": str(fontdir),
+        "PYFONTRA_CACHE_DIR": str(tmp_path / "cache"),
+        "XDG_DATA_DIRS": str(tmp_path / "share"),
+        "HOME": str(tmp_path / "home"),
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "fontra", "--no-daemon", "resolve"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, env=env
+    )
+    assert process.stdin is not None and process.stdout is not None
+
+    def resolve(line: str) -> dict[str, Any]:
+        assert process.stdin is not None and process.stdout is not None
+        process.stdin.write(line + "\n")
+        process.stdin.flush()
+        return json.loads(process.stdout.readline())
+
+    try:
+        # each result is written before the next request is read
+        assert resolve('["Alpha Sans", "Bold"]') == {
+            "name": "Alpha Sans", "style": "Bold", "path": str(fontdir / "alpha-bold.ttf"), "bank": 0
+        }
+        assert resolve('{"id": 7, "name": "Gamma Mono", "style": "Italic"}') == {
+            "id": 7, "name": "Gamma Mono", "style": "Italic", "path": str(fontdir / "gamma.ttc"), "bank": 1
+        }
+        assert "not found" in resolve('["Alpha Sans", "Black"]')["error"]
+        assert resolve('{"id": 8, "name": "Alpha Sans"}')["error"].startswith("Invalid request")
+        assert resolve("not json")["error"].startswith("Invalid request")
+    finally:
+        process.stdin.close()
+        assert process.wait(10) == 0
+        process.stdout.close()
@@ -0,0 +1,47 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from fontra import fontdb
+from fontra.stats import FailedFile, add_index_hook, remove_index_hook
+
+
+def _with_undecodable_name(source: Path, fn: Path) -> Path:
+    """Copy a font, adding a family name record in a Windows encoding without a codec."""
+    from fontTools.ttLib import TTFont
+    from fontTools.ttLib.tables._n_a_m_e import NameRecord
+
+    font = TTFont(str(source))
+    record = NameRecord()
+    record.platformID, record.platEncID, record.langID, record.nameID = 3, 7, 0x409, 1
+    record.string = b"\x00B\x00a\x00d"
+    font["name"].names.append(record)  # pyright: ignore[reportAttributeAccessIssue]
+    font.save(str(fn))
+    return fn
+
+
+def test_parallel_same_as_serial(fontdir: Path) -> None:
+    fns = sorted(fontdir.iterdir())
+    assert fontdb._scan_font_files(fns, 2, emit=False) == fontdb._scan_font_files(fns, emit=False)
+
+
+@pytest.mark.filterwarnings("ignore:Some error occurred")
+@pytest.mark.parametrize("workers", [None, 2])
+def test_undecodable_name_fails_one_file(fontdir: Path, tmp_path: Path, workers: int) -> None:
+    bad = _with_undecodable_name(fontdir / "alpha.ttf", tmp_path / "bad.ttf")
+    good = shutil.copy(fontdir / "beta.ttf", tmp_path / "beta.ttf")
+    failures: list[FailedFile] = []
+
+    def hook(event: object) -> None:
+        if isinstance(event, FailedFile):
+            failures.append(event)
+
+    add_index_hook(hook)
+    try:
+        bad_records, good_records = fontdb._scan_font_files([bad, Path(good)], workers)
+    finally:
+        remove_index_hook(hook)
+    assert bad_records is None
+    assert good_records is not None and good_records[0].family == "Beta Serif"
+    assert [failure.path for failure in failures] == [bad]
@@ -0,0 +1,67 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from fontra import fontdb
+from fontra.consts import SLANT_ITALIC, SLANT_OBLIQUE, SLANT_ROMAN
+from fontra.sfnt import read_sfnt_faces, read_sfnt_versions, to_ranges
+
+FONT_FILES = ["alpha.ttf", "alpha-bold.ttf", "beta.ttf", "gamma.ttc", "delta-light.ttf", "epsilon.otf"]
+
+
+@pytest.mark.parametrize("name", FONT_FILES)
+def test_same_as_freetype(fontdir: Path, name: str) -> None:
+    pytest.importorskip("freetype")
+    fn = fontdir / name
+    records, cost, _ = fontdb._load_font_file(fn)
+    assert cost.parser == "sfnt"
+    num_faces = fontdb._ft_open_face(fn).num_faces
+    expected = [fontdb._read_face_record(fontdb._ft_open_face(fn, i)) for i in range(num_faces)]
+    # FreeType only tells bold and italic, attributes are compared against fontTools below
+    assert [record[:6] for record in records or ()] == [record[:6] for record in expected]
+
+
+@pytest.mark.parametrize("name", FONT_FILES)
+def test_same_as_fonttools(fontdir: Path, name: str) -> None:
+    from fontTools.ttLib import TTCollection, TTFont
+
+    fn = fontdir / name
+    fonts = TTCollection(str(fn)).fonts if name.endswith(".ttc") else [TTFont(str(fn))]
+    faces = read_sfnt_faces(fn)
+    assert faces is not None and len(faces) == len(fonts)
+    for face, font in zip(faces, fonts):
+        name_table, cmap = font["name"], font.getBestCmap()
+        os2: Any = font["OS/2"]
+        assert face.family == name_table.getBestFamilyName()
+        assert face.style == name_table.getBestSubFamilyName()
+        assert cmap is not None and face.coverage == to_ranges(sorted(cmap))
+        assert face.attributes.weight == os2.usWeightClass
+        assert face.attributes.width == os2.usWidthClass
+        assert face.attributes.slant == (
+            SLANT_OBLIQUE if os2.fsSelection & 0x200 else SLANT_ITALIC if os2.fsSelection & 0x01 else SLANT_ROMAN
+        )
+    assert read_sfnt_versions(fn) == [font.sfntVersion.encode("latin-1") for font in fonts]
+
+
+def test_localized_names(fontdir: Path) -> None:
+    records = fontdb.scan_font_file(fontdir / "beta.ttf")
+    assert records is not None
+    assert {name for name, *_ in records[0].langnames} == {"测试宋体", "テスト明朝"}
+
+
+def test_typographic_names(fontdir: Path) -> None:
+    records = fontdb.scan_font_file(fontdir / "delta-light.ttf")
+    assert records is not None
+    assert (records[0].family, records[0].style) == ("Delta Display", "Light")
+    assert ("Delta Display Light", "Regular") in records[0].classical
+    assert records[0].coverage[-1] == (0x1F600, 0x1F600)
+
+
+def test_broken(tmp_path: Path) -> None:
+    fn = tmp_path / "broken.ttf"
+    fn.write_bytes(b"\x00\x01\x00\x00 not a font")
+    assert read_sfnt_faces(fn) is None
+    pytest.importorskip("freetype")
+    with pytest.warns(UserWarning):
+        assert fontdb.scan_font_file(fn) is None
@@ -0,0 +1,74 @@
+import threading
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+import fontra
+from fontra import fontdb
+
+FAMILIES = {"Alpha Sans", "Beta Serif", "Gamma Mono", "Delta Display", "Epsilon Text"}
+
+
+def _queries() -> dict[str, Any]:
+    return {
+        "all_fonts": sorted(fontra.all_fonts()),
+        "classical": sorted(fontra.all_fonts(classical=True)),
+        "styles": {family: fontra.get_font_styles(family) for family in sorted(FAMILIES)},
+        "fonts": {family: fontra.get_font(family, "Regular") for family in sorted(FAMILIES - {"Delta Display"})},
+        "light": fontra.get_font("Delta Display", "Light"),
+        "localized": fontra.get_font("测试宋体", "Regular"),
+        "localized_names": fontra.get_localized_names("Beta Serif"),
+        "localized_name": fontra.get_localized_name("Beta Serif", 0x804),
+        "unlocalized": fontra.get_unlocalized_name("テスト明朝"),
+        "find": fontra.find_font("Gamma Mono", weight=700, italic=True),
+        "covering": fontra.fonts_covering("中文"),
+        "emoji": fontra.fonts_covering("\U0001F600"),
+        "fallback": fontra.fallback_chain("Alpha Sans", "Regular", "Ax中"),
+        "complete": fontra.complete_font_names("a", None, classical=True),
+        "match": fontra.match_font_name("Gama Mono"),
+        "match_styles": fontra.match_font_styles("Gamma Mono", "Italc"),
+    }
+
+
+def test_round_trip(fontdir: Path, tmp_path: Path, default_fontdb: None) -> None:
+    fontra.init_fontdb(fontdir, accept_envvars=False, use_cache=False)
+    expected = _queries()
+    assert set(expected["all_fonts"]) == FAMILIES
+    path = fontra.build_snapshot(tmp_path / "index.snapshot")
+    fontra.load_snapshot(path)
+    assert fontra.get_font_index().snapshot_path == path
+    assert _queries() == expected
+    with pytest.raises(RuntimeError):
+        fontra.add_font_files([fontdir / "alpha.ttf"])
+    # rebuilding from font files makes the index writable again
+    fontra.update_fontrefs_index()
+    assert _queries() == expected
+    fontra.remove_font_files([fontdir / "alpha-bold.ttf"])
+    assert fontra.get_font_styles("Alpha Sans") == ["Regular"]
+
+
+def test_load_during_background_init(fontdir: Path, tmp_path: Path, default_fontdb: None) -> None:
+    fontra.init_fontdb(fontdir, accept_envvars=False, use_cache=False)
+    path = fontra.build_snapshot(tmp_path / "index.snapshot")
+    release = threading.Event()
+
+    def rebuild() -> None:
+        release.wait(10)
+        fontra.update_fontrefs_index(use_cache=False)
+
+    future = fontdb.defer_fontdb_init(rebuild, background=True)
+    assert future is not None
+    threading.Timer(0.2, release.set).start()
+    fontra.load_snapshot(path)
+    assert future.done()
+    assert fontdb._init_future is None
+    assert fontra.get_font_index().snapshot_path == path
+
+
+def test_load_in_background_init(fontdir: Path, tmp_path: Path, default_fontdb: None) -> None:
+    fontra.init_fontdb(fontdir, accept_envvars=False, use_cache=False)
+    path = fontra.build_snapshot(tmp_path / "index.snapshot")
+    fontdb.defer_fontdb_init(lambda: fontra.load_snapshot(path), background=True)
+    fontra.wait_fontdb(10)
+    assert fontra.get_font_index().snapshot_path == path
@@ -0,0 +1,84 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+import fontra
+from fontra.stats import FailedFile, FileCost, PhaseTiming, add_index_hook, remove_index_hook
+
+
+@pytest.fixture
+def fonts(fontdir: Path, tmp_path: Path) -> Path:
+    """A copy of `fontdir` with a broken font file."""
+    path = Path(shutil.copytree(fontdir, tmp_path / "fonts"))
+    (path / "broken.ttf").write_bytes(b"\x00\x01\x00\x00 not a font")
+    return path
+
+
+@pytest.mark.filterwarnings("ignore:Some error occurred")
+def test_rebuild(fonts: Path, default_fontdb: None) -> None:
+    events: list[object] = []
+    add_index_hook(events.append)
+    try:
+        fontra.init_fontdb(fonts, accept_envvars=False, use_cache=False)
+    finally:
+        remove_index_hook(events.append)
+    stats = fontra.get_index_stats()
+    assert {"walk", "stat", "scan", "index"} <= set(stats.phases)
+    assert stats.total_seconds == pytest.approx(sum(stats.phases.values()))
+    assert (stats.files, stats.faces, stats.families, stats.cached_files) == (7, 8, 5, 0)
+    assert stats.localized_names == 2
+    assert sorted(cost.path.name for cost in stats.loaded) == sorted(x.name for x in fonts.iterdir())
+    assert {cost.path.name: cost.faces for cost in stats.loaded}["gamma.ttc"] == 3
+    assert stats.failures == [FailedFile(fonts / "broken.ttf", stats.failures[0].reason)]
+    slowest = stats.slowest(3)
+    assert [cost.seconds for cost in slowest] == sorted((cost.seconds for cost in stats.loaded), reverse=True)[:3]
+    data = json.loads(json.dumps(stats.as_dict(3)))
+    assert data["failures"] == [{"path": str(fonts / "broken.ttf"), "reason": stats.failures[0].reason}]
+    assert len(data["slowest"]) == 3
+    # the hook saw the same events
+    assert [x for x in events if isinstance(x, FileCost)] == stats.loaded
+    assert [x for x in events if isinstance(x, FailedFile)] == stats.failures
+    assert {x.phase for x in events if isinstance(x, PhaseTiming)} == set(stats.phases)
+
+
+@pytest.mark.filterwarnings("ignore:Some error occurred")
+def test_cached_and_incremental(
+    fonts: Path, tmp_path: Path, default_fontdb: None, make_font: Callable[..., Path]
+) -> None:
+    fontra.init_fontdb(fonts, accept_envvars=False)
+    first = fontra.get_index_stats()
+    fontra.init_fontdb(accept_envvars=False)
+    stats = fontra.get_index_stats()
+    assert stats is not first
+    # failures are cached too, and not reported again
+    assert (stats.cached_files, stats.loaded, stats.failures) == (7, [], [])
+    assert (stats.files, stats.faces) == (first.files, first.faces)
+    extra = make_font(tmp_path / "extra.ttf", "Extra Sans", "Regular")
+    fontra.add_font_files([extra])
+    assert fontra.get_index_stats() is stats
+    assert stats.loaded[-1].path == extra
+    assert (stats.files, stats.faces, stats.families) == (8, 9, 6)
+
+
+def test_cli(fonts: Path, tmp_path: Path) -> None:
+    env = {
+        **os.environ,
+        "PYFONTRA_CUSTOM_FONTDIRS": str(fonts),
+        "PYFONTRA_CACHE_DIR": str(tmp_path / "cache"),
+        "XDG_DATA_DIRS": str(tmp_path / "share"),
+        "HOME": str(tmp_path / "home"),
+    }
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-m", "fontra", "stats", "--json", "-n", "2"],
+        check=True, capture_output=True, text=True, env=env
+    ).stdout
+    data = json.loads(output)
+    assert (data["files"], data["faces"], data["families"]) == (7, 8, 5)
+    assert len(data["slowest"]) == 2
+    assert [x["path"] for x in data["failures"]] == [str(fonts / "broken.ttf")]
@@ -0,0 +1,77 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from fontra.unpack import UnpackJob, find_collections, plan_unpack, unpack_collections
+
+
+@pytest.fixture
+def collection(tmp_path: Path, fontdir: Path) -> Path:
+    path = tmp_path / "gamma.ttc"
+    path.write_bytes((fontdir / "gamma.ttc").read_bytes())
+    return path
+
+
+def _names(jobs: list[UnpackJob]) -> list[str]:
+    return [job.output.name for job in jobs]
+
+
+def test_unpack(tmp_path: Path, collection: Path) -> None:
+    (tmp_path / "alpha.ttf").touch()
+    assert find_collections([tmp_path, tmp_path / "alpha.ttf", collection]) == [collection]
+    jobs = plan_unpack([collection])
+    assert _names(jobs) == ["GammaMono-Regular.ttf", "GammaMono-Italic.ttf", "GammaMono-CondensedOblique.ttf"]
+    assert {job.output.parent for job in jobs} == {tmp_path / "gamma_fonts"}
+    result = unpack_collections(jobs)
+    assert (result.extracted, result.skipped, result.failed) == (jobs, [], [])
+    from fontTools.ttLib import TTFont
+
+    with TTFont(jobs[1].output) as font:
+        assert font["name"].getDebugName(2) == "Italic"
+
+
+def test_skip_unchanged(collection: Path) -> None:
+    jobs = plan_unpack([collection])
+    unpack_collections(jobs)
+    assert unpack_collections(jobs).skipped == jobs
+    # the same content, modified later
+    stat = collection.stat()
+    os.utime(collection, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert unpack_collections(jobs).skipped == jobs
+    assert unpack_collections(jobs, force=True).extracted == jobs
+    jobs[0].output.unlink()
+    result = unpack_collections(jobs)
+    assert (result.extracted, result.skipped) == (jobs[:1], jobs[1:])
+
+
+def test_duplicate_names(tmp_path: Path, collection: Path) -> None:
+    other = tmp_path / "other" / collection.name
+    other.parent.mkdir()
+    other.write_bytes(collection.read_bytes())
+    jobs = plan_unpack([collection, other], tmp_path / "out")
+    assert _names(jobs) == [
+        "GammaMono-Regular.ttf", "GammaMono-Italic.ttf", "GammaMono-CondensedOblique.ttf",
+        "GammaMono-Regular#0.ttf", "GammaMono-Italic#1.ttf", "GammaMono-CondensedOblique#2.ttf",
+    ]
+
+
+def _run(*args: str) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        [sys.executable, "-m", "fontra", "unpack", "--workers", "1", *args],
+        capture_output=True, text=True, env={**os.environ, "COLUMNS": "1000"}
+    )
+
+
+def test_cli_reports_other_files(tmp_path: Path, collection: Path, fontdir: Path) -> None:
+    font = fontdir / "alpha.ttf"
+    process = _run(str(font))
+    assert process.returncode == 1
+    assert "is not a font collection" in process.stdout
+    process = _run(str(font), str(collection))
+    assert process.returncode == 0
+    assert "is not a font collection" in process.stdout
+    assert len(list((tmp_path / "gamma_fonts").glob("*.ttf"))) == 3
+    assert _run(str(tmp_path / "missing.ttc")).returncode == 1
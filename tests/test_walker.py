@@ -0,0 +1,100 @@
+import os
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+
+from fontra import walker
+from fontra.fontdb import FontDB
+from fontra.walker import FontFileWalker
+
+OLD = 1_000_000_000
+
+
+def _tree(root: Path) -> Path:
+    (root / "a" / "deep").mkdir(parents=True)
+    (root / "b").mkdir()
+    for fn in ("a/x.ttf", "a/deep/y.OTF", "a/readme.txt", "b/z.ttc"):
+        (root / fn).write_bytes(fn.encode())
+    # links to a file and a directory found already, and a loop
+    os.link(root / "a/x.ttf", root / "b/hard.ttf")
+    (root / "b/soft.ttf").symlink_to(root / "a/deep/y.OTF")
+    (root / "b/deep").symlink_to(root / "a/deep")
+    (root / "a/deep/loop").symlink_to(root / "a")
+    _age(root)
+    return root
+
+
+def _age(root: Path) -> None:
+    """Set modification times of directories to the past, so their listings are reused."""
+    for directory, _, _ in os.walk(root):
+        os.utime(directory, ns=(OLD, OLD))
+
+
+def _names(result: dict[Path, Any], root: Path) -> list[str]:
+    return sorted(str(fn.relative_to(root)) for fn in result)
+
+
+def test_walk(tmp_path: Path) -> None:
+    root = _tree(tmp_path)
+    result = FontFileWalker().walk([root / "a", root / "b", root / "missing"])
+    assert _names(result, root) == ["a/deep/y.OTF", "a/x.ttf", "b/z.ttc"]
+    assert result[root / "a/x.ttf"] == walker.get_file_key(root / "b/hard.ttf")
+    # each physical file once, by the first root listing it
+    assert _names(FontFileWalker().walk([root / "b", root / "a"]), root) == ["b/hard.ttf", "b/soft.ttf", "b/z.ttc"]
+
+
+def test_threads(tmp_path: Path) -> None:
+    roots = [_tree(tmp_path / str(i)) for i in range(3)]
+    roots += [roots[0] / "a", roots[1] / "b"]
+    assert FontFileWalker().walk(roots, threads=4) == FontFileWalker().walk(roots, threads=1)
+
+
+def test_unchanged_directories_not_listed(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    root = _tree(tmp_path)
+    listed: list[Path] = []
+
+    def list_directory(directory: Path, *args: Any) -> Any:
+        listed.append(directory)
+        return list_directory_(directory, *args)
+
+    list_directory_ = walker._list_directory
+    monkeypatch.setattr(walker, "_list_directory", list_directory)
+    fontfile_walker = FontFileWalker()
+    first = fontfile_walker.walk([root])
+    assert len(listed) == 4
+    listed.clear()
+    assert fontfile_walker.walk([root]) == first
+    assert listed == []
+    (root / "a/deep/new.ttf").write_bytes(b"")
+    os.utime(root / "a/deep", ns=(OLD, OLD + 1))
+    assert _names(fontfile_walker.walk([root]), root) == sorted(["a/deep/new.ttf", *_names(first, root)])
+    assert listed == [root / "a/deep"]
+    # recently modified directories are listed again, they may change within the same mtime
+    listed.clear()
+    (root / "b/new.ttf").write_bytes(b"")
+    fontfile_walker.walk([root])
+    fontfile_walker.walk([root])
+    assert listed == [root / "b", root / "b"]
+    fontfile_walker.clear()
+    listed.clear()
+    fontfile_walker.walk([root])
+    assert len(listed) == 4
+
+
+def test_database_indexes_physical_files_once(tmp_path: Path, make_font: Callable[..., Path]) -> None:
+    first, second = tmp_path / "first", tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+    font = make_font(first / "a.ttf", "Linked Sans", "Regular")
+    os.link(font, second / "hard.ttf")
+    (second / "soft.ttf").symlink_to(font)
+    (second / "dir").symlink_to(first)
+    db = FontDB([first, second])
+    db.update()
+    assert db.fonts_covering("A") == [db.get_font("Linked Sans", "Regular")]
+    assert db.get_font("Linked Sans", "Regular").path == font
+    # nor when added afterwards
+    db.add_font_files([second / "hard.ttf", second / "soft.ttf"])
+    assert db.fonts_covering("A") == [db.get_font("Linked Sans", "Regular")]
+    assert db.get_font("Linked Sans", "Regular").path == font
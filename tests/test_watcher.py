@@ -0,0 +1,88 @@
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+import pytest
+
+import fontra
+from fontra.typing import FontFamilyName
+from fontra.watcher import FontWatcher, _InotifyBackend
+
+linux_only = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is only on Linux")
+
+
+@pytest.mark.parametrize("polling", [pytest.param(False, marks=linux_only), True])
+def test_applies_changes(
+    tmp_path: Path, make_font: Callable[..., Path], default_fontdb: None, polling: bool
+) -> None:
+    fontra.init_fontdb(tmp_path, accept_envvars=False, use_cache=False)
+    changed: list[set[FontFamilyName]] = []
+    applied = threading.Event()
+
+    def callback(families: set[FontFamilyName]) -> None:
+        changed.append(families)
+        applied.set()
+
+    watcher = FontWatcher(callback, directories=[tmp_path], debounce=0.05, interval=0.05, polling=polling).start()
+    try:
+        time.sleep(0.1)
+        make_font(tmp_path / "watched.ttf", "Watched Sans", "Regular")
+        assert applied.wait(10)
+    finally:
+        watcher.stop()
+    assert changed == [{"Watched Sans"}]
+    assert fontra.has_font_family("Watched Sans")
+
+
+class _BusyBackend:
+    """Reports a change on every wait, like a file being written continuously."""
+
+    def __init__(self) -> None:
+        self.closed = threading.Event()
+
+    def wait(self, timeout: Optional[float]) -> set[Path]:
+        time.sleep(0.01)
+        return set() if self.closed.is_set() else {Path("busy")}
+
+    def close(self) -> None:
+        self.closed.set()
+
+
+def test_continuous_changes_applied_by_max_delay(monkeypatch: pytest.MonkeyPatch) -> None:
+    watcher = FontWatcher(directories=[], debounce=0.1, max_delay=0.3)
+    batches: list[float] = []
+    monkeypatch.setattr(watcher, "_apply", lambda directories: batches.append(time.monotonic()))
+    backend = watcher._backend = _BusyBackend()  # pyright: ignore[reportAttributeAccessIssue]
+    thread = threading.Thread(target=watcher._run)
+    start = time.monotonic()
+    thread.start()
+    time.sleep(1.0)
+    watcher._stopped.set()
+    backend.close()
+    thread.join()
+    assert len(batches) >= 2
+    assert batches[0] - start < 0.8
+
+
+@linux_only
+def test_inotify_above_fd_setsize(tmp_path: Path) -> None:
+    resource = pytest.importorskip("resource")
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < 1200:
+        pytest.skip("not enough file descriptors")
+    fds = [os.open(os.devnull, os.O_RDONLY) for _ in range(1100)]
+    try:
+        backend = _InotifyBackend([tmp_path])
+        try:
+            assert backend._fd > 1024
+            (tmp_path / "new.ttf").write_bytes(b"")
+            assert backend.wait(5) == {tmp_path}
+            assert backend.wait(0) == set()
+        finally:
+            backend.release()
+    finally:
+        for fd in fds:
+            os.close(fd)